@@ -1,11 +1,25 @@
-from fastapi import APIRouter, Depends, Query
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from ..domain.controller.kpi_compare_controller import KpiCompareController
+from ..domain.schema.kpi_compare_schema import KpiCompareRequest
 
 router = APIRouter(
     prefix="/kpi",
     tags=["KPI 비교"]
 )
 
+def require_admin_token(x_admin_token: str = Header(None, description="관리 API 토큰 (KPI_ADMIN_TOKEN)")):
+    """
+    캐시를 비우거나 DART 재조회를 일으키는 관리 API 용 인증. KPI_ADMIN_TOKEN 이 설정되지 않았으면 관리 API 를 막습니다.
+    """
+    admin_token = os.getenv("KPI_ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="관리 API 가 비활성화되어 있습니다 (KPI_ADMIN_TOKEN 미설정)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=401, detail="관리 API 토큰이 올바르지 않습니다")
+
 @router.get("/companies", summary="지원 기업 목록 조회")
 async def get_supported_companies(
     controller: KpiCompareController = Depends()
@@ -13,12 +27,46 @@ async def get_supported_companies(
     """지원하는 게임회사 목록을 반환합니다."""
     return await controller.get_supported_companies()
 
+@router.post("/compare", summary="여러 기업 KPI 일괄 비교")
+async def compare_kpis(
+    request: KpiCompareRequest,
+    controller: KpiCompareController = Depends()
+):
+    """기업 × 연도 × 보고서 조합의 KPI를 동시에 계산해 기업별 행렬로 반환합니다. 실패는 셀 단위로 표시됩니다."""
+    return await controller.compare_kpis(request)
+
+@router.post("/metadata/reload", summary="KPI 메타데이터 다시 읽기", dependencies=[Depends(require_admin_token)])
+async def reload_kpi_metadata(
+    force: bool = Query(False, description="파일 변경 여부와 관계없이 강제로 다시 읽기"),
+    controller: KpiCompareController = Depends()
+):
+    """KPI_for_dashboard_final.csv 변경 후 산식을 재컴파일합니다. X-Admin-Token 헤더가 필요합니다."""
+    return await controller.reload_kpi_metadata(force)
+
+@router.post("/registry/reload", summary="기업 레지스트리 다시 열기", dependencies=[Depends(require_admin_token)])
+async def reload_corp_registry(
+    force: bool = Query(False, description="파일 변경 여부와 관계없이 강제로 다시 열기"),
+    controller: KpiCompareController = Depends()
+):
+    """build_corp_registry.py 실행 후 새 레지스트리 파일로 기업 검색 인덱스를 재구성합니다. X-Admin-Token 헤더가 필요합니다."""
+    return await controller.reload_corp_registry(force)
+
 @router.get("/search", summary="기업 검색")
 async def search_company(
-    query: str = Query(..., description="검색할 기업명, 종목코드, DART 8자리 코드"),
+    query: str = Query(..., description="검색할 기업명, 종목코드, DART 8자리 코드 (초성 검색 지원, 예: ㄴㅁㅂ)"),
+    limit: int = Query(20, ge=1, le=100, description="최대 결과 수"),
     controller: KpiCompareController = Depends() # FastAPI가 Controller를 주입
 ):
-    return await controller.search_company(query)
+    """정확 일치 → 접두어 → 부분 일치(또는 초성) → 오타 허용 순으로 정렬된 결과를 반환합니다."""
+    return await controller.search_company(query, limit)
+
+@router.get("/autocomplete", summary="기업명 자동완성")
+async def autocomplete_company(
+    prefix: str = Query(..., description="기업명 접두어"),
+    limit: int = Query(10, ge=1, le=50, description="최대 결과 수"),
+    controller: KpiCompareController = Depends()
+):
+    return await controller.autocomplete_company(prefix, limit)
 
 @router.get("/{query}/reports", summary="기업 보고서 목록 조회")
 async def get_reports(
@@ -27,6 +75,17 @@ async def get_reports(
 ):
     return await controller.get_reports(query)
 
+@router.get("/{query}/timeseries", summary="기업 KPI 시계열")
+async def get_kpi_timeseries(
+    query: str,
+    from_year: int = Query(..., alias="from", description="시작 사업연도 (예: 2020)"),
+    to_year: int = Query(..., alias="to", description="마지막 사업연도 (예: 2024)"),
+    reports: str = Query("11011", description="쉼표로 구분한 보고서 코드 (예: 11013,11012,11014,11011)"),
+    controller: KpiCompareController = Depends()
+):
+    """모든 KPI를 기간 순(연도 → 분기)으로 정렬된 값 배열로 반환합니다. 이미 받은 기간은 DART를 다시 호출하지 않습니다."""
+    return await controller.get_kpi_timeseries(query, from_year, to_year, reports)
+
 @router.get("/{query}/report/{rcept_no}/kpi", summary="보고서 기반 KPI 계산")
 async def get_kpi_for_report(
     query: str,
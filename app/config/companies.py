@@ -1,36 +1,43 @@
 """
 KPI 비교 서비스에서 지원하는 기업 목록
+
+stock_code 는 상장 종목코드(6자리)이며, 비상장이거나 확인되지 않은 기업은 None 입니다.
+주가 테이블(StockPriceModel.symbol)은 같은 6자리 종목코드를 심볼로 씁니다.
 """
 SUPPORTED_COMPANIES = [
-    {'corp_name': '크래프톤', 'corp_code': '00760971'},
-    {'corp_name': '엔씨소프트', 'corp_code': '00261443'},
-    {'corp_name': '넷마블', 'corp_code': '00904672'},
-    {'corp_name': '펄어비스', 'corp_code': '01152470'},
-    {'corp_name': '카카오게임즈', 'corp_code': '01137383'},
-    {'corp_name': '넥슨게임즈', 'corp_code': '01096341'},
-    {'corp_name': '위메이드', 'corp_code': '00444329'},
-    {'corp_name': '네오위즈', 'corp_code': '00628860'},
-    {'corp_name': 'NHN', 'corp_code': '00983271'},
-    {'corp_name': '조이시티', 'corp_code': '00397252'},
-    {'corp_name': '미투온', 'corp_code': '00965813'},
-    {'corp_name': '모비릭스', 'corp_code': '01210190'},
-    {'corp_name': '액토즈소프트', 'corp_code': '00348034'},
-    {'corp_name': '밸로프', 'corp_code': '01398151'},
-    {'corp_name': '썸에이지', 'corp_code': '01092901'}, # 넥써쓰 -> 썸에이지
-    {'corp_name': '시프트업', 'corp_code': '01384787'},
-    {'corp_name': '컴투스', 'corp_code': '00476498'},
-    {'corp_name': '스마일게이트엔터테인먼트', 'corp_code': '00809049'},
-    {'corp_name': '네오위즈홀딩스', 'corp_code': '00266952'},
-    {'corp_name': '더블유게임즈', 'corp_code': '01010110'},
-    {'corp_name': '위메이드맥스', 'corp_code': '00643656'},
-    {'corp_name': '데브시스터즈', 'corp_code': '01008762'},
-    {'corp_name': '웹젠', 'corp_code': '00405320'},
-    {'corp_name': '넵튠', 'corp_code': '01067808'},
-    {'corp_name': '컴투스홀딩스', 'corp_code': '00535746'},
-    {'corp_name': '고스트스튜디오', 'corp_code': '01416235'},
-    {'corp_name': '엠게임', 'corp_code': '00397058'},
-    {'corp_name': '위메이드플레이', 'corp_code': '00815767'},
-    {'corp_name': '넥써쓰', 'corp_code': '01042429'},
-    {'corp_name': '한빛소프트', 'corp_code': '00348292'},
-    {'corp_name': '스타코링크', 'corp_code': '00373571'}
-]
\ No newline at end of file
+    {'corp_name': '크래프톤', 'corp_code': '00760971', 'stock_code': '259960'},
+    {'corp_name': '엔씨소프트', 'corp_code': '00261443', 'stock_code': '036570'},
+    {'corp_name': '넷마블', 'corp_code': '00904672', 'stock_code': '251270'},
+    {'corp_name': '펄어비스', 'corp_code': '01152470', 'stock_code': '263750'},
+    {'corp_name': '카카오게임즈', 'corp_code': '01137383', 'stock_code': '293490'},
+    {'corp_name': '넥슨게임즈', 'corp_code': '01096341', 'stock_code': '225570'},
+    {'corp_name': '위메이드', 'corp_code': '00444329', 'stock_code': '112040'},
+    {'corp_name': '네오위즈', 'corp_code': '00628860', 'stock_code': '095660'},
+    {'corp_name': 'NHN', 'corp_code': '00983271', 'stock_code': '181710'},
+    {'corp_name': '조이시티', 'corp_code': '00397252', 'stock_code': '067000'},
+    {'corp_name': '미투온', 'corp_code': '00965813', 'stock_code': '201490'},
+    {'corp_name': '모비릭스', 'corp_code': '01210190', 'stock_code': '348030'},
+    {'corp_name': '액토즈소프트', 'corp_code': '00348034', 'stock_code': None},
+    {'corp_name': '밸로프', 'corp_code': '01398151', 'stock_code': None},
+    {'corp_name': '썸에이지', 'corp_code': '01092901', 'stock_code': None}, # 넥써쓰 -> 썸에이지
+    {'corp_name': '시프트업', 'corp_code': '01384787', 'stock_code': '462870'},
+    {'corp_name': '컴투스', 'corp_code': '00476498', 'stock_code': '078340'},
+    {'corp_name': '스마일게이트엔터테인먼트', 'corp_code': '00809049', 'stock_code': None},
+    {'corp_name': '네오위즈홀딩스', 'corp_code': '00266952', 'stock_code': '042420'},
+    {'corp_name': '더블유게임즈', 'corp_code': '01010110', 'stock_code': '192080'},
+    {'corp_name': '위메이드맥스', 'corp_code': '00643656', 'stock_code': '101730'},
+    {'corp_name': '데브시스터즈', 'corp_code': '01008762', 'stock_code': '194480'},
+    {'corp_name': '웹젠', 'corp_code': '00405320', 'stock_code': '069080'},
+    {'corp_name': '넵튠', 'corp_code': '01067808', 'stock_code': '217270'},
+    {'corp_name': '컴투스홀딩스', 'corp_code': '00535746', 'stock_code': '063080'},
+    {'corp_name': '고스트스튜디오', 'corp_code': '01416235', 'stock_code': '950190'},
+    {'corp_name': '엠게임', 'corp_code': '00397058', 'stock_code': '058630'},
+    {'corp_name': '위메이드플레이', 'corp_code': '00815767', 'stock_code': '123420'},
+    {'corp_name': '넥써쓰', 'corp_code': '01042429', 'stock_code': None},
+    {'corp_name': '한빛소프트', 'corp_code': '00348292', 'stock_code': '047080'},
+    {'corp_name': '스타코링크', 'corp_code': '00373571', 'stock_code': None}
+]
+
+# DART 기업코드 <-> 주가 심볼 (상장사만)
+CORP_CODE_TO_SYMBOL = {c['corp_code']: c['stock_code'] for c in SUPPORTED_COMPANIES if c['stock_code']}
+SYMBOL_TO_CORP_CODE = {symbol: corp_code for corp_code, symbol in CORP_CODE_TO_SYMBOL.items()}
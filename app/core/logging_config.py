@@ -0,0 +1,66 @@
+"""
+구조화 로깅 설정
+
+LOG_LEVEL (기본 INFO) 로 레벨을, LOG_FORMAT=json|text (기본 text) 로 출력 형식을 정합니다.
+extra 로 넘긴 필드(요청 구간 시간 등)는 json 에서는 필드로, text 에서는 메시지 뒤에 key=value 로 붙습니다.
+KPI 단위 상세 로그는 DEBUG 레벨이므로 기본 설정에서는 출력되지 않습니다.
+"""
+import json
+import logging
+import os
+import sys
+
+LOGGER_NAME = "kpi_compare"
+
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    """logger.info("...", extra={...}) 로 넘긴 필드"""
+    return {key: value for key, value in record.__dict__.items() if key not in _RESERVED_ATTRS and not key.startswith("_")}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(_extra_fields(record))
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        extra = _extra_fields(record)
+        if not extra:
+            return text
+        # 여러 줄(예외 트레이스)이 있으면 첫 줄 뒤에 붙여 메시지와 한 줄로 읽히게 합니다.
+        fields = " ".join(
+            f"{key}={json.dumps(value, ensure_ascii=False, default=str) if not isinstance(value, str) else value}"
+            for key, value in extra.items()
+        )
+        first, newline, rest = text.partition("\n")
+        return f"{first} {fields}{newline}{rest}"
+
+
+def configure_logging():
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    handler = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root = logging.getLogger(LOGGER_NAME)
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
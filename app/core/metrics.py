@@ -0,0 +1,162 @@
+"""
+프로세스 내 메트릭 (Prometheus 텍스트 형식)
+
+외부 라이브러리 없이 카운터, 게이지, 히스토그램을 라벨별로 누적하고
+/metrics 엔드포인트에서 Prometheus exposition 형식으로 내보냅니다.
+관측은 dict 조회와 정수 덧셈(히스토그램은 bisect 한 번)뿐이라 상시 켜 두어도 부담이 없습니다.
+"""
+import bisect
+import threading
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames, labelvalues, extra=()) -> str:
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _header(self):
+        return [f"# HELP {self.name} {_escape(self.description)}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._series[labelvalues] = self._series.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return self._series.get(labelvalues, 0)
+
+    def render(self):
+        lines = self._header()
+        for labelvalues, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, value, *labelvalues):
+        with self._lock:
+            self._series[labelvalues] = value
+
+
+class CallbackMetric(_Metric):
+    """렌더링 시점에 콜백으로 값을 읽는 메트릭. 콜백은 {라벨값 튜플: 값} 을 반환합니다."""
+
+    def __init__(self, name, description, callback, labelnames=(), type="gauge"):
+        super().__init__(name, description, labelnames)
+        self.callback = callback
+        self.type = type
+
+    def render(self):
+        lines = self._header()
+        for labelvalues, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labelvalues):
+        series = self._series.get(labelvalues)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labelvalues, [0] * (len(self.buckets) + 2))
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def snapshot(self) -> dict:
+        """라벨 값별로 누적 버킷 카운트, 합계, 개수를 반환합니다."""
+        result = {}
+        for labelvalues, series in list(self._series.items()):
+            cumulative, running = [], 0
+            for count in series[:len(self.buckets)]:
+                running += count
+                cumulative.append(running)
+            result[labelvalues] = {"buckets": cumulative, "sum": series[-2], "count": series[-1]}
+        return result
+
+    def render(self):
+        lines = self._header()
+        for labelvalues, data in sorted(self.snapshot().items()):
+            for bound, count in zip(self.buckets, data["buckets"]):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, [('le', _format_value(float(bound)))])} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, [('le', '+Inf')])} {data['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labelvalues)} {_format_value(float(data['sum']))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labelvalues)} {data['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, description, labelnames=()) -> Counter:
+        return self.register(Counter(name, description, labelnames))
+
+    def gauge(self, name, description, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, description, labelnames))
+
+    def histogram(self, name, description, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, description, labelnames, buckets))
+
+    def callback(self, name, description, callback, labelnames=(), type="gauge") -> CallbackMetric:
+        """같은 이름으로 다시 등록하면 콜백을 교체합니다 (서비스 재생성 시 최신 객체를 가리키도록)."""
+        metric = self.register(CallbackMetric(name, description, callback, labelnames, type))
+        metric.callback = callback
+        return metric
+
+    def metrics(self):
+        return list(self._metrics.values())
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,49 @@
+"""
+Single-flight 요청 병합
+
+같은 키로 동시에 들어온 캐시 미스는 하나의 업스트림 작업만 실행하고
+나머지 호출은 그 작업의 결과(또는 예외)를 함께 기다립니다.
+"""
+import asyncio
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """
+        key 에 대한 작업이 진행 중이면 그 결과를 기다리고, 없으면 fn() 을 실행합니다.
+        작업은 별도 Task 로 실행되므로 먼저 요청한 클라이언트가 연결을 끊어도 나머지 대기자는 영향받지 않습니다.
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, _key=key: self._forget(_key, _t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # 모든 대기자가 취소된 경우에도 "exception was never retrieved" 경고가 나지 않도록 합니다.
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight(),
+        }
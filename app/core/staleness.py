@@ -0,0 +1,57 @@
+"""
+요청 단위 데이터 신선도 표시
+
+만료된 캐시 값(stale)이나 DART 장애 중 마지막으로 받아 둔 값(last-known-good)으로 응답할 때
+서비스 코드가 mark_stale() 로 표시해 둡니다. 미들웨어는 요청마다 track_staleness() 를 열어 두었다가
+표시가 있으면 응답에 Warning: 110 헤더를 붙이고, 서비스는 같은 방법으로 응답 본문에 stale 플래그를 넣습니다.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from .metrics import REGISTRY
+
+STALE_MARKS = REGISTRY.counter(
+    "kpi_stale_served_total", "만료된 값으로 응답한 수 (reason=revalidating|stale_facts|upstream_error)", labelnames=("reason",),
+)
+
+_current = contextvars.ContextVar("kpi_response_staleness", default=None)
+
+STALE_WARNING = '110 - "Response is Stale"'
+
+
+class Staleness:
+    __slots__ = ("stale", "reasons")
+
+    def __init__(self):
+        self.stale = False
+        self.reasons = set()
+
+    def mark(self, reason: str):
+        self.stale = True
+        self.reasons.add(reason)
+
+
+@contextmanager
+def track_staleness():
+    """블록 안에서 표시된 stale 여부를 모읍니다. 바깥 블록(미들웨어 등)에도 그대로 전달됩니다."""
+    parent = _current.get()
+    staleness = Staleness()
+    token = _current.set(staleness)
+    try:
+        yield staleness
+    finally:
+        _current.reset(token)
+        if parent is not None and staleness.stale:
+            parent.stale = True
+            parent.reasons |= staleness.reasons
+
+
+def mark_stale(reason: str):
+    """
+    reason: revalidating(만료된 캐시 값, 백그라운드 갱신 중), stale_facts(만료된 재무 팩트로 계산),
+    upstream_error(DART 장애로 마지막 값 사용)
+    """
+    STALE_MARKS.inc(reason)
+    staleness = _current.get()
+    if staleness is not None:
+        staleness.mark(reason)
@@ -0,0 +1,201 @@
+"""
+2단계(메모리 LRU + SQLite) 캐시
+
+1단계는 프로세스 내 LRU, 2단계는 모든 uvicorn 워커가 함께 읽는 로컬 SQLite 파일입니다.
+값은 JSON 으로 직렬화되며, ttl=None 으로 저장한 항목은 만료되지 않습니다(확정된 과거 보고서 등).
+만료된 항목도 stale_ttl 동안은 지우지 않고 남겨 두어 stale-while-revalidate 에 사용합니다.
+stale_if_error_ttl 이 더 길면 그 기간까지 남겨 두었다가, 업스트림 장애로 새 값을 받지 못했을 때만 마지막 값으로 씁니다.
+SQLite 접근은 이벤트 루프를 막지 않도록 스레드에서 실행합니다.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .metrics import REGISTRY
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "kpi_cache_requests_total", "캐시 조회 결과 (result=memory_hit|disk_hit|stale|miss)", labelnames=("cache", "result"),
+)
+CACHE_EVICTIONS = REGISTRY.counter("kpi_cache_evictions_total", "메모리 LRU 에서 밀려난 항목 수", labelnames=("cache",))
+
+
+def _namespace(key: str) -> str:
+    """캐시 키의 접두어(kpi, reports, fin ...)를 메트릭 라벨로 사용합니다."""
+    return key.split("_", 1)[0]
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class TieredCache:
+    def __init__(self, path: str, memory_maxsize: int = 1024, default_ttl: float = 600, stale_ttl: float = 86400,
+                 stale_if_error_ttl: float = None):
+        self.path = path
+        self.memory_maxsize = memory_maxsize
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        # 만료 후 항목을 보존하는 기간 (stale-while-revalidate 와 stale-if-error 중 긴 쪽)
+        self.retention = max(stale_ttl, stale_if_error_ttl or 0)
+        self._memory = OrderedDict()  # key -> (value, expires_at)
+        self._conn = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---- 2단계: SQLite ----
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            # WAL 모드: 다른 워커가 쓰는 동안에도 읽기가 막히지 않습니다.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time() - self.retention,)
+            )
+            self._conn = conn
+        return self._conn
+
+    def _disk_get(self, key):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _disk_set(self, key, value, expires_at):
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, updated_at) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, time.time()),
+            )
+
+    # ---- 1단계: 메모리 LRU ----
+    def _is_retained(self, expires_at, now) -> bool:
+        return expires_at is None or expires_at + self.retention > now
+
+    def is_revalidatable(self, expires_at, now: float = None) -> bool:
+        """만료된 값을 바로 돌려주고 백그라운드에서 갱신해도 되는(stale_ttl 이내) 항목인지."""
+        return expires_at is None or expires_at + self.stale_ttl > (now or time.time())
+
+    def _memory_get(self, key, now):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if not self._is_retained(entry[1], now):
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry
+
+    def _memory_set(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_maxsize:
+            evicted_key, _ = self._memory.popitem(last=False)
+            self.evictions += 1
+            CACHE_EVICTIONS.inc(_namespace(evicted_key))
+
+    # ---- 공개 API ----
+    async def lookup(self, key, record: bool = True):
+        """
+        (값, fresh 여부, 만료 시각) 을 반환합니다. 만료 후 보존 기간 이내의 항목은 fresh=False 로 반환되고,
+        그보다 오래되었거나 없으면 None 을 반환합니다. 바로 써도 되는지는 is_revalidatable() 로 구분합니다.
+        record=False 이면 히트·미스 통계와 메트릭에 세지 않습니다 (캐시 워머처럼 상태만 들여다볼 때).
+        """
+        now = time.time()
+        namespace = _namespace(key)
+        entry = self._memory_get(key, now)
+        tier = "memory_hit"
+        if entry is None:
+            entry = await asyncio.to_thread(self._disk_get, key)
+            if entry is not None and not self._is_retained(entry[1], now):
+                entry = None
+            if entry is not None:
+                self._memory_set(key, entry[0], entry[1])
+            tier = "disk_hit"
+        if entry is None:
+            if record:
+                self.misses += 1
+                CACHE_REQUESTS.inc(namespace, "miss")
+            return None
+        fresh = entry[1] is None or entry[1] > now
+        if not record:
+            return entry[0], fresh, entry[1]
+        if fresh:
+            self.hits += 1
+            if tier == "disk_hit":
+                self.disk_hits += 1
+            CACHE_REQUESTS.inc(namespace, tier)
+        else:
+            self.stale_hits += 1
+            CACHE_REQUESTS.inc(namespace, "stale")
+        return entry[0], fresh, entry[1]
+
+    async def get(self, key):
+        """만료되지 않은 값을 반환합니다. 없거나 만료되었으면 None."""
+        entry = await self.lookup(key)
+        if entry is None or not entry[1]:
+            return None
+        return entry[0]
+
+    async def set(self, key, value, ttl="default"):
+        """ttl 초 동안 값을 저장합니다. ttl=None 이면 만료되지 않습니다."""
+        if ttl == "default":
+            ttl = self.default_ttl
+        expires_at = None if ttl is None else time.time() + ttl
+        self._memory_set(key, value, expires_at)
+        await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    def _disk_delete_prefix(self, prefix: str):
+        with self._lock:
+            self._connection().execute(
+                "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            )
+
+    def _disk_clear(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM cache_entries")
+
+    async def delete_prefix(self, prefix: str):
+        for key in [k for k in self._memory if k.startswith(prefix)]:
+            del self._memory[key]
+        await asyncio.to_thread(self._disk_delete_prefix, prefix)
+
+    async def clear(self):
+        self._memory.clear()
+        await asyncio.to_thread(self._disk_clear)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,63 @@
+"""
+요청 단위 타이밍 스팬
+
+미들웨어가 요청마다 RequestTimer 를 contextvar 에 올려 두고, 서비스 코드는
+`with span("dart_fetch"):` 처럼 구간을 표시합니다. 구간 시간은 항상 히스토그램에 누적되고,
+LOG_SPANS=true 일 때만 요청 종료 시 JSON 로그 한 줄로 출력됩니다.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from .metrics import REGISTRY
+
+SPAN_SECONDS = REGISTRY.histogram(
+    "kpi_request_span_seconds",
+    "요청 처리 구간(metadata, dart_fetch, parse, evaluate)별 소요 시간",
+    labelnames=("span",),
+)
+
+_current_timer = contextvars.ContextVar("kpi_request_timer", default=None)
+
+
+class RequestTimer:
+    __slots__ = ("spans", "started")
+
+    def __init__(self):
+        self.spans = {}
+        self.started = time.perf_counter()
+
+    def add(self, name: str, seconds: float):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "spans_ms": {name: round(seconds * 1000, 3) for name, seconds in self.spans.items()},
+        }
+
+
+def start_request_timer():
+    timer = RequestTimer()
+    return timer, _current_timer.set(timer)
+
+
+def stop_request_timer(token):
+    _current_timer.reset(token)
+
+
+def record_span(name: str, seconds: float):
+    """다른 구간과 겹쳐 진행되어 with 블록으로 감쌀 수 없는 구간(스트리밍 파싱 등)의 누적 시간을 기록합니다."""
+    SPAN_SECONDS.observe(seconds, name)
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(name, seconds)
+
+
+@contextmanager
+def span(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - started)
@@ -0,0 +1,121 @@
+"""
+DART 회로 차단기
+
+최근 window 초 동안의 호출 결과를 모아, 호출이 min_calls 이상이고 실패율이 failure_rate 이상이면 회로를 엽니다(open).
+열려 있는 동안에는 DART 로 보내지 않고 바로 실패시켜, 장애 중에도 요청이 read 타임아웃만큼 붙잡히지 않게 합니다.
+open_seconds 가 지나면 half-open 으로 바뀌어 시험 호출 하나만 보내고, 성공하면 닫고 실패하면 다시 엽니다.
+실패로 세는 것은 DART 가 응답하지 못한 경우(연결 오류·타임아웃·HTTP 5xx·점검 중)뿐입니다.
+"""
+import os
+import time
+from collections import deque
+
+from ...core.logging_config import get_logger
+
+logger = get_logger("circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# 메트릭용 상태 값
+STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+class CircuitBreaker:
+    """
+    호스트 하나에 대한 회로 차단기. 기본값은 환경변수로 덮어쓸 수 있습니다.
+        DART_BREAKER_WINDOW        실패율을 계산하는 최근 구간(초)
+        DART_BREAKER_MIN_CALLS     구간 안 호출이 이보다 적으면 열지 않습니다
+        DART_BREAKER_FAILURE_RATE  회로를 여는 실패율 (0~1)
+        DART_BREAKER_OPEN_SECONDS  연 뒤 시험 호출을 보내기까지 기다리는 시간(초)
+    """
+
+    def __init__(self, name: str, window: float = None, min_calls: int = None, failure_rate: float = None,
+                 open_seconds: float = None):
+        self.name = name
+        self.window = window or _env_float("DART_BREAKER_WINDOW", 30.0)
+        self.min_calls = min_calls or _env_int("DART_BREAKER_MIN_CALLS", 10)
+        self.failure_rate = failure_rate or _env_float("DART_BREAKER_FAILURE_RATE", 0.5)
+        self.open_seconds = open_seconds or _env_float("DART_BREAKER_OPEN_SECONDS", 30.0)
+        self.state = CLOSED
+        self.opened = 0
+        self._results = deque()  # (시각, 실패 여부)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+
+    def _trim(self, now: float):
+        while self._results and self._results[0][0] < now - self.window:
+            _, failed = self._results.popleft()
+            self._failures -= failed
+
+    def allow(self) -> bool:
+        """지금 DART 로 호출을 보내도 되는지. half-open 에서는 시험 호출 하나만 허용합니다."""
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self._opened_at < self.open_seconds:
+                return False
+            self.state = HALF_OPEN
+            self._probe_started = None
+        # 시험 호출이 결과 없이 사라졌으면(취소 등) open_seconds 뒤에 다시 하나를 보냅니다.
+        if self._probe_started is not None and now - self._probe_started < self.open_seconds:
+            return False
+        self._probe_started = now
+        return True
+
+    def retry_after(self) -> float:
+        if self.state == OPEN:
+            return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+        return self.open_seconds if self.state == HALF_OPEN else 0.0
+
+    def record_success(self):
+        if self.state != CLOSED:
+            logger.info("🔌 [회로 닫힘] %s 시험 호출 성공, DART 호출을 재개합니다", self.name)
+            self.state = CLOSED
+            self._results.clear()
+            self._failures = 0
+        self._record(False)
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self._open("시험 호출 실패")
+            return
+        self._record(True)
+        calls = len(self._results)
+        if self.state == CLOSED and calls >= self.min_calls and self._failures / calls >= self.failure_rate:
+            self._open(f"최근 {self.window:.0f}초 {calls}회 중 {self._failures}회 실패")
+
+    def _record(self, failed: bool):
+        now = time.monotonic()
+        self._results.append((now, failed))
+        self._failures += failed
+        self._trim(now)
+
+    def _open(self, reason: str):
+        self.state = OPEN
+        self.opened += 1
+        self._opened_at = time.monotonic()
+        self._probe_started = None
+        logger.warning("🔌 [회로 열림] %s: %s → %.0f초 동안 DART 호출을 바로 실패시킵니다", self.name, reason, self.open_seconds)
+
+    def stats(self) -> dict:
+        self._trim(time.monotonic())
+        return {
+            "state": self.state,
+            "calls": len(self._results),
+            "failures": self._failures,
+            "opened": self.opened,
+            "retry_after": round(self.retry_after(), 1),
+        }
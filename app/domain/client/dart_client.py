@@ -0,0 +1,265 @@
+"""
+DART OpenAPI HTTP 클라이언트
+
+프로세스 전체에서 하나의 httpx.AsyncClient 커넥션 풀을 공유합니다.
+요청마다 TCP/TLS 핸드셰이크를 새로 하지 않도록 keep-alive 연결을 재사용하고,
+호스트별 세마포어로 DART 로 나가는 동시 요청 수를 제한합니다.
+모든 호출은 DartRateLimiter 로 호출 속도와 일일 예산을 확인한 뒤 나갑니다.
+호스트별 회로 차단기가 DART 장애 중에는 호출을 바로 실패시키고, 일시적인 실패는 지터가 섞인 지수 백오프로 다시 시도합니다.
+"""
+import asyncio
+import importlib.util
+import os
+import random
+import time
+
+import httpx
+from fastapi import HTTPException
+
+from ...core.logging_config import get_logger
+from ...core.metrics import REGISTRY
+from .circuit_breaker import STATE_CODES, CircuitBreaker
+from .dart_rate_limiter import DartRateLimiter
+
+logger = get_logger("dart_client")
+
+DART_API_URL = os.getenv("DART_API_URL", "https://opendart.fss.or.kr/api")
+# 정상, 조회된 데이터 없음, 호출 한도 초과, 시스템 점검·정의되지 않은 오류
+DART_OK_STATUSES = ("000", "013")
+DART_QUOTA_EXCEEDED_STATUS = "020"
+DART_UNAVAILABLE_STATUSES = ("800", "900")
+
+DART_CALL_SECONDS = REGISTRY.histogram(
+    "kpi_dart_request_duration_seconds",
+    "DART API 호출 지연 (status: DART 상태코드, http_<코드>, connection_error)",
+    labelnames=("endpoint", "status"),
+)
+DART_IN_FLIGHT = REGISTRY.gauge("kpi_dart_requests_in_flight", "진행 중인 DART API 호출 수", labelnames=("endpoint",))
+DART_RETRIES = REGISTRY.counter("kpi_dart_retries_total", "일시적인 실패로 다시 보낸 DART 호출 수", labelnames=("endpoint",))
+DART_CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "kpi_dart_circuit_rejections_total", "회로가 열려 있어 보내지 않고 실패시킨 DART 호출 수", labelnames=("endpoint",),
+)
+
+
+class DartUnavailableError(HTTPException):
+    """DART 가 응답하지 못한 오류 (연결 실패·타임아웃·HTTP 5xx·점검 중). 재시도와 회로 차단, stale 응답의 대상입니다."""
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class DartClientSettings:
+    """DART 클라이언트 연결 설정. 기본값은 환경변수(DART_HTTP_*)로 덮어쓸 수 있습니다."""
+
+    def __init__(
+        self,
+        max_connections: int = None,
+        max_keepalive_connections: int = None,
+        keepalive_expiry: float = None,
+        per_host_concurrency: int = None,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+        write_timeout: float = None,
+        pool_timeout: float = None,
+        http2: bool = None,
+        retries: int = None,
+        retry_backoff: float = None,
+        retry_backoff_max: float = None,
+        retry_deadline: float = None,
+    ):
+        self.max_connections = max_connections or _env_int("DART_HTTP_MAX_CONNECTIONS", 20)
+        self.max_keepalive_connections = max_keepalive_connections or _env_int("DART_HTTP_MAX_KEEPALIVE", 10)
+        self.keepalive_expiry = keepalive_expiry or _env_float("DART_HTTP_KEEPALIVE_EXPIRY", 30.0)
+        self.per_host_concurrency = per_host_concurrency or _env_int("DART_HTTP_PER_HOST_CONCURRENCY", 8)
+        self.connect_timeout = connect_timeout or _env_float("DART_HTTP_CONNECT_TIMEOUT", 5.0)
+        self.read_timeout = read_timeout or _env_float("DART_HTTP_READ_TIMEOUT", 15.0)
+        self.write_timeout = write_timeout or _env_float("DART_HTTP_WRITE_TIMEOUT", 5.0)
+        self.pool_timeout = pool_timeout or _env_float("DART_HTTP_POOL_TIMEOUT", 5.0)
+        if http2 is None:
+            http2 = os.getenv("DART_HTTP2", "auto").lower() in ("auto", "1", "true", "yes")
+        # h2 패키지가 없으면 HTTP/1.1 keep-alive 로 동작합니다.
+        self.http2 = http2 and _http2_available()
+        # 재시도 횟수, 백오프 시작값·상한(초), 첫 시도부터 재시도를 시작할 수 있는 시간 한도(초)
+        self.retries = retries if retries is not None else _env_int("DART_HTTP_RETRIES", 2)
+        self.retry_backoff = retry_backoff or _env_float("DART_HTTP_RETRY_BACKOFF", 0.2)
+        self.retry_backoff_max = retry_backoff_max or _env_float("DART_HTTP_RETRY_BACKOFF_MAX", 2.0)
+        self.retry_deadline = retry_deadline or _env_float("DART_HTTP_RETRY_DEADLINE", 20.0)
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+
+class DartClient:
+    def __init__(self, settings: DartClientSettings = None, rate_limiter: DartRateLimiter = None):
+        self.settings = settings or DartClientSettings()
+        self.rate_limiter = rate_limiter or DartRateLimiter()
+        self._client = None
+        self._host_semaphores = {}
+        self._breakers = {}
+        REGISTRY.callback(
+            "kpi_dart_circuit_state", "DART 회로 차단기 상태 (0=closed, 1=half_open, 2=open)",
+            lambda: {(host,): STATE_CODES[breaker.state] for host, breaker in self._breakers.items()},
+            labelnames=("host",),
+        )
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=self.settings.limits(),
+            timeout=self.settings.timeout(),
+            http2=self.settings.http2,
+        )
+
+    async def start(self):
+        if self._client is None:
+            self._client = self._build_client()
+            protocol = "HTTP/2" if self.settings.http2 else "HTTP/1.1"
+            logger.info("🔌 [DART 클라이언트] 커넥션 풀 생성 (%s, max=%d)", protocol, self.settings.max_connections)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await self.rate_limiter.aclose()
+
+    def _semaphore_for(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.settings.per_host_concurrency)
+        return semaphore
+
+    def _breaker_for(self, url: str) -> CircuitBreaker:
+        host = httpx.URL(url).host
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host)
+        return breaker
+
+    def _retry_delay(self, attempt: int) -> float:
+        # full jitter: 여러 요청이 같은 순간에 다시 몰리지 않도록 0 ~ 지수 백오프 사이에서 고릅니다.
+        return random.uniform(0, min(self.settings.retry_backoff_max, self.settings.retry_backoff * 2 ** attempt))
+
+    def _check_status(self, data: dict):
+        """
+        DART 상태코드를 확인하고 결과를 제한기에 알립니다.
+        020 은 429, 점검·시스템 오류(800/900)는 503(DartUnavailableError), 그 밖의 오류는 400 으로 변환합니다.
+        """
+        status = data.get("status")
+        if status == DART_QUOTA_EXCEEDED_STATUS:
+            self.rate_limiter.on_quota_exceeded()
+            raise HTTPException(status_code=429, detail=f"DART API 호출 한도 초과: {data.get('message')}")
+        if status in DART_UNAVAILABLE_STATUSES:
+            raise DartUnavailableError(status_code=503, detail=f"DART API 일시 장애: {data.get('message')}")
+        if status not in DART_OK_STATUSES:
+            raise HTTPException(status_code=400, detail=f"DART API 오류: {data.get('message')}")
+        self.rate_limiter.on_success()
+
+    async def _send_once(self, url: str, endpoint: str, send):
+        async with self._semaphore_for(url):
+            DART_IN_FLIGHT.inc(endpoint)
+            started = time.perf_counter()
+            status = "connection_error"
+            try:
+                data = await send()
+                status = str(data.get("status"))
+                self._check_status(data)
+                return data
+            except httpx.HTTPStatusError as e:
+                status = f"http_{e.response.status_code}"
+                error = DartUnavailableError if e.response.status_code >= 500 else HTTPException
+                raise error(status_code=e.response.status_code, detail=f"DART API 요청 실패: {e.response.text}")
+            except httpx.RequestError as e:
+                raise DartUnavailableError(status_code=503, detail=f"DART API 연결 실패: {e}")
+            finally:
+                DART_IN_FLIGHT.dec(endpoint)
+                DART_CALL_SECONDS.observe(time.perf_counter() - started, endpoint, status)
+
+    async def _call(self, url: str, priority, send):
+        """
+        회로 차단기와 호출 제한기를 거쳐 send() 를 보냅니다. DART 조회는 모두 GET 이라 다시 보내도 안전하므로
+        DartUnavailableError 는 retries 번까지, 첫 시도부터 retry_deadline 초 안에서만 다시 시도합니다.
+        """
+        if self._client is None:
+            await self.start()
+        endpoint = url.rsplit("/", 1)[-1]
+        breaker = self._breaker_for(url)
+        deadline = time.monotonic() + self.settings.retry_deadline
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                DART_CIRCUIT_REJECTIONS.inc(endpoint)
+                retry_after = breaker.retry_after()
+                raise DartUnavailableError(
+                    status_code=503,
+                    detail=f"DART API 장애로 호출을 잠시 멈췄습니다. {retry_after:.0f}초 후 다시 시도해 주세요.",
+                    headers={"Retry-After": str(int(retry_after) + 1)},
+                )
+            await self.rate_limiter.acquire(priority)
+            try:
+                result = await self._send_once(url, endpoint, send)
+            except DartUnavailableError as e:
+                breaker.record_failure()
+                delay = self._retry_delay(attempt)
+                if attempt >= self.settings.retries or time.monotonic() + delay > deadline:
+                    raise
+                attempt += 1
+                DART_RETRIES.inc(endpoint)
+                logger.warning("🔁 [DART 재시도] %s %d회째 (%.2f초 후): %s", endpoint, attempt, delay, e.detail)
+                await asyncio.sleep(delay)
+                continue
+            except HTTPException:
+                # 4xx·020 등은 DART 가 응답했다는 뜻이므로 회로 차단기에는 성공으로 기록합니다.
+                breaker.record_success()
+                raise
+            breaker.record_success()
+            return result
+
+    async def get_json(self, url: str, params: dict, priority: int = None):
+        """
+        DART API 를 호출해 JSON 을 반환합니다. 정상(000)/데이터 없음(013) 외의 상태는 HTTPException 으로 변환합니다.
+        priority 를 주지 않으면 request_priority() 로 지정한 값(기본 interactive)을 씁니다.
+        """
+        async def send():
+            response = await self._client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+        return await self._call(url, priority, send)
+
+    async def get_streamed(self, url: str, params: dict, parser, priority: int = None):
+        """
+        응답 본문을 전부 받기 전에 청크 단위로 parser.feed() 에 넘깁니다.
+        parser.close() 가 돌려준 결과의 status 로 get_json 과 같은 오류 처리를 하고, 다시 시도할 때는 parser.reset() 부터 합니다.
+        """
+        async def send():
+            parser.reset()
+            async with self._client.stream("GET", url, params=params) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    parser.feed(chunk)
+            return parser.close()
+        return await self._call(url, priority, send)
@@ -0,0 +1,346 @@
+"""
+DART 호출 한도 관리 (토큰 버킷 + 일일 예산 + 우선순위)
+
+DART OpenAPI 는 인증키별로 호출 수를 제한하고, 넘기면 상태코드 020 을 돌려줍니다.
+DartClient 의 모든 호출은 나가기 전에 DartRateLimiter.acquire() 를 거칩니다.
+
+- 토큰 버킷: 초당 rate 개씩 채워지고 burst 개까지 쌓이는 토큰으로 순간 호출 속도를 제한합니다.
+- 일일 예산: KST 날짜별 호출 수를 SQLite 에 원자적으로 누적해 재시작이나 여러 워커 사이에서도 이어집니다.
+  백그라운드·배치 호출은 예산의 background_budget_ratio 까지만 쓰고, 나머지는 사용자 요청 몫으로 남깁니다.
+- 우선순위: 토큰을 기다리는 호출은 interactive → background → batch 순서로 깨웁니다.
+  호출하는 쪽은 request_priority() 블록으로 우선순위를 지정합니다 (기본 interactive).
+- 020 응답을 받으면 점점 길어지는 시간 동안 호출을 멈추고 속도를 절반으로 낮춘 뒤, 성공할 때마다 조금씩 되돌립니다.
+"""
+import asyncio
+import contextlib
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+
+from ...core.logging_config import get_logger
+from ...core.metrics import REGISTRY
+
+logger = get_logger("dart_rate_limiter")
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background", PRIORITY_BATCH: "batch"}
+
+# DART 일일 한도는 한국 시간 자정에 초기화됩니다.
+KST = timezone(timedelta(hours=9))
+DART_BUDGET_PATH = os.path.join(os.path.dirname(__file__), '../../data/cache/dart_budget.sqlite3')
+# 속도를 낮춘 뒤 성공 1회마다 되돌리는 비율, 낮출 수 있는 하한 비율
+RATE_RECOVERY_STEP = 0.05
+RATE_FLOOR_RATIO = 0.1
+
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "kpi_dart_rate_limit_wait_seconds", "DART 호출 전 토큰을 기다린 시간", labelnames=("priority",),
+)
+BUDGET_REJECTIONS = REGISTRY.counter(
+    "kpi_dart_budget_rejections_total", "한도 때문에 DART 로 보내지 않고 거절한 호출 수 (reason=budget|paused)",
+    labelnames=("priority", "reason"),
+)
+QUOTA_EXCEEDED = REGISTRY.counter("kpi_dart_quota_exceeded_total", "DART 020(호출 한도 초과) 응답 수")
+
+_priority = ContextVar("dart_request_priority", default=PRIORITY_INTERACTIVE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dart_budget (
+    day TEXT PRIMARY KEY,
+    used INTEGER NOT NULL
+)
+"""
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _today() -> str:
+    return datetime.now(KST).date().isoformat()
+
+
+@contextlib.contextmanager
+def request_priority(priority: int):
+    """블록 안(과 그 안에서 만든 Task)에서 나가는 DART 호출의 우선순위를 지정합니다."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class DailyBudgetStore:
+    """KST 날짜별 DART 호출 수. 여러 워커가 같은 파일을 쓰므로 증가는 SQL 한 문장으로 처리합니다."""
+
+    def __init__(self, path: str, keep_days: int = 7):
+        self.path = path
+        self.keep_days = keep_days
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            oldest = (datetime.now(KST).date() - timedelta(days=self.keep_days)).isoformat()
+            conn.execute("DELETE FROM dart_budget WHERE day < ?", (oldest,))
+            self._conn = conn
+        return self._conn
+
+    def used(self, day: str) -> int:
+        with self._lock:
+            row = self._connection().execute("SELECT used FROM dart_budget WHERE day = ?", (day,)).fetchone()
+        return row[0] if row else 0
+
+    def consume(self, day: str, amount: int = 1) -> int:
+        """amount 만큼 더하고 (다른 워커 몫까지 포함한) 그날 누적 호출 수를 반환합니다. 음수면 되돌립니다."""
+        with self._lock:
+            row = self._connection().execute(
+                "INSERT INTO dart_budget (day, used) VALUES (?, max(?, 0)) "
+                "ON CONFLICT(day) DO UPDATE SET used = max(used + ?, 0) RETURNING used",
+                (day, amount, amount),
+            ).fetchone()
+        return row[0]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class DartRateLimiter:
+    """
+    DART 호출 속도·일일 예산 제한기. 기본값은 환경변수로 덮어쓸 수 있습니다.
+        DART_RATE_PER_SECOND  초당 호출 수 (0 이면 속도 제한 없음)
+        DART_RATE_BURST       한 번에 몰아서 보낼 수 있는 호출 수
+        DART_DAILY_BUDGET     하루 호출 예산 (0 이면 예산 제한 없음)
+        DART_BACKGROUND_BUDGET_RATIO  백그라운드·배치 호출이 쓸 수 있는 예산 비율
+        DART_QUOTA_BACKOFF / DART_QUOTA_BACKOFF_MAX  020 응답 후 호출을 멈추는 시간(초)의 시작값·상한
+        DART_RATE_MAX_WAIT    멈춘 상태에서 사용자 요청이 기다리는 최대 시간(초). 넘으면 바로 429 로 거절합니다.
+        DART_BUDGET_PATH      일일 호출 수를 기록하는 SQLite 파일
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float = None,
+        burst: int = None,
+        daily_budget: int = None,
+        background_budget_ratio: float = None,
+        backoff: float = None,
+        backoff_max: float = None,
+        max_wait: float = None,
+        path: str = None,
+    ):
+        self.rate = rate_per_second if rate_per_second is not None else _env_float("DART_RATE_PER_SECOND", 10.0)
+        self.burst = burst or _env_int("DART_RATE_BURST", 20)
+        self.daily_budget = daily_budget if daily_budget is not None else _env_int("DART_DAILY_BUDGET", 20000)
+        self.background_budget_ratio = (
+            background_budget_ratio if background_budget_ratio is not None
+            else _env_float("DART_BACKGROUND_BUDGET_RATIO", 0.8)
+        )
+        self.backoff = backoff or _env_float("DART_QUOTA_BACKOFF", 5.0)
+        self.backoff_max = backoff_max or _env_float("DART_QUOTA_BACKOFF_MAX", 300.0)
+        self.max_wait = max_wait if max_wait is not None else _env_float("DART_RATE_MAX_WAIT", 10.0)
+        self.store = DailyBudgetStore(path or os.getenv("DART_BUDGET_PATH", DART_BUDGET_PATH))
+
+        self.current_rate = self.rate
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._waiters = []  # (우선순위, 도착 순서, Future) 힙
+        self._sequence = itertools.count()
+        self._dispatcher = None
+        self._paused_until = 0.0
+        self._quota_strikes = 0
+        self._day = None
+        self._used = 0
+        self._register_metrics()
+
+    def _register_metrics(self):
+        REGISTRY.callback("kpi_dart_budget_used", "오늘(KST) 사용한 DART 호출 수", lambda: {(): self.used()})
+        REGISTRY.callback(
+            "kpi_dart_budget_remaining", "오늘(KST) 남은 DART 호출 예산 (priority 별 허용량 기준)",
+            lambda: {(PRIORITY_NAMES[p],): self.remaining(p) for p in PRIORITY_NAMES} if self.daily_budget > 0 else {},
+            labelnames=("priority",),
+        )
+        REGISTRY.callback("kpi_dart_rate_limit_tokens", "토큰 버킷에 남은 토큰 수", lambda: {(): round(self.tokens(), 2)})
+        REGISTRY.callback("kpi_dart_rate_limit_rate", "현재 허용하는 초당 DART 호출 수", lambda: {(): self.current_rate})
+        REGISTRY.callback(
+            "kpi_dart_rate_limit_queued", "토큰을 기다리는 DART 호출 수", self._queued_by_priority, labelnames=("priority",),
+        )
+        REGISTRY.callback(
+            "kpi_dart_rate_limit_paused_seconds", "020 응답으로 호출을 멈춘 남은 시간", lambda: {(): round(self.paused_for(), 1)},
+        )
+
+    # ---- 상태 조회 ----
+    def used(self) -> int:
+        return self._used if self._day == _today() else 0
+
+    def allowance(self, priority: int) -> int:
+        if priority == PRIORITY_INTERACTIVE:
+            return self.daily_budget
+        return int(self.daily_budget * self.background_budget_ratio)
+
+    def remaining(self, priority: int = PRIORITY_INTERACTIVE) -> int:
+        return max(0, self.allowance(priority) - self.used())
+
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def _queued_by_priority(self) -> dict:
+        queued = {(name,): 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[(PRIORITY_NAMES[priority],)] += 1
+        return queued
+
+    def stats(self) -> dict:
+        return {
+            "used": self.used(),
+            "remaining": self.remaining() if self.daily_budget > 0 else None,
+            "tokens": round(self.tokens(), 2),
+            "rate": self.current_rate,
+            "queued": sum(self._queued_by_priority().values()),
+            "paused_for": round(self.paused_for(), 1),
+        }
+
+    # ---- 호출 허가 ----
+    async def acquire(self, priority: int = None):
+        """
+        DART 호출 하나를 보내도 될 때까지 기다립니다.
+        일일 예산을 다 썼거나, 020 으로 멈춘 시간이 max_wait 보다 길게 남았으면 기다리지 않고 429 로 거절합니다.
+        """
+        priority = current_priority() if priority is None else priority
+        name = PRIORITY_NAMES[priority]
+        if self.daily_budget > 0:
+            await self._sync_day()
+            if self._used >= self.allowance(priority):
+                self._reject(priority, "budget")
+
+        paused_for = self.paused_for()
+        if paused_for > self.max_wait and priority == PRIORITY_INTERACTIVE:
+            self._reject(priority, "paused", paused_for)
+
+        if self.rate > 0:
+            started = time.perf_counter()
+            await self._take_token(priority)
+            RATE_LIMIT_WAIT_SECONDS.observe(time.perf_counter() - started, name)
+        elif paused_for > 0:
+            await asyncio.sleep(paused_for)
+
+        if self.daily_budget > 0:
+            # 다른 워커와 동시에 마지막 예산을 가져간 경우를 위해 증가 후 다시 확인합니다.
+            self._used = await asyncio.to_thread(self.store.consume, self._day)
+            if self._used > self.allowance(priority):
+                self._used = await asyncio.to_thread(self.store.consume, self._day, -1)
+                self._reject(priority, "budget")
+
+    async def _sync_day(self):
+        today = _today()
+        if today != self._day:
+            self._used = await asyncio.to_thread(self.store.used, today)
+            self._day = today
+
+    def _reject(self, priority: int, reason: str, retry_after: float = None):
+        BUDGET_REJECTIONS.inc(PRIORITY_NAMES[priority], reason)
+        if reason == "budget":
+            tomorrow = datetime.combine(datetime.now(KST).date() + timedelta(days=1), datetime.min.time(), KST)
+            retry_after = (tomorrow - datetime.now(KST)).total_seconds()
+            detail = f"DART 일일 호출 한도({self.allowance(priority)}회)를 모두 사용했습니다. 자정(KST) 이후 다시 시도해 주세요."
+        else:
+            detail = f"DART 호출 한도 초과로 호출을 잠시 멈췄습니다. {retry_after:.0f}초 후 다시 시도해 주세요."
+        raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(int(retry_after) + 1)})
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.current_rate)
+        self._updated = now
+
+    async def _take_token(self, priority: int):
+        self._refill()
+        if not self._waiters and self._tokens >= 1 and time.monotonic() >= self._paused_until:
+            self._tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        # 기다리던 호출이 취소되면 Future 도 취소되고, 디스패처는 그 자리를 건너뜁니다.
+        await future
+
+    async def _dispatch(self):
+        """대기열에서 우선순위가 가장 높은(같으면 먼저 온) 호출부터 토큰이 생기는 대로 깨웁니다."""
+        try:
+            while self._waiters:
+                paused_for = self.paused_for()
+                if paused_for > 0:
+                    await asyncio.sleep(paused_for)
+                    continue
+                self._refill()
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.current_rate)
+                    continue
+                _, _, future = heapq.heappop(self._waiters)
+                if future.done():
+                    continue
+                self._tokens -= 1
+                future.set_result(None)
+        finally:
+            self._dispatcher = None
+
+    # ---- DART 응답 반영 ----
+    def on_success(self):
+        self._quota_strikes = 0
+        if self.current_rate < self.rate:
+            self.current_rate = min(self.rate, self.current_rate + self.rate * RATE_RECOVERY_STEP)
+
+    def on_quota_exceeded(self):
+        """020 응답: 연속 횟수만큼 두 배씩 늘어나는 시간 동안 호출을 멈추고 속도를 절반으로 낮춥니다."""
+        QUOTA_EXCEEDED.inc()
+        self._quota_strikes += 1
+        pause = min(self.backoff_max, self.backoff * 2 ** (self._quota_strikes - 1))
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        self._refill()
+        self._tokens = 0.0
+        if self.rate > 0:
+            self.current_rate = max(self.rate * RATE_FLOOR_RATIO, self.current_rate / 2)
+        logger.warning(
+            "🚦 [DART 호출 한도 초과] 020 응답 %d회 연속 → %.1f초 동안 호출 중지, 초당 %.2f회로 감속",
+            self._quota_strikes, pause, self.current_rate,
+        )
+
+    async def aclose(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._dispatcher
+        for _, _, future in self._waiters:
+            future.cancel()
+        self._waiters.clear()
+        self.store.close()
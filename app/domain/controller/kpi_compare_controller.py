@@ -1,16 +1,21 @@
 from fastapi import Depends
 from ..service.kpi_compare_service import KpiCompareService
+from ..service.service_container import get_kpi_compare_service
+from ..schema.kpi_compare_schema import KpiCompareRequest
 
 class KpiCompareController:
-    def __init__(self, service: KpiCompareService = Depends()):
+    def __init__(self, service: KpiCompareService = Depends(get_kpi_compare_service)):
         """
         FastAPI의 의존성 주입 시스템을 통해 KpiCompareService 인스턴스를 받습니다.
-        더 이상 Controller가 Service를 직접 생성하지 않습니다.
+        Service는 애플리케이션 lifespan에서 한 번 생성된 싱글톤입니다.
         """
         self.service = service
 
-    async def search_company(self, query: str):
-        return await self.service.search_company(query)
+    async def search_company(self, query: str, limit: int = 20):
+        return await self.service.search_company(query, limit)
+
+    async def autocomplete_company(self, prefix: str, limit: int = 10):
+        return await self.service.autocomplete_company(prefix, limit)
 
     async def get_reports(self, query: str):
         return await self.service.get_reports(query)
@@ -18,5 +23,18 @@ class KpiCompareController:
     async def get_kpi_for_report(self, query: str, rcept_no: str, bsns_year: str, reprt_code: str):
         return await self.service.get_kpi_for_report(query, rcept_no, bsns_year, reprt_code)
     
+    async def compare_kpis(self, request: KpiCompareRequest):
+        return await self.service.compare_kpis(request.companies, request.years, request.reprt_codes)
+
+    async def get_kpi_timeseries(self, query: str, from_year: int, to_year: int, reports: str):
+        reprt_codes = [code.strip() for code in reports.split(",") if code.strip()]
+        return await self.service.get_kpi_timeseries(query, from_year, to_year, reprt_codes)
+
     async def get_supported_companies(self):
-        return await self.service.get_supported_companies()
\ No newline at end of file
+        return await self.service.get_supported_companies()
+
+    async def reload_kpi_metadata(self, force: bool = False):
+        return await self.service.reload_kpi_metadata(force=force)
+
+    async def reload_corp_registry(self, force: bool = False):
+        return self.service.reload_corp_registry(force=force)
\ No newline at end of file
@@ -0,0 +1,325 @@
+"""
+재무 팩트 저장소
+
+DART 재무제표 응답 한 건(bsns_year=t)에는 당기(t)와 전기(t-1) 금액이 함께 들어 있으므로,
+금액을 (corp_code, fiscal_year, reprt_code, fs_div, account_id) 단위의 팩트로 풀어 SQLite 에 영구 저장합니다.
+같은 팩트가 여러 보고서에 나오면 그 연도 자신의 보고서 당기 값(fiscal_year == source_year)이 항상 우선하고,
+다른 보고서의 전기 비교 값은 그 연도 보고서가 아직 없을 때만 빈 곳을 채웁니다. 같은 종류끼리는 더 나중 보고서가 우선합니다.
+분기·반기 보고서의 전기 열은 같은 분기가 아니라 전년도 말(재무상태표) 값이므로 저장하지 않습니다(put_filing 의 previous=None).
+
+메모리에서는 (corp_code, reprt_code, fs_div) 단위 블록을 타입이 정해진 array 컬럼
+(연도 int16, 계정 코드 uint32, 금액 int64, 출처 연도 int16)으로 들고 있어, dict 트리 없이 작은 메모리로
+여러 연도의 financials 를 조립합니다. 어떤 회계연도가 어느 보고서로 채워졌는지는 coverage 로 따로 관리하며,
+빈 곳(coverage 가 없거나 만료된 연도)만 DART 에서 가져오면 됩니다.
+보고서 한 건을 실제로 어느 재무제표 구분(CFS/OFS)에서 받았는지, 또는 둘 다 비어 있었는지(013)는
+filing_sources 에 따로 기록해 다음 조회 때 데이터가 있는 구분만 요청하게 합니다.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from app.core.metrics import REGISTRY
+
+FACT_STORE_REQUESTS = REGISTRY.counter(
+    "kpi_fact_store_requests_total", "팩트 저장소 조회 결과 (result=hit|stale|miss)", labelnames=("result",),
+)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS facts (
+        corp_code TEXT NOT NULL,
+        fiscal_year INTEGER NOT NULL,
+        reprt_code TEXT NOT NULL,
+        fs_div TEXT NOT NULL,
+        account_id TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        source_year INTEGER NOT NULL,
+        PRIMARY KEY (corp_code, reprt_code, fs_div, fiscal_year, account_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS coverage (
+        corp_code TEXT NOT NULL,
+        fiscal_year INTEGER NOT NULL,
+        reprt_code TEXT NOT NULL,
+        fs_div TEXT NOT NULL,
+        source_year INTEGER NOT NULL,
+        expires_at REAL,
+        PRIMARY KEY (corp_code, reprt_code, fs_div, fiscal_year)
+    ) WITHOUT ROWID
+    """,
+    # fs_div 가 '' 이면 CFS·OFS 모두 데이터가 없던(013) 보고서입니다.
+    """
+    CREATE TABLE IF NOT EXISTS filing_sources (
+        corp_code TEXT NOT NULL,
+        bsns_year INTEGER NOT NULL,
+        reprt_code TEXT NOT NULL,
+        fs_div TEXT NOT NULL,
+        expires_at REAL,
+        PRIMARY KEY (corp_code, reprt_code, bsns_year)
+    ) WITHOUT ROWID
+    """,
+)
+
+# (당기 값 여부, source_year) 가 크거나 같은 쪽만 덮어씁니다. 전기 비교 값은 당기 값을 덮어쓰지 못합니다.
+_UPSERT_FACT = """
+INSERT INTO facts (corp_code, fiscal_year, reprt_code, fs_div, account_id, amount, source_year)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (corp_code, reprt_code, fs_div, fiscal_year, account_id) DO UPDATE
+SET amount = excluded.amount, source_year = excluded.source_year
+WHERE (excluded.source_year = excluded.fiscal_year, excluded.source_year) >= (facts.source_year = facts.fiscal_year, facts.source_year)
+"""
+_UPSERT_COVERAGE = """
+INSERT INTO coverage (corp_code, fiscal_year, reprt_code, fs_div, source_year, expires_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (corp_code, reprt_code, fs_div, fiscal_year) DO UPDATE
+SET source_year = excluded.source_year, expires_at = excluded.expires_at
+WHERE (excluded.source_year = excluded.fiscal_year, excluded.source_year) >= (coverage.source_year = coverage.fiscal_year, coverage.source_year)
+"""
+
+
+def _rank(fiscal_year: int, source_year: int) -> tuple:
+    """같은 연도 팩트의 우선순위. 그 연도 보고서의 당기 값이 먼저, 그다음 더 나중 보고서."""
+    return fiscal_year == source_year, source_year
+
+
+class _FactBlock:
+    """한 기업·보고서 종류·재무제표 구분의 모든 연도 팩트를 담는 컬럼 배열."""
+
+    __slots__ = ("years", "accounts", "amounts", "sources", "positions", "coverage")
+
+    def __init__(self):
+        self.years = array("h")
+        self.accounts = array("I")
+        self.amounts = array("q")
+        self.sources = array("h")
+        self.positions = {}  # (fiscal_year, account_code) -> 행 번호
+        self.coverage = {}  # fiscal_year -> (source_year, expires_at)
+
+    def upsert(self, fiscal_year: int, account_code: int, amount: int, source_year: int):
+        position = self.positions.get((fiscal_year, account_code))
+        if position is None:
+            self.positions[(fiscal_year, account_code)] = len(self.years)
+            self.years.append(fiscal_year)
+            self.accounts.append(account_code)
+            self.amounts.append(amount)
+            self.sources.append(source_year)
+        elif _rank(fiscal_year, source_year) >= _rank(fiscal_year, self.sources[position]):
+            self.amounts[position] = amount
+            self.sources[position] = source_year
+
+    def cover(self, fiscal_year: int, source_year: int, expires_at):
+        current = self.coverage.get(fiscal_year)
+        if current is None or _rank(fiscal_year, source_year) >= _rank(fiscal_year, current[0]):
+            self.coverage[fiscal_year] = (source_year, expires_at)
+
+
+class FinancialFactStore:
+    def __init__(self, path: str, max_blocks: int = 512):
+        self.path = path
+        self.max_blocks = max_blocks
+        self._blocks = OrderedDict()  # (corp_code, reprt_code, fs_div) -> _FactBlock
+        self._sources = {}  # corp_code -> {(bsns_year, reprt_code): (fs_div, expires_at)}
+        # 계정 ID 는 프로세스 내 사전으로 코드화해 블록에는 4바이트 정수만 둡니다.
+        self._account_codes = {}
+        self._account_ids = []
+        self._conn = None
+        self._lock = threading.Lock()
+        # 저장 내용이 바뀔 때마다 올라가는 번호. 재무 값으로 만든 파생 결과(밸류에이션 등)의 캐시 무효화에 씁니다.
+        self.version = 0
+
+    # ---- SQLite ----
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._conn = conn
+        return self._conn
+
+    def _account_code(self, account_id: str) -> int:
+        code = self._account_codes.get(account_id)
+        if code is None:
+            code = self._account_codes[account_id] = len(self._account_ids)
+            self._account_ids.append(account_id)
+        return code
+
+    def _read_block_rows(self, corp_code, reprt_code, fs_div):
+        with self._lock:
+            conn = self._connection()
+            facts = conn.execute(
+                "SELECT fiscal_year, account_id, amount, source_year FROM facts "
+                "WHERE corp_code = ? AND reprt_code = ? AND fs_div = ?",
+                (corp_code, reprt_code, fs_div),
+            ).fetchall()
+            coverage = conn.execute(
+                "SELECT fiscal_year, source_year, expires_at FROM coverage "
+                "WHERE corp_code = ? AND reprt_code = ? AND fs_div = ?",
+                (corp_code, reprt_code, fs_div),
+            ).fetchall()
+        return facts, coverage
+
+    def _build_block(self, facts, coverage) -> _FactBlock:
+        # 계정 코드 사전은 이벤트 루프 스레드에서만 갱신합니다.
+        block = _FactBlock()
+        for fiscal_year, account_id, amount, source_year in facts:
+            block.upsert(fiscal_year, self._account_code(account_id), amount, source_year)
+        for fiscal_year, source_year, expires_at in coverage:
+            block.cover(fiscal_year, source_year, expires_at)
+        return block
+
+    def _write_filing(self, rows, coverage_rows):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(_UPSERT_FACT, rows)
+                conn.executemany(_UPSERT_COVERAGE, coverage_rows)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _read_sources(self, corp_code):
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT bsns_year, reprt_code, fs_div, expires_at FROM filing_sources WHERE corp_code = ?", (corp_code,)
+            ).fetchall()
+        return {(bsns_year, reprt_code): (fs_div, expires_at) for bsns_year, reprt_code, fs_div, expires_at in rows}
+
+    def _write_source(self, row):
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO filing_sources (corp_code, bsns_year, reprt_code, fs_div, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                row,
+            )
+
+    async def _corp_sources(self, corp_code: str, key=None) -> dict:
+        # 다른 워커가 기록했을 수 있으므로 찾는 보고서가 없으면 디스크에서 한 번 다시 읽습니다.
+        sources = self._sources.get(corp_code)
+        if sources is None or (key is not None and key not in sources):
+            sources = self._sources[corp_code] = await asyncio.to_thread(self._read_sources, corp_code)
+        return sources
+
+    def _remember(self, key, block):
+        self._blocks[key] = block
+        self._blocks.move_to_end(key)
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+
+    # ---- 공개 API ----
+    async def get_financials(self, corp_code: str, reprt_code: str, fs_div: str, years) -> tuple:
+        """
+        요청한 연도들의 {연도: {account_id: 금액}} 과 함께, coverage 가 없는 연도(missing)와
+        만료된 연도(stale) 집합을 반환합니다. 다른 워커가 채웠을 수 있으므로 빈 곳이 있으면 디스크에서 한 번 다시 읽습니다.
+        """
+        key = (corp_code, reprt_code, fs_div)
+        block = self._blocks.get(key)
+        if block is None or any(year not in block.coverage for year in years):
+            block = self._build_block(*await asyncio.to_thread(self._read_block_rows, *key))
+            self._remember(key, block)
+        else:
+            self._blocks.move_to_end(key)
+
+        now = time.time()
+        financials = {year: {} for year in years}
+        missing, stale = set(), set()
+        for year in years:
+            coverage = block.coverage.get(year)
+            if coverage is None:
+                missing.add(year)
+            elif coverage[1] is not None and coverage[1] <= now:
+                stale.add(year)
+        wanted = set(years)
+        account_ids = self._account_ids
+        for fiscal_year, account_code, amount in zip(block.years, block.accounts, block.amounts):
+            if fiscal_year in wanted:
+                financials[fiscal_year][account_ids[account_code]] = amount
+
+        result = "miss" if missing else "stale" if stale else "hit"
+        FACT_STORE_REQUESTS.inc(result)
+        return financials, missing, stale
+
+    async def put_filing(self, corp_code: str, bsns_year: int, reprt_code: str, fs_div: str,
+                         current: dict, previous: dict = None, expires_at=None):
+        """
+        보고서 한 건(bsns_year)의 당기·전기 금액을 팩트로 저장하고 해당 회계연도를 coverage 로 표시합니다.
+        previous 가 None 이면(같은 기간의 전년도 값이 아닌 전기 열) 당기만 저장합니다.
+        """
+        periods = [(bsns_year, current)]
+        if previous is not None:
+            periods.append((bsns_year - 1, previous))
+        rows = [
+            (corp_code, fiscal_year, reprt_code, fs_div, account_id, amount, bsns_year)
+            for fiscal_year, facts in periods for account_id, amount in facts.items()
+        ]
+        coverage_rows = [(corp_code, fiscal_year, reprt_code, fs_div, bsns_year, expires_at) for fiscal_year, _ in periods]
+        await asyncio.to_thread(self._write_filing, rows, coverage_rows)
+        self.version += 1
+
+        block = self._blocks.get((corp_code, reprt_code, fs_div))
+        if block is not None:
+            for fiscal_year, facts in periods:
+                for account_id, amount in facts.items():
+                    block.upsert(fiscal_year, self._account_code(account_id), amount, bsns_year)
+                block.cover(fiscal_year, bsns_year, expires_at)
+
+    async def get_filing_source(self, corp_code: str, bsns_year: int, reprt_code: str):
+        """
+        보고서 한 건의 (fs_div, fresh 여부). 기록이 없으면 None 입니다.
+        fs_div 가 '' 이면 CFS·OFS 모두 비어 있던 보고서(부정 캐시)이며, fresh 인 동안은 다시 요청할 필요가 없습니다.
+        """
+        entry = (await self._corp_sources(corp_code, (bsns_year, reprt_code))).get((bsns_year, reprt_code))
+        if entry is None:
+            return None
+        fs_div, expires_at = entry
+        return fs_div, expires_at is None or expires_at > time.time()
+
+    async def preferred_fs_div(self, corp_code: str):
+        """이 기업의 가장 최근 사업연도 보고서에서 데이터가 있던 fs_div. 같은 연도에 둘 다 있으면 CFS. 기록이 없으면 None."""
+        sources = await self._corp_sources(corp_code)
+        known = [(bsns_year, fs_div == "CFS", fs_div) for (bsns_year, _), (fs_div, _) in sources.items() if fs_div]
+        return max(known)[2] if known else None
+
+    async def put_filing_source(self, corp_code: str, bsns_year: int, reprt_code: str, fs_div: str, expires_at=None):
+        await asyncio.to_thread(self._write_source, (corp_code, bsns_year, reprt_code, fs_div, expires_at))
+        self._sources.setdefault(corp_code, {})[(bsns_year, reprt_code)] = (fs_div, expires_at)
+
+    def _delete_all(self, *tables):
+        with self._lock:
+            conn = self._connection()
+            for table in tables:
+                conn.execute(f"DELETE FROM {table}")
+
+    async def invalidate_coverage(self):
+        """저장된 팩트는 두고 coverage 만 지워, 다음 조회 때 DART 에서 다시 채우게 합니다 (필요 계정이 늘었을 때)."""
+        self._blocks.clear()
+        self.version += 1
+        await asyncio.to_thread(self._delete_all, "coverage")
+
+    async def clear(self):
+        self._blocks.clear()
+        self._sources.clear()
+        self.version += 1
+        await asyncio.to_thread(self._delete_all, "facts", "coverage", "filing_sources")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        return {
+            "blocks": len(self._blocks),
+            "facts_in_memory": sum(len(block.years) for block in self._blocks.values()),
+            "account_ids": len(self._account_ids),
+        }
@@ -1,10 +1,48 @@
-from typing import List, Optional
-from sqlalchemy import select, and_, desc, func
+import base64
+import weakref
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+from sqlalchemy import Column, Index, Table, select, insert, delete, exists, inspect, and_, or_, desc, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from ..model.stockprice_model import StockPriceModel, DailyStockDataModel
 from ..schema.stockprice_schema import WeeklyStockPriceCreate, WeeklyStockPriceUpdate
 
+# WeeklyStockPriceCreate 에서 그대로 옮겨 담는 컬럼
+WEEKLY_PRICE_FIELDS = (
+    "symbol", "market_cap", "today", "last_week", "change_rate", "week_high", "week_low",
+    "error", "this_friday_date", "last_friday_date", "data_source",
+)
+# 같은 종목·같은 주의 데이터는 한 행으로 유지합니다 (upsert 충돌 키).
+WEEKLY_PRICE_KEY = ("symbol", "this_friday_date")
+# 한 INSERT 문에 담는 행 수. 컬럼 11개 기준으로 SQLite 의 바인드 변수 한도(32766) 안에 들어옵니다.
+BULK_CHUNK_SIZE = 1000
+# stream_history 가 DB 커서에서 한 번에 가져오는 행 수
+STREAM_CHUNK_SIZE = 1000
+# 최신가 테이블을 다시 계산할 때 한 번에 넘기는 심볼 수
+LATEST_REFRESH_CHUNK_SIZE = 500
+
+# 종목별 이력 조회(get_by_symbol)와 최신 행 재계산이 쓰는 복합 인덱스
+STOCKPRICE_SYMBOL_CREATED_INDEX = Index(
+    "ix_stockprice_symbol_created_at",
+    StockPriceModel.symbol,
+    StockPriceModel.created_at.desc(),
+)
+
+# 종목당 최신 주가 행 하나를 가리키는 테이블. 쓰기 경로(create/bulk_create/update/delete)에서 같은 트랜잭션으로 갱신하므로
+# 최신가 조회는 이력 주 수와 무관하게 종목 수만큼의 기본키 조인으로 끝납니다.
+# 테이블이 없거나 아직 비어 있으면(ensure_indexes 전, create_all 직후) 최신가 조회는 윈도 함수로 이력을 훑습니다.
+STOCKPRICE_LATEST = Table(
+    "stockprice_latest",
+    StockPriceModel.metadata,
+    Column("symbol", StockPriceModel.__table__.c.symbol.type, primary_key=True),
+    Column("stockprice_id", StockPriceModel.__table__.c.id.type, nullable=False),
+    Column("created_at", StockPriceModel.__table__.c.created_at.type),
+)
+# 최신가 테이블이 채워진 것을 확인한 엔진 (한 번 채워지면 쓰기 경로가 계속 맞춰 둡니다)
+_LATEST_READY_ENGINES = weakref.WeakSet()
+
 
 class StockPriceRepository:
     """주간 주가 정보 Repository 클래스"""
@@ -29,6 +67,8 @@ class StockPriceRepository:
         )
         
         self.db.add(stockprice)
+        await self.db.flush()
+        await self._refresh_latest([stockprice.symbol])
         await self.db.commit()
         await self.db.refresh(stockprice)
         return stockprice
@@ -44,7 +84,7 @@ class StockPriceRepository:
         skip: int = 0, 
         limit: int = 100
     ) -> List[StockPriceModel]:
-        """모든 주가 정보 조회 (페이징)"""
+        """모든 주가 정보 조회 (OFFSET 페이징, 깊은 페이지는 get_page 사용)"""
         query = (
             select(StockPriceModel)
             .order_by(desc(StockPriceModel.created_at))
@@ -54,6 +94,66 @@ class StockPriceRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
     
+    @staticmethod
+    def encode_cursor(stockprice: StockPriceModel) -> str:
+        """행의 (created_at, id) 를 URL 에 그대로 쓸 수 있는 불투명한 커서 문자열로 만듭니다."""
+        raw = f"{stockprice.created_at.isoformat()}|{stockprice.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            created_at, stockprice_id = raw.rsplit("|", 1)
+            return datetime.fromisoformat(created_at), int(stockprice_id)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"잘못된 페이지 커서입니다: {cursor}") from e
+
+    @staticmethod
+    def _history_query(symbol: Optional[str] = None, after: Optional[str] = None):
+        """created_at, id 내림차순 이력 조회. after 커서가 있으면 그 행 다음부터 (키셋 조건)."""
+        query = select(StockPriceModel).order_by(desc(StockPriceModel.created_at), desc(StockPriceModel.id))
+        if symbol:
+            query = query.where(StockPriceModel.symbol == symbol)
+        if after:
+            created_at, stockprice_id = StockPriceRepository.decode_cursor(after)
+            query = query.where(
+                or_(
+                    StockPriceModel.created_at < created_at,
+                    and_(StockPriceModel.created_at == created_at, StockPriceModel.id < stockprice_id),
+                )
+            )
+        return query
+
+    async def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        symbol: Optional[str] = None
+    ) -> Tuple[List[StockPriceModel], Optional[str]]:
+        """
+        키셋(커서) 페이징. OFFSET 없이 마지막 행의 (created_at, id) 다음부터 읽으므로 몇 번째 페이지든 비용이 같습니다.
+        (행 목록, 다음 페이지 커서) 를 반환하며 마지막 페이지면 커서는 None 입니다.
+        """
+        query = self._history_query(symbol, cursor).limit(limit + 1)
+        rows = (await self.db.execute(query)).scalars().all()
+        next_cursor = self.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    async def stream_history(
+        self,
+        symbol: Optional[str] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> AsyncIterator[List[StockPriceModel]]:
+        """
+        이력 전체를 chunk_size 행 묶음으로 흘려보냅니다. 서버 측 커서(stream_scalars + yield_per)를 쓰므로
+        테이블 크기와 무관하게 한 묶음만큼의 메모리만 씁니다 (세션 identity map 은 약한 참조라 지난 묶음은 해제됩니다).
+        """
+        query = self._history_query(symbol).execution_options(yield_per=chunk_size)
+        result = await self.db.stream_scalars(query)
+        async for partition in result.partitions(chunk_size):
+            yield partition
+
     async def get_by_symbol(self, symbol: str, date: Optional[str] = None) -> Optional[StockPriceModel]:
         """
         종목 심볼로 주가 정보 조회. 특정 날짜가 주어지면 해당 날짜 또는 그 이전의 가장 최신 데이터를 조회.
@@ -74,59 +174,17 @@ class StockPriceRepository:
     async def get_all_latest_prices(self, date: Optional[str] = None) -> List[StockPriceModel]:
         """
         모든 종목의 최신 주가 정보 조회. 특정 날짜가 주어지면 해당 날짜 기준 최신 데이터를 조회.
+        날짜가 없으면 최신가 테이블을 통해 종목 수만큼의 기본키 조회로 끝납니다.
         """
-        # 각 심볼별로 특정 날짜 또는 그 이전의 최신 데이터만 조회
-        subquery = select(
-            StockPriceModel.symbol,
-            func.max(StockPriceModel.created_at).label('max_created_at')
-        )
-        if date:
-            subquery = subquery.where(StockPriceModel.created_at <= date)
-        
-        subquery = subquery.group_by(StockPriceModel.symbol).subquery()
-        
-        query = (
-            select(StockPriceModel)
-            .join(
-                subquery,
-                and_(
-                    StockPriceModel.symbol == subquery.c.symbol,
-                    StockPriceModel.created_at == subquery.c.max_created_at
-                )
-            )
-            .order_by(StockPriceModel.symbol)
-        )
-        
+        latest = await self._latest_prices(date)
+        query = select(latest).order_by(latest.symbol)
         result = await self.db.execute(query)
         return result.scalars().all()
     
     async def get_by_symbols(self, symbols: List[str], date: Optional[str] = None) -> List[StockPriceModel]:
         """여러 종목 심볼로 특정 날짜 기준 최신 주가 정보 조회"""
-        
-        subquery = (
-            select(
-                StockPriceModel.symbol,
-                func.max(StockPriceModel.created_at).label('max_created_at')
-            )
-            .where(StockPriceModel.symbol.in_(symbols))
-        )
-        if date:
-            subquery = subquery.where(StockPriceModel.created_at <= date)
-            
-        subquery = subquery.group_by(StockPriceModel.symbol).subquery()
-        
-        query = (
-            select(StockPriceModel)
-            .join(
-                subquery,
-                and_(
-                    StockPriceModel.symbol == subquery.c.symbol,
-                    StockPriceModel.created_at == subquery.c.max_created_at
-                )
-            )
-            .order_by(StockPriceModel.symbol)
-        )
-        
+        latest = await self._latest_prices(date, symbols)
+        query = select(latest).order_by(latest.symbol)
         result = await self.db.execute(query)
         return result.scalars().all()
     
@@ -149,69 +207,229 @@ class StockPriceRepository:
         result = await self.db.execute(query)
         return result.scalars().all()
     
+    @staticmethod
+    def _ranked_prices(date: Optional[str] = None, symbols: Optional[Iterable[str]] = None):
+        """
+        심볼별로 created_at(같으면 id) 내림차순 순번(rn)을 매긴 서브쿼리.
+        (symbol, created_at DESC) 인덱스를 따라 읽으므로 rn == 1 이 종목별 최신 행입니다.
+        """
+        row_number = func.row_number().over(
+            partition_by=StockPriceModel.symbol,
+            order_by=(desc(StockPriceModel.created_at), desc(StockPriceModel.id)),
+        ).label('rn')
+        ranked = select(StockPriceModel, row_number)
+        if symbols is not None:
+            ranked = ranked.where(StockPriceModel.symbol.in_(list(symbols)))
+        if date:
+            ranked = ranked.where(StockPriceModel.created_at <= date)
+        return ranked.subquery('latest_ranked')
+
+    async def _latest_table_state(self) -> str:
+        """최신가 테이블 상태: missing(없음), empty(비어 있음), ready(채워져 있음)."""
+        engine = self.db.get_bind()
+        if engine in _LATEST_READY_ENGINES:
+            return "ready"
+
+        def check(session):
+            connection = session.connection()
+            if not inspect(connection).has_table(STOCKPRICE_LATEST.name):
+                return "missing"
+            filled = connection.execute(select(STOCKPRICE_LATEST.c.symbol).limit(1)).first() is not None
+            return "ready" if filled else "empty"
+
+        state = await self.db.run_sync(check)
+        if state == "ready":
+            _LATEST_READY_ENGINES.add(engine)
+        return state
+
+    async def _latest_prices(self, date: Optional[str] = None, symbols: Optional[Iterable[str]] = None):
+        """
+        종목별 최신 행만 담은 서브쿼리 위의 StockPriceModel 별칭.
+        날짜가 없고 최신가 테이블이 채워져 있으면 기본키로 조인하고, 과거 날짜 기준이거나 테이블이 준비되지 않았으면
+        윈도 함수로 이력을 훑습니다.
+        """
+        if date or await self._latest_table_state() != "ready":
+            ranked = self._ranked_prices(date, symbols)
+            latest = select(ranked).where(ranked.c.rn == 1)
+        else:
+            latest = select(StockPriceModel).join(
+                STOCKPRICE_LATEST, STOCKPRICE_LATEST.c.stockprice_id == StockPriceModel.id
+            )
+            if symbols is not None:
+                latest = latest.where(STOCKPRICE_LATEST.c.symbol.in_(list(symbols)))
+        return aliased(StockPriceModel, latest.subquery('latest_prices'))
+
+    async def _refresh_latest(self, symbols: Optional[Iterable[str]] = None):
+        """
+        주어진 종목(없으면 전체)의 최신가 테이블 행을 이력에서 다시 계산합니다. 커밋은 호출한 쪽이 합니다.
+        symbol 기준 upsert 로 맞추므로 같은 종목을 동시에 쓰는 트랜잭션끼리 기본키 충돌이 나지 않고,
+        이력이 모두 지워진 종목의 행만 따로 지웁니다. 테이블이 없으면 건너뛰고, 비어 있으면 전체를 채웁니다.
+        """
+        state = await self._latest_table_state()
+        if state == "missing":
+            return
+        if state == "empty":
+            symbols = None
+        dialect_insert = self._dialect_insert()
+        if symbols is None:
+            chunks = [None]
+        else:
+            symbols = sorted(set(symbols))
+            chunks = [symbols[i:i + LATEST_REFRESH_CHUNK_SIZE] for i in range(0, len(symbols), LATEST_REFRESH_CHUNK_SIZE)]
+        columns = ["symbol", "stockprice_id", "created_at"]
+        for chunk in chunks:
+            ranked = self._ranked_prices(symbols=chunk)
+            latest_rows = select(ranked.c.symbol, ranked.c.id, ranked.c.created_at).where(ranked.c.rn == 1)
+            if dialect_insert is None:
+                # 방언별 upsert 가 없으면 지우고 다시 넣습니다 (같은 종목 동시 쓰기는 호출한 쪽에서 직렬화해야 합니다).
+                stale = delete(STOCKPRICE_LATEST)
+                if chunk is not None:
+                    stale = stale.where(STOCKPRICE_LATEST.c.symbol.in_(chunk))
+                await self.db.execute(stale)
+                await self.db.execute(insert(STOCKPRICE_LATEST).from_select(columns, latest_rows))
+                continue
+            statement = dialect_insert(STOCKPRICE_LATEST).from_select(columns, latest_rows)
+            if hasattr(statement, "on_conflict_do_update"):
+                statement = statement.on_conflict_do_update(
+                    index_elements=["symbol"],
+                    set_={"stockprice_id": statement.excluded.stockprice_id, "created_at": statement.excluded.created_at},
+                )
+            else:
+                statement = statement.on_duplicate_key_update(
+                    {"stockprice_id": statement.inserted.stockprice_id, "created_at": statement.inserted.created_at}
+                )
+            await self.db.execute(statement)
+            gone = delete(STOCKPRICE_LATEST).where(
+                ~exists().where(StockPriceModel.symbol == STOCKPRICE_LATEST.c.symbol)
+            )
+            if chunk is not None:
+                gone = gone.where(STOCKPRICE_LATEST.c.symbol.in_(chunk))
+            await self.db.execute(gone)
+
+    async def ensure_indexes(self):
+        """
+        복합 인덱스와 최신가 테이블을 만들고(이미 있으면 건너뜀), 최신가 테이블이 비어 있으면 이력에서 채웁니다.
+        애플리케이션 시작 시 한 번 호출합니다.
+        """
+        def create(session):
+            connection = session.connection()
+            STOCKPRICE_SYMBOL_CREATED_INDEX.create(connection, checkfirst=True)
+            STOCKPRICE_LATEST.create(connection, checkfirst=True)
+
+        await self.db.run_sync(create)
+        if await self.db.scalar(select(func.count()).select_from(STOCKPRICE_LATEST)) == 0:
+            await self._refresh_latest()
+        await self.db.commit()
+
     async def get_top_gainers(self, limit: int = 10) -> List[StockPriceModel]:
-        """상승률 상위 종목 조회"""
-        # 최신 데이터만 대상
-        latest_prices = await self.get_all_latest_prices()
-        
-        # 상승률 순으로 정렬하여 상위 N개 반환
-        gainers = [
-            price for price in latest_prices 
-            if price.change_rate is not None and price.change_rate > 0
-        ]
-        gainers.sort(key=lambda x: x.change_rate, reverse=True)
-        
-        return gainers[:limit]
-    
+        """상승률 상위 종목 조회 (최신 데이터 기준, DB에서 정렬·제한)"""
+        latest = await self._latest_prices()
+        query = (
+            select(latest)
+            .where(latest.change_rate > 0)
+            .order_by(desc(latest.change_rate))
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
     async def get_top_losers(self, limit: int = 10) -> List[StockPriceModel]:
-        """하락률 상위 종목 조회"""
-        # 최신 데이터만 대상
-        latest_prices = await self.get_all_latest_prices()
-        
-        # 하락률 순으로 정렬하여 상위 N개 반환
-        losers = [
-            price for price in latest_prices 
-            if price.change_rate is not None and price.change_rate < 0
-        ]
-        losers.sort(key=lambda x: x.change_rate)
-        
-        return losers[:limit]
-    
+        """하락률 상위 종목 조회 (최신 데이터 기준, DB에서 정렬·제한)"""
+        latest = await self._latest_prices()
+        query = (
+            select(latest)
+            .where(latest.change_rate < 0)
+            .order_by(latest.change_rate)
+            .limit(limit)
+        )
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    @staticmethod
+    def _statistics_aggregates(latest) -> dict:
+        """
+        최신 행 집합에 대한 시장 통계 집계식 (이름 -> 집계 함수).
+        NULL 등락률·시가총액은 기존 파이썬 계산과 같이 집계에서 제외되며, 윈도(OVER ())로도 그대로 쓸 수 있습니다.
+        """
+        return {
+            "total_companies": func.count(),
+            "positive_change": func.sum(case((latest.change_rate > 0, 1), else_=0)),
+            "negative_change": func.sum(case((latest.change_rate < 0, 1), else_=0)),
+            "unchanged": func.sum(case((latest.change_rate == 0, 1), else_=0)),
+            "average_change_rate": func.avg(latest.change_rate),
+            "max_change_rate": func.max(latest.change_rate),
+            "min_change_rate": func.min(latest.change_rate),
+            "total_market_cap": func.sum(latest.market_cap),
+        }
+
+    @staticmethod
+    def _format_statistics(values: dict) -> dict:
+        """집계 결과를 기존 get_market_statistics 응답 형태로 맞춥니다 (빈 값은 0)."""
+        def rounded(value):
+            return round(float(value), 2) if value is not None else 0.0
+
+        return {
+            "total_companies": int(values.get("total_companies") or 0),
+            "positive_change": int(values.get("positive_change") or 0),
+            "negative_change": int(values.get("negative_change") or 0),
+            "unchanged": int(values.get("unchanged") or 0),
+            "average_change_rate": rounded(values.get("average_change_rate")),
+            "max_change_rate": rounded(values.get("max_change_rate")),
+            "min_change_rate": rounded(values.get("min_change_rate")),
+            "total_market_cap": values.get("total_market_cap") or 0
+        }
+
     async def get_market_statistics(self) -> dict:
-        """시장 통계 정보 조회"""
-        latest_prices = await self.get_all_latest_prices()
-        
-        if not latest_prices:
-            return {
-                "total_companies": 0,
-                "positive_change": 0,
-                "negative_change": 0,
-                "unchanged": 0,
-                "average_change_rate": 0.0,
-                "max_change_rate": 0.0,
-                "min_change_rate": 0.0,
-                "total_market_cap": 0
-            }
-        
-        # 통계 계산
-        valid_changes = [p.change_rate for p in latest_prices if p.change_rate is not None]
-        valid_market_caps = [p.market_cap for p in latest_prices if p.market_cap is not None]
-        
-        positive_count = len([r for r in valid_changes if r > 0])
-        negative_count = len([r for r in valid_changes if r < 0])
-        unchanged_count = len([r for r in valid_changes if r == 0])
-        
+        """시장 통계 정보 조회 (최신 행에 대한 SQL 집계 한 번)"""
+        latest = await self._latest_prices()
+        aggregates = self._statistics_aggregates(latest)
+        query = select(*[aggregate.label(name) for name, aggregate in aggregates.items()])
+        result = await self.db.execute(query)
+        return self._format_statistics(result.one()._asdict())
+
+    async def get_dashboard_summary(self, limit: int = 10) -> dict:
+        """
+        대시보드용 상승/하락 상위 종목과 시장 통계를 최신 행 스캔 한 번으로 조회합니다.
+        통계는 집계 윈도 함수(OVER ())로 모든 행에 붙이고 상승·하락 순위를 매겨, 상위 limit 개 행만 가져옵니다.
+        """
+        latest = await self._latest_prices()
+        aggregates = self._statistics_aggregates(latest)
+        # NULLS LAST 는 MySQL 이 지원하지 않으므로 IS NULL 을 먼저 정렬해 NULL 등락률을 뒤로 보냅니다.
+        null_last = latest.change_rate.is_(None)
+        movers = (
+            select(
+                latest,
+                func.row_number().over(order_by=(null_last, desc(latest.change_rate))).label('gain_rank'),
+                func.row_number().over(order_by=(null_last, latest.change_rate.asc())).label('loss_rank'),
+                *[aggregate.over().label(name) for name, aggregate in aggregates.items()],
+            )
+            .subquery('movers')
+        )
+        mover = aliased(StockPriceModel, movers)
+        query = (
+            select(mover, movers.c.gain_rank, movers.c.loss_rank, *[movers.c[name] for name in aggregates])
+            # gain_rank 1 행은 항상 남으므로 상·하락 종목이 없어도 통계를 읽을 수 있습니다.
+            .where(or_(movers.c.gain_rank <= max(limit, 1), movers.c.loss_rank <= limit))
+        )
+        rows = (await self.db.execute(query)).all()
+        if not rows:
+            return {"top_gainers": [], "top_losers": [], "statistics": self._format_statistics({})}
+
+        gainers = sorted(
+            (row for row in rows if row.gain_rank <= limit and row[0].change_rate is not None and row[0].change_rate > 0),
+            key=lambda row: row.gain_rank,
+        )
+        losers = sorted(
+            (row for row in rows if row.loss_rank <= limit and row[0].change_rate is not None and row[0].change_rate < 0),
+            key=lambda row: row.loss_rank,
+        )
+        first = rows[0]._asdict()
         return {
-            "total_companies": len(latest_prices),
-            "positive_change": positive_count,
-            "negative_change": negative_count,
-            "unchanged": unchanged_count,
-            "average_change_rate": round(sum(valid_changes) / len(valid_changes), 2) if valid_changes else 0.0,
-            "max_change_rate": round(max(valid_changes), 2) if valid_changes else 0.0,
-            "min_change_rate": round(min(valid_changes), 2) if valid_changes else 0.0,
-            "total_market_cap": sum(valid_market_caps) if valid_market_caps else 0
+            "top_gainers": [row[0] for row in gainers],
+            "top_losers": [row[0] for row in losers],
+            "statistics": self._format_statistics({name: first[name] for name in aggregates}),
         }
-    
+
     async def count_total(self) -> int:
         """전체 주가 레코드 개수 조회"""
         query = select(func.count(StockPriceModel.id))
@@ -226,49 +444,165 @@ class StockPriceRepository:
         """주가 정보 수정 (기존 로직 유지)"""
         stockprice = await self.get_by_id(stockprice_id)
         if stockprice:
+            symbols = {stockprice.symbol}
             update_data = stockprice_data.model_dump(exclude_unset=True)
             for key, value in update_data.items():
                 setattr(stockprice, key, value)
             
             stockprice.updated_at = func.now()
+            symbols.add(stockprice.symbol)
             
+            await self.db.flush()
+            await self._refresh_latest(symbols)
             await self.db.commit()
             await self.db.refresh(stockprice)
         return stockprice
     
-    async def bulk_create(self, stockprices_data: List[WeeklyStockPriceCreate]) -> List[StockPriceModel]:
-        """주가 정보 대량 생성 (항상 새로 추가)"""
+    @staticmethod
+    def _row_values(data: WeeklyStockPriceCreate) -> dict:
+        return {field: getattr(data, field) for field in WEEKLY_PRICE_FIELDS}
+
+    async def bulk_create(
+        self,
+        stockprices_data: List[WeeklyStockPriceCreate],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> List[StockPriceModel]:
+        """
+        주가 정보 대량 생성 (항상 새로 추가).
+        청크마다 INSERT ... RETURNING 한 번으로 넣고 생성된 행을 바로 받으므로, 행마다 refresh 하던 왕복이 없습니다.
+        생성된 행은 입력과 같은 순서로 반환합니다.
+        """
+        statement = insert(StockPriceModel).returning(StockPriceModel, sort_by_parameter_order=True)
         stockprices = []
-        for data in stockprices_data:
-            stockprice = StockPriceModel(
-                symbol=data.symbol,
-                market_cap=data.market_cap,
-                today=data.today,
-                last_week=data.last_week,
-                change_rate=data.change_rate,
-                week_high=data.week_high,
-                week_low=data.week_low,
-                error=data.error,
-                this_friday_date=data.this_friday_date,
-                last_friday_date=data.last_friday_date,
-                data_source=data.data_source
+        for start in range(0, len(stockprices_data), chunk_size):
+            rows = [self._row_values(data) for data in stockprices_data[start:start + chunk_size]]
+            result = await self.db.scalars(statement, rows)
+            stockprices.extend(result.all())
+        await self._refresh_latest(stockprice.symbol for stockprice in stockprices)
+        await self.db.commit()
+        return stockprices
+
+    def _dialect_insert(self):
+        """upsert 절을 붙일 수 있는 방언별 insert 생성자. 지원하지 않는 데이터베이스면 None."""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect in ("mysql", "mariadb"):
+            from sqlalchemy.dialects.mysql import insert as dialect_insert
+        else:
+            return None
+        return dialect_insert
+
+    def _upsert_statement(self):
+        """
+        (symbol, this_friday_date) 가 겹치면 새 값으로 덮어쓰는 방언별 INSERT 문. 값은 실행 시 행 목록으로 넘깁니다.
+        방언별 upsert 가 없는 데이터베이스면 None 을 반환합니다 (_upsert_rows 로 대신합니다).
+        """
+        dialect_insert = self._dialect_insert()
+        if dialect_insert is None:
+            return None
+        updated = [field for field in WEEKLY_PRICE_FIELDS if field not in WEEKLY_PRICE_KEY]
+        statement = dialect_insert(StockPriceModel)
+        if hasattr(statement, "on_conflict_do_update"):
+            values = {field: statement.excluded[field] for field in updated}
+            if "updated_at" in StockPriceModel.__table__.c:
+                values["updated_at"] = func.now()
+            return statement.on_conflict_do_update(index_elements=list(WEEKLY_PRICE_KEY), set_=values)
+        return statement.on_duplicate_key_update({field: statement.inserted[field] for field in updated})
+
+    async def _upsert_rows(self, rows: List[dict]) -> List[StockPriceModel]:
+        """방언별 upsert 가 없을 때: 같은 키의 기존 행을 읽어 와 갱신하고, 없는 행만 추가합니다. 입력 순서대로 반환합니다."""
+        existing = await self.db.scalars(
+            select(StockPriceModel).where(
+                StockPriceModel.symbol.in_({row["symbol"] for row in rows}),
+                StockPriceModel.this_friday_date.in_({row["this_friday_date"] for row in rows}),
             )
+        )
+        by_key = {tuple(getattr(stockprice, field) for field in WEEKLY_PRICE_KEY): stockprice for stockprice in existing}
+        stockprices = []
+        for row in rows:
+            stockprice = by_key.get(tuple(row[field] for field in WEEKLY_PRICE_KEY))
+            if stockprice is None:
+                stockprice = StockPriceModel(**row)
+                self.db.add(stockprice)
+            else:
+                for field, value in row.items():
+                    setattr(stockprice, field, value)
+                if "updated_at" in StockPriceModel.__table__.c:
+                    stockprice.updated_at = func.now()
             stockprices.append(stockprice)
-        
-        self.db.add_all(stockprices)
+        await self.db.flush()
+        return stockprices
+
+    async def bulk_upsert(
+        self,
+        stockprices_data: List[WeeklyStockPriceCreate],
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> List[StockPriceModel]:
+        """
+        주가 정보 대량 upsert. 같은 (symbol, this_friday_date) 행이 있으면 갱신하고 없으면 추가합니다.
+        (symbol, this_friday_date) 에 유니크 제약이 있어야 하며, 한 청크 안의 중복 키는 마지막 값만 남깁니다.
+        RETURNING 을 지원하지 않는 방언(MySQL)에서는 반영한 행 대신 빈 목록을 반환합니다.
+        방언별 upsert 가 없는 데이터베이스에서는 기존 행 조회 후 갱신·추가로 대신합니다.
+        """
+        latest_by_key = {}
+        for data in stockprices_data:
+            row = self._row_values(data)
+            latest_by_key[tuple(row[field] for field in WEEKLY_PRICE_KEY)] = row
+        rows = list(latest_by_key.values())
+
+        statement = self._upsert_statement()
+        supports_returning = self.db.get_bind().dialect.insert_returning
+        if statement is not None and supports_returning:
+            statement = statement.returning(StockPriceModel).execution_options(populate_existing=True)
+        stockprices = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            if statement is None:
+                stockprices.extend(await self._upsert_rows(chunk))
+            elif supports_returning:
+                stockprices.extend((await self.db.scalars(statement, chunk)).all())
+            else:
+                await self.db.execute(statement, chunk)
+        await self._refresh_latest(row["symbol"] for row in rows)
         await self.db.commit()
-        
-        # 새로 생성된 ID로 다시 조회
-        for stockprice in stockprices:
-            await self.db.refresh(stockprice)
-        
         return stockprices
-    
+
+    async def copy_create(self, stockprices_data: List[WeeklyStockPriceCreate]) -> int:
+        """
+        PostgreSQL(asyncpg) 전용 COPY 적재. 생성된 행을 돌려받지 않는 대신 가장 빠르며, 넣은 행 수를 반환합니다.
+        다른 드라이버에서는 RETURNING 없는 청크 INSERT 로 대신합니다.
+        """
+        records = [tuple(getattr(data, field) for field in WEEKLY_PRICE_FIELDS) for data in stockprices_data]
+        if not records:
+            return 0
+        connection = await self.db.connection()
+        if connection.dialect.name == "postgresql" and connection.dialect.driver == "asyncpg":
+            raw_connection = await connection.get_raw_connection()
+            table = StockPriceModel.__table__
+            await raw_connection.driver_connection.copy_records_to_table(
+                table.name, records=records, columns=list(WEEKLY_PRICE_FIELDS), schema_name=table.schema,
+            )
+        else:
+            for start in range(0, len(records), BULK_CHUNK_SIZE):
+                chunk = records[start:start + BULK_CHUNK_SIZE]
+                await self.db.execute(
+                    insert(StockPriceModel.__table__),
+                    [dict(zip(WEEKLY_PRICE_FIELDS, record)) for record in chunk],
+                )
+        await self._refresh_latest(data.symbol for data in stockprices_data)
+        await self.db.commit()
+        return len(records)
+
     async def delete(self, stockprice_id: int) -> bool:
         """주가 정보 삭제"""
         stockprice = await self.get_by_id(stockprice_id)
         if stockprice:
             await self.db.delete(stockprice)
+            await self.db.flush()
+            await self._refresh_latest([stockprice.symbol])
             await self.db.commit()
             return True
         return False
@@ -0,0 +1,14 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class KpiCompareRequest(BaseModel):
+    """여러 기업 KPI 비교 요청"""
+    companies: List[str] = Field(..., min_length=1, description="기업명 또는 DART 8자리 코드 목록")
+    years: List[str] = Field(..., min_length=1, description="사업연도 목록 (예: [\"2023\", \"2024\"])")
+    reprt_codes: List[str] = Field(
+        default_factory=lambda: ["11011"],
+        min_length=1,
+        description="보고서 코드 목록 (11011: 사업보고서, 11012: 반기보고서, 11013: 1분기, 11014: 3분기)",
+    )
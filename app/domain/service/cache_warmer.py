@@ -0,0 +1,141 @@
+"""
+백그라운드 캐시 워머
+
+SUPPORTED_COMPANIES 전체의 보고서 목록과 최근 기간 KPI를 주기적으로 미리 갱신해
+재시작이나 TTL 만료 뒤 첫 사용자도 캐시 적중을 받도록 합니다.
+만료가 임박했거나(refresh-ahead) 이미 stale 인 항목만 갱신하고, 확정된 기간(만료 없음)은 건너뜁니다.
+DART 호출량을 지키기 위해 작업 사이에 지터가 섞인 간격을 두고, 사용자 요청보다 뒤(background 우선순위)에 호출합니다.
+"""
+import asyncio
+import os
+import random
+import time
+from datetime import date
+
+from app.config.companies import SUPPORTED_COMPANIES
+from app.core.logging_config import get_logger
+from app.core.metrics import REGISTRY
+from app.domain.client.dart_rate_limiter import PRIORITY_BACKGROUND, request_priority
+from .kpi_compare_service import cache
+
+logger = get_logger("cache_warmer")
+
+REPORT_CODES = ("11013", "11012", "11014", "11011")
+# 보고서 코드별 보고 기간 종료일 (월, 일). 기간이 끝나기 전에는 제출될 수 없으므로 워밍 대상에서 제외합니다.
+REPORT_PERIOD_END = {"11013": (3, 31), "11012": (6, 30), "11014": (9, 30), "11011": (12, 31)}
+
+WARMER_REFRESHES = REGISTRY.counter(
+    "kpi_cache_warmer_refreshes_total", "캐시 워머 갱신 결과 (result=refreshed|skipped|failed)", labelnames=("kind", "result"),
+)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+class CacheWarmer:
+    def __init__(
+        self,
+        service,
+        companies=None,
+        years: int = None,
+        rate_per_second: float = None,
+        interval: float = None,
+        refresh_ahead: float = None,
+    ):
+        self.service = service
+        self.companies = companies if companies is not None else SUPPORTED_COMPANIES
+        self.years = years or int(os.getenv("KPI_WARMER_YEARS", "2"))
+        self.rate_per_second = rate_per_second or float(os.getenv("KPI_WARMER_RATE", "1.0"))
+        self.interval = interval or float(os.getenv("KPI_WARMER_INTERVAL", "300"))
+        # 만료까지 남은 시간이 이 값(초)보다 짧으면 미리 갱신합니다.
+        self.refresh_ahead = refresh_ahead or float(os.getenv("KPI_WARMER_REFRESH_AHEAD", "120"))
+        self._task = None
+
+    @staticmethod
+    def enabled_by_env() -> bool:
+        return _env_bool("KPI_CACHE_WARMER", os.getenv("ENV", "development") == "production")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("🔥 [캐시 워머] 시작 (기업 %d개, 최근 %d년)", len(self.companies), self.years)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def recent_periods(self, today: date = None):
+        today = today or date.today()
+        periods = []
+        for year in range(today.year - self.years + 1, today.year + 1):
+            for reprt_code in REPORT_CODES:
+                month, day = REPORT_PERIOD_END[reprt_code]
+                if date(year, month, day) < today:
+                    periods.append((str(year), reprt_code))
+        return periods
+
+    async def _needs_refresh(self, cache_key: str) -> bool:
+        entry = await cache.lookup(cache_key, record=False)
+        if entry is None:
+            return True
+        _, fresh, expires_at = entry
+        if expires_at is None:
+            return False
+        return not fresh or expires_at - time.time() < self.refresh_ahead
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(0.8, 1.2)
+
+    async def run_once(self):
+        """한 바퀴 돌며 갱신이 필요한 항목만 DART에서 다시 가져옵니다. 갱신한 항목 수를 반환합니다."""
+        jobs = []
+        for company in self.companies:
+            jobs.append(("reports", company, None, None))
+            for bsns_year, reprt_code in self.recent_periods():
+                jobs.append(("kpi", company, bsns_year, reprt_code))
+        # 워커가 여러 개여도 같은 순서로 몰리지 않도록 섞습니다.
+        random.shuffle(jobs)
+
+        refreshed = 0
+        for kind, company, bsns_year, reprt_code in jobs:
+            corp_code = company['corp_code']
+            cache_key = f"reports_{corp_code}" if kind == "reports" else f"kpi_{corp_code}_{bsns_year}_{reprt_code}"
+            if not await self._needs_refresh(cache_key):
+                WARMER_REFRESHES.inc(kind, "skipped")
+                continue
+            try:
+                with request_priority(PRIORITY_BACKGROUND):
+                    if kind == "reports":
+                        await self.service.refresh_reports(corp_code)
+                    else:
+                        await self.service.refresh_kpi_for_period(company, bsns_year, reprt_code)
+                WARMER_REFRESHES.inc(kind, "refreshed")
+                refreshed += 1
+            except Exception as e:
+                WARMER_REFRESHES.inc(kind, "failed")
+                logger.warning("⚠️ [캐시 워머] %s 갱신 실패: %s", cache_key, e)
+            await asyncio.sleep(self._jittered(1.0 / self.rate_per_second))
+        return refreshed
+
+    async def _run(self):
+        # 여러 워커가 동시에 시작해도 첫 바퀴가 겹치지 않도록 시작 시점을 흩뜨립니다.
+        await asyncio.sleep(random.uniform(0, min(30.0, self.interval)))
+        while True:
+            started = time.perf_counter()
+            try:
+                refreshed = await self.run_once()
+                logger.info("🔥 [캐시 워머] %d개 항목 갱신 (%.1fs)", refreshed, time.perf_counter() - started)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("❌ [캐시 워머] 실행 오류")
+            await asyncio.sleep(self._jittered(self.interval))
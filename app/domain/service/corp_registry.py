@@ -0,0 +1,218 @@
+"""
+DART 전체 기업 레지스트리 (corpCode.xml → 컬럼형 바이너리 파일)
+
+corpCode.xml(약 10만 개 기업)을 iterparse 로 한 건씩 읽어 아래 형식의 파일로 저장하고,
+서비스는 이 파일을 mmap 으로 열어 프로세스마다 XML 사본을 두지 않고 조회합니다.
+
+    헤더       MAGIC(8) + 버전, 기업 수, 상장사 수, 이름 blob 크기 (uint32 x4)
+    corp_code  기업 수 x 8바이트 ASCII (정렬됨 → 이진 탐색)
+    stock_code 기업 수 x 6바이트 ASCII (비상장은 공백)
+    modify_date 기업 수 x 8바이트 ASCII (YYYYMMDD)
+    name_offsets (기업 수 + 1) x uint32, 이름 blob 내 시작 위치
+    stock_order 상장사 수 x uint32, 종목코드 순으로 정렬한 행 번호
+    names      UTF-8 기업명 blob
+
+modify_date 로 바뀐 기업만 반영하는 증분 갱신을 지원합니다.
+"""
+import mmap
+import os
+import struct
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from app.core.logging_config import get_logger
+
+logger = get_logger("corp_registry")
+
+CORP_REGISTRY_PATH = os.getenv(
+    "CORP_REGISTRY_PATH", os.path.join(os.path.dirname(__file__), '../../data/corp_registry.bin')
+)
+
+MAGIC = b"CORPREG1"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIII")
+_CORP_CODE_SIZE = 8
+_STOCK_CODE_SIZE = 6
+_MODIFY_DATE_SIZE = 8
+_EMPTY_STOCK_CODE = b" " * _STOCK_CODE_SIZE
+
+
+def iter_corp_code_xml(source):
+    """corpCode.xml 을 한 건씩 스트리밍합니다. source 는 파일 경로나 바이너리 파일 객체입니다."""
+    context = ET.iterparse(source, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event != "end" or elem.tag != "list":
+            continue
+        stock_code = (elem.findtext("stock_code") or "").strip()
+        yield {
+            'corp_code': (elem.findtext("corp_code") or "").strip(),
+            'corp_name': (elem.findtext("corp_name") or "").strip(),
+            'stock_code': stock_code or None,
+            'modify_date': (elem.findtext("modify_date") or "").strip(),
+        }
+        # 이미 읽은 항목을 버려 전체 트리가 메모리에 쌓이지 않도록 합니다.
+        elem.clear()
+        root.clear()
+
+
+def write_registry(records, path: str):
+    """기업 레코드를 corp_code 순으로 정렬해 레지스트리 파일로 씁니다. 임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 중간 상태를 보지 않습니다."""
+    records = sorted(records, key=lambda r: r['corp_code'])
+    corp_codes = bytearray()
+    stock_codes = bytearray()
+    modify_dates = bytearray()
+    offsets = [0]
+    names = bytearray()
+    listed = []
+    for row, record in enumerate(records):
+        corp_codes += record['corp_code'].encode("ascii").ljust(_CORP_CODE_SIZE)[:_CORP_CODE_SIZE]
+        stock_code = record.get('stock_code')
+        if stock_code:
+            stock_codes += stock_code.encode("ascii").ljust(_STOCK_CODE_SIZE)[:_STOCK_CODE_SIZE]
+            listed.append((stock_code, row))
+        else:
+            stock_codes += _EMPTY_STOCK_CODE
+        modify_dates += (record.get('modify_date') or "").encode("ascii").ljust(_MODIFY_DATE_SIZE, b"0")[:_MODIFY_DATE_SIZE]
+        names += record['corp_name'].encode("utf-8")
+        offsets.append(len(names))
+    listed.sort()
+    stock_order = [row for _, row in listed]
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(records), len(stock_order), len(names)))
+        f.write(corp_codes)
+        f.write(stock_codes)
+        f.write(modify_dates)
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(struct.pack(f"<{len(stock_order)}I", *stock_order))
+        f.write(names)
+    os.replace(tmp_path, path)
+    return len(records)
+
+
+def build_registry(source, path: str = CORP_REGISTRY_PATH, incremental: bool = True) -> dict:
+    """
+    corpCode.xml 로 레지스트리를 만듭니다.
+    incremental=True 이고 기존 파일이 있으면 기존 레지스트리의 최신 modify_date 이후에 바뀐 기업만 덮어씁니다.
+    """
+    existing = CorpRegistry.open(path) if incremental else None
+    if existing is None:
+        count = write_registry(iter_corp_code_xml(source), path)
+        logger.info("🏗️ [기업 레지스트리] 전체 생성 (%d개)", count)
+        return {"mode": "full", "total": count, "added": count, "updated": 0}
+
+    since = existing.max_modify_date()
+    records = {record['corp_code']: record for record in existing.iter_companies()}
+    existing.close()
+    added = updated = 0
+    for record in iter_corp_code_xml(source):
+        if record['modify_date'] <= since and record['corp_code'] in records:
+            continue
+        if record['corp_code'] in records:
+            updated += 1
+        else:
+            added += 1
+        records[record['corp_code']] = record
+    if added or updated:
+        write_registry(records.values(), path)
+    logger.info("🏗️ [기업 레지스트리] 증분 갱신 (기준일 %s, 추가 %d, 변경 %d)", since, added, updated)
+    return {"mode": "incremental", "since": since, "total": len(records), "added": added, "updated": updated}
+
+
+class CorpRegistry:
+    """mmap 으로 연 레지스트리 파일. 열 배열은 numpy 뷰라 파일 크기만큼의 사본을 만들지 않습니다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, listed_count, names_size = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"지원하지 않는 기업 레지스트리 형식입니다: {path}")
+        self.count = count
+        offset = _HEADER.size
+        self._corp_codes = np.frombuffer(self._mm, dtype=f"S{_CORP_CODE_SIZE}", count=count, offset=offset)
+        offset += count * _CORP_CODE_SIZE
+        self._stock_codes = np.frombuffer(self._mm, dtype=f"S{_STOCK_CODE_SIZE}", count=count, offset=offset)
+        offset += count * _STOCK_CODE_SIZE
+        self._modify_dates = np.frombuffer(self._mm, dtype=f"S{_MODIFY_DATE_SIZE}", count=count, offset=offset)
+        offset += count * _MODIFY_DATE_SIZE
+        self._name_offsets = np.frombuffer(self._mm, dtype="<u4", count=count + 1, offset=offset)
+        offset += (count + 1) * 4
+        self._stock_order = np.frombuffer(self._mm, dtype="<u4", count=listed_count, offset=offset)
+        offset += listed_count * 4
+        self._names_start = offset
+        # 종목코드 이진 탐색용 정렬 배열 (상장사 수 x 6바이트, 수십 KB)
+        self._sorted_stock_codes = self._stock_codes[self._stock_order]
+
+    @classmethod
+    def open(cls, path: str = CORP_REGISTRY_PATH):
+        """파일이 없으면 None 을 반환합니다. 레지스트리는 선택 사항이라 없을 때는 지원 기업 목록만 사용합니다."""
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def close(self):
+        # numpy 뷰가 mmap 버퍼를 참조하고 있으므로 먼저 놓아 줍니다.
+        self._corp_codes = self._stock_codes = self._modify_dates = None
+        self._name_offsets = self._stock_order = self._sorted_stock_codes = None
+        try:
+            self._mm.close()
+        except BufferError:
+            # 아직 뷰를 잡고 있는 곳이 있으면 GC 에 맡깁니다.
+            pass
+        self._file.close()
+
+    def is_stale(self) -> bool:
+        """빌드 스크립트가 파일을 교체했는지 확인합니다."""
+        return os.path.exists(self.path) and os.path.getmtime(self.path) != self.mtime
+
+    def __len__(self):
+        return self.count
+
+    def _row(self, row: int) -> dict:
+        start, end = int(self._name_offsets[row]), int(self._name_offsets[row + 1])
+        stock_code = self._stock_codes[row].decode("ascii").strip()
+        return {
+            'corp_name': self._mm[self._names_start + start:self._names_start + end].decode("utf-8"),
+            'corp_code': self._corp_codes[row].decode("ascii"),
+            'stock_code': stock_code or None,
+            'modify_date': self._modify_dates[row].decode("ascii"),
+        }
+
+    def get(self, corp_code: str):
+        key = corp_code.encode("ascii", "ignore")
+        row = int(np.searchsorted(self._corp_codes, key))
+        if row < self.count and self._corp_codes[row] == key:
+            return self._row(row)
+        return None
+
+    def find_by_stock_code(self, stock_code: str):
+        key = stock_code.encode("ascii", "ignore")
+        pos = int(np.searchsorted(self._sorted_stock_codes, key))
+        if pos < len(self._sorted_stock_codes) and self._sorted_stock_codes[pos] == key:
+            return self._row(int(self._stock_order[pos]))
+        return None
+
+    def iter_companies(self, listed_only: bool = False):
+        rows = self._stock_order if listed_only else range(self.count)
+        for row in rows:
+            yield self._row(int(row))
+
+    def max_modify_date(self) -> str:
+        if self.count == 0:
+            return ""
+        # 8바이트 ASCII 숫자는 빅엔디언 정수로 보면 사전순과 대소가 같습니다.
+        return int(self._modify_dates.view(">u8").max()).to_bytes(8, "big").decode("ascii")
+
+    def changed_since(self, modify_date: str):
+        """modify_date(YYYYMMDD) 이후 변경된 기업을 반환합니다."""
+        rows = np.nonzero(self._modify_dates > modify_date.encode("ascii"))[0]
+        return [self._row(int(row)) for row in rows]
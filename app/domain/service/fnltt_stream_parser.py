@@ -0,0 +1,170 @@
+"""
+fnlttSinglAcntAll 응답 스트리밍 파서
+
+연결재무제표 응답은 수백 개 계정(수백 KB)이지만 KPI 산식이 쓰는 계정은 열 개 남짓입니다.
+응답 본문을 청크 단위로 받아 "list" 배열의 항목을 정규식으로 하나씩 잘라내고,
+account_id 가 필요한 계정일 때만 금액 필드를 읽습니다. 전체 JSON 트리나 항목 dict 를 만들지 않으므로
+최대 메모리가 응답 크기와 무관하게 청크 하나 + 항목 하나 수준으로 유지됩니다.
+"""
+import json
+import re
+import time
+
+# 중첩 없는 JSON 객체 하나 (문자열 안의 중괄호와 이스케이프 처리). 닫히지 않은 객체는 일치하지 않습니다.
+ITEM_PATTERN = re.compile(rb'\{(?:[^{}"]|"(?:[^"\\]|\\.)*")*\}')
+_LIST_START = re.compile(rb'"list"\s*:\s*\[')
+_SEPARATORS = re.compile(rb'[\s,]*')
+
+
+def _field_pattern(name: bytes):
+    return re.compile(rb'"' + name + rb'"\s*:\s*(?:"((?:[^"\\]|\\.)*)"|null)')
+
+
+_THSTRM_AMOUNT = _field_pattern(b"thstrm_amount")
+_FRMTRM_AMOUNT = _field_pattern(b"frmtrm_amount")
+_STATUS = _field_pattern(b"status")
+_MESSAGE = _field_pattern(b"message")
+
+
+def parse_amount(raw) -> int:
+    """DART 금액 문자열을 정수로 바꿉니다. 대부분인 순수 숫자는 int() 한 번으로 끝나고, 쉼표·'-'·빈 값만 느린 경로를 탑니다."""
+    if not raw:
+        return 0
+    try:
+        return int(raw)
+    except ValueError:
+        value = raw.replace(b",", b"").strip()
+        return 0 if value in (b"", b"-") else int(value)
+
+
+def _string_value(buffer: bytes, key: bytes, start: int, end: int):
+    """buffer[start:end] 의 평평한 JSON 객체에서 key 의 문자열 값을 정규식·복사 없이 꺼냅니다. 없거나 null 이면 None."""
+    found = buffer.find(key, start, end)
+    if found < 0:
+        return None
+    colon = buffer.find(b":", found + len(key), end)
+    quote = buffer.find(b'"', colon + 1, end)
+    if colon < 0 or quote < 0 or buffer[colon + 1:quote].strip():
+        return None
+    return buffer[quote + 1:buffer.find(b'"', quote + 1, end)]
+
+
+def _decode_string(raw: bytes) -> str:
+    return json.loads(b'"' + raw + b'"')
+
+
+class FnlttStreamParser:
+    """
+    feed(chunk) 로 응답 본문을 넣고 close() 로 결과를 받습니다.
+    wanted_account_ids 가 None 이면 모든 계정을 보관합니다 (기존 동작과 동일).
+    같은 account_id 가 여러 번 나오면 기존 파서처럼 마지막 값이 남습니다.
+    """
+
+    def __init__(self, wanted_account_ids=None):
+        self.wanted_account_ids = wanted_account_ids
+        self.reset()
+
+    def reset(self):
+        """받던 응답을 버리고 처음 상태로 되돌립니다 (DART 호출을 다시 시도할 때)."""
+        self.thstrm = {}
+        self.frmtrm = {}
+        self.item_count = 0
+        # 다운로드와 번갈아 진행되므로 feed() 안에서 쓴 시간만 따로 누적합니다.
+        self.parse_seconds = 0.0
+        self._buffer = b""
+        self._header = b""
+        self._in_list = False
+        self._list_done = False
+
+    def feed(self, chunk: bytes):
+        started = time.perf_counter()
+        try:
+            self._feed(chunk)
+        finally:
+            self.parse_seconds += time.perf_counter() - started
+
+    def _feed(self, chunk: bytes):
+        buffer = self._buffer + chunk if self._buffer else chunk
+        if not self._in_list:
+            match = _LIST_START.search(buffer)
+            if match is None:
+                # list 이전의 헤더(status, message)는 짧으므로 그대로 모아 둡니다.
+                self._buffer = buffer
+                return
+            self._header = buffer[:match.start()]
+            buffer = buffer[match.end():]
+            self._in_list = True
+        if self._list_done:
+            self._buffer = buffer
+            return
+        self._buffer = buffer[self._consume_items(buffer):]
+
+    def _consume_items(self, buffer: bytes) -> int:
+        position = 0
+        wanted = self.wanted_account_ids
+        thstrm, frmtrm = self.thstrm, self.frmtrm
+        while True:
+            position = _SEPARATORS.match(buffer, position).end()
+            if position >= len(buffer):
+                return position
+            if buffer[position] == 0x5D:  # ']'
+                self._list_done = True
+                return position + 1
+            end = self._item_end(buffer, position)
+            if end < 0:
+                # 항목이 청크 경계에서 잘렸으므로 다음 청크를 기다립니다.
+                return position
+            start, position = position, end
+            self.item_count += 1
+            account = _string_value(buffer, b'"account_id"', start, end)
+            if not account:
+                continue
+            # 비표준 계정은 "-표준계정코드 미사용-" 같은 한글 ID 로 오므로 기존 파서(json)와 같게 디코드합니다.
+            account_id = _decode_string(account) if b"\\" in account else account.decode("utf-8")
+            if wanted is not None and account_id not in wanted:
+                continue
+            item = buffer[start:end]
+            amount = _THSTRM_AMOUNT.search(item)
+            if amount is not None:
+                thstrm[account_id] = parse_amount(amount.group(1))
+            amount = _FRMTRM_AMOUNT.search(item)
+            if amount is not None:
+                frmtrm[account_id] = parse_amount(amount.group(1))
+
+    @staticmethod
+    def _item_end(buffer: bytes, position: int) -> int:
+        """position 에서 시작하는 항목의 끝 위치(닫는 중괄호 다음)를 반환합니다. 아직 닫히지 않았으면 -1."""
+        # 빠른 경로: 첫 '}' 앞의 따옴표 수가 짝수이고 이스케이프가 없으면 그 '}' 가 항목의 끝입니다.
+        close = buffer.find(b"}", position)
+        if close < 0:
+            return -1
+        if buffer.count(b'"', position, close) % 2 == 0 and buffer.find(b"\\", position, close) < 0:
+            return close + 1
+        # 문자열 값 안에 '}' 나 이스케이프가 있는 드문 경우만 정규식으로 정확히 찾습니다.
+        match = ITEM_PATTERN.match(buffer, position)
+        return match.end() if match else -1
+
+    def close(self) -> dict:
+        """status, message 와 당기(thstrm)·전기(frmtrm) 계정별 금액을 반환합니다."""
+        if not self._in_list:
+            # 013(데이터 없음)이나 오류 응답처럼 list 가 없는 작은 본문입니다.
+            data = json.loads(self._buffer) if self._buffer.strip() else {}
+            return {"status": data.get("status"), "message": data.get("message"), "thstrm": {}, "frmtrm": {}, "item_count": 0}
+        envelope = self._header + self._buffer
+        status = _STATUS.search(envelope)
+        message = _MESSAGE.search(envelope)
+        return {
+            "status": _decode_string(status.group(1)) if status and status.group(1) is not None else None,
+            "message": _decode_string(message.group(1)) if message and message.group(1) is not None else None,
+            "thstrm": self.thstrm,
+            "frmtrm": self.frmtrm,
+            "item_count": self.item_count,
+        }
+
+    @classmethod
+    def parse(cls, body: bytes, wanted_account_ids=None, chunk_size: int = 65536) -> dict:
+        """이미 받은 본문을 청크로 나눠 파싱합니다 (녹화된 응답 재생, 벤치마크용)."""
+        parser = cls(wanted_account_ids)
+        for start in range(0, len(body), chunk_size):
+            parser.feed(body[start:start + chunk_size])
+        return parser.close()
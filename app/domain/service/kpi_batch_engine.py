@@ -0,0 +1,104 @@
+"""
+벡터화 KPI 엔진
+
+여러 기업·기간의 재무 데이터를 (셀, 계정, 연도 오프셋) 3차원 배열로 모은 뒤
+컴파일된 산식을 numpy 열 연산으로 한 번에 평가합니다.
+스칼라 경로(KpiPlan.evaluate)의 ValueError/ZeroDivisionError 대신 NaN 이 전파됩니다.
+"""
+import numpy as np
+import pandas as pd
+
+
+class KpiBatchEngine:
+    def __init__(self, plans):
+        self.plans = [plan for plan in plans if plan.compile_error is None]
+        self.kpi_names = [plan.kpi_name for plan in self.plans]
+        # 산식에서 참조하는 (계정, alias 후보)와 연도 오프셋을 축으로 고정합니다.
+        self._accounts = {}
+        offsets = set()
+        for plan in self.plans:
+            for var in plan.variables:
+                self._accounts.setdefault(var.account_id, var.aliases)
+                offsets.add(var.offset)
+        self._account_index = {account_id: i for i, account_id in enumerate(self._accounts)}
+        self._offsets = sorted(offsets)
+        self._offset_index = {offset: i for i, offset in enumerate(self._offsets)}
+
+    @property
+    def offsets(self) -> list:
+        """산식이 참조하는 연도 오프셋 (예: [-1, 0])."""
+        return list(self._offsets)
+
+    def build_tensor(self, cells: list, financials_by_cell: dict) -> np.ndarray:
+        """
+        cells 순서대로 (셀, 계정, 오프셋) float64 배열을 만듭니다. 값이 없으면 NaN.
+        cells 의 각 항목은 (corp_code, bsns_year, reprt_code) 이고, financials_by_cell 은 그 키로
+        _get_financials_for_report 결과({연도: {account_id: 금액}})를 담습니다.
+        """
+        tensor = np.full((len(cells), len(self._accounts), len(self._offsets)), np.nan)
+        for c, cell in enumerate(cells):
+            financials = financials_by_cell.get(cell)
+            if not financials:
+                continue
+            bsns_year = int(cell[1])
+            for o, offset in enumerate(self._offsets):
+                financials_for_year = financials.get(bsns_year + offset)
+                if not financials_for_year:
+                    continue
+                for a, aliases in enumerate(self._accounts.values()):
+                    for alias_id in aliases:
+                        if alias_id in financials_for_year:
+                            tensor[c, a, o] = financials_for_year[alias_id]
+                            break
+        return tensor
+
+    def evaluate_tensor(self, tensor: np.ndarray, failures: dict = None, rows: np.ndarray = None) -> np.ndarray:
+        """
+        모든 KPI 산식을 열 연산으로 평가해 (셀, KPI) 배열을 반환합니다.
+        failures 를 넘기면 값이 없는 결과를 {(kpi_name, reason): 셀 수} 로 더합니다. reason 은 스칼라 경로와 같이
+        입력 계정이 없으면 missing_data, 입력은 있는데 0으로 나눴으면 zero_division 이며, rows 로 셀 수를 셀 행을 고릅니다.
+        """
+        results = np.full((tensor.shape[0], len(self.plans)), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for k, plan in enumerate(self.plans):
+                context = {
+                    var.name: tensor[:, self._account_index[var.account_id], self._offset_index[var.offset]]
+                    for var in plan.variables
+                }
+                values = np.asarray(plan.expression(context), dtype=float)
+                # 0으로 나눈 결과(inf)는 스칼라 경로의 ZeroDivisionError 와 같이 값 없음으로 처리합니다.
+                invalid = ~np.isfinite(values)
+                values[invalid] = np.nan
+                results[:, k] = values
+                if failures is not None:
+                    self._count_failures(plan, context, invalid, failures, rows)
+        return results
+
+    @staticmethod
+    def _count_failures(plan, context: dict, invalid: np.ndarray, failures: dict, rows: np.ndarray = None):
+        missing = np.zeros(invalid.shape, dtype=bool)
+        for column in context.values():
+            missing |= np.isnan(column)
+        if rows is not None:
+            invalid = invalid & rows
+        for reason, mask in (("missing_data", invalid & missing), ("zero_division", invalid & ~missing)):
+            count = int(mask.sum())
+            if count:
+                key = (plan.kpi_name, reason)
+                failures[key] = failures.get(key, 0) + count
+
+    def evaluate(self, cells: list, financials_by_cell: dict, failures: dict = None) -> pd.DataFrame:
+        """
+        (corp_code, bsns_year, reprt_code) MultiIndex × KPI 이름 DataFrame 을 반환합니다.
+        failures 에는 재무 데이터가 있는 셀의 실패만 셉니다 (가져오지 못한 셀은 셀 단위 오류로 따로 보고됩니다).
+        """
+        rows = np.array([cell in financials_by_cell for cell in cells], dtype=bool) if failures is not None else None
+        results = self.evaluate_tensor(self.build_tensor(cells, financials_by_cell), failures, rows)
+        index = pd.MultiIndex.from_tuples(cells, names=["corp_code", "bsns_year", "reprt_code"])
+        return pd.DataFrame(results, index=index, columns=self.kpi_names)
+
+    def to_python_value(self, plan, value):
+        """배열 값을 스칼라 경로와 같은 파이썬 타입으로 되돌립니다 (나눗셈 없는 산식은 int)."""
+        if value is None or np.isnan(value):
+            return None
+        return float(value) if plan.expression.has_division else int(value)
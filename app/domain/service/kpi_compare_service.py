@@ -1,19 +1,59 @@
 import os
-import httpx
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
 import pandas as pd
-import operator
-import ast
-from cachetools import TTLCache
 from fastapi import HTTPException
 from dotenv import load_dotenv
 from app.config.companies import SUPPORTED_COMPANIES
-import re
+from app.domain.client.dart_client import DartClient, DartUnavailableError, DART_API_URL
+from app.domain.client.dart_rate_limiter import PRIORITY_BACKGROUND, request_priority
+from app.core.singleflight import SingleFlight
+from app.core.tiered_cache import TieredCache
+from app.core.logging_config import get_logger
+from app.core.timing import span, record_span
+from app.core.staleness import mark_stale, track_staleness
+from app.core.metrics import REGISTRY
+from app.domain.service.kpi_formula_compiler import compile_kpi_plans, compile_expression, required_account_ids
+from app.domain.service.fnltt_stream_parser import FnlttStreamParser
+from app.domain.service.kpi_batch_engine import KpiBatchEngine
+from app.domain.service.company_index import CompanyIndex
+from app.domain.service.corp_registry import CorpRegistry
+from app.domain.repository.financial_fact_store import FinancialFactStore
 
 load_dotenv()
 
+logger = get_logger("kpi_compare_service")
+
 DART_API_KEY = os.getenv("DART_API_KEY")
-DART_API_URL = "https://opendart.fss.or.kr/api"
 KPI_METADATA_PATH = os.path.join(os.path.dirname(__file__), '../../data/KPI_for_dashboard_final.csv')
+KPI_CACHE_PATH = os.getenv("KPI_CACHE_PATH", os.path.join(os.path.dirname(__file__), '../../data/cache/kpi_cache.sqlite3'))
+KPI_CACHE_TTL = float(os.getenv("KPI_CACHE_TTL", "600"))
+KPI_CACHE_MEMORY_SIZE = int(os.getenv("KPI_CACHE_MEMORY_SIZE", "1024"))
+# 만료된 항목을 stale-while-revalidate 용으로 보존하는 기간
+KPI_CACHE_STALE_TTL = float(os.getenv("KPI_CACHE_STALE_TTL", "86400"))
+# DART 장애로 새 값을 받지 못할 때 마지막 값(stale 표시)으로 응답할 수 있는 기간
+KPI_CACHE_STALE_IF_ERROR_TTL = float(os.getenv("KPI_CACHE_STALE_IF_ERROR_TTL", "604800"))
+# 제출 기한이 지났는데도 CFS·OFS 모두 비어 있던(013) 보고서를 다시 확인하기까지의 시간
+KPI_NEGATIVE_CACHE_TTL = float(os.getenv("KPI_NEGATIVE_CACHE_TTL", "86400"))
+KPI_FACT_STORE_PATH = os.getenv("KPI_FACT_STORE_PATH", os.path.join(os.path.dirname(__file__), '../../data/cache/financial_facts.sqlite3'))
+KPI_FACT_STORE_BLOCKS = int(os.getenv("KPI_FACT_STORE_BLOCKS", "512"))
+KPI_COMPARE_CONCURRENCY = int(os.getenv("KPI_COMPARE_CONCURRENCY", "8"))
+KPI_COMPARE_MAX_CELLS = int(os.getenv("KPI_COMPARE_MAX_CELLS", "500"))
+KPI_TIMESERIES_MAX_YEARS = int(os.getenv("KPI_TIMESERIES_MAX_YEARS", "20"))
+
+# 보고서 코드별 제출 기한 (사업연도 기준 월, 일, 연도 보정)
+REPORT_DEADLINES = {
+    '11013': (5, 15, 0),   # 1분기보고서
+    '11012': (8, 14, 0),   # 반기보고서
+    '11014': (11, 14, 0),  # 3분기보고서
+    '11011': (3, 31, 1),   # 사업보고서 (익년 3월말)
+}
+# 전기 열이 같은 기간의 전년도 값인 보고서 (분기·반기 보고서의 재무상태표 전기 열은 전년도 말 값입니다)
+ANNUAL_REPORT_CODE = '11011'
+# 제출 기한 이후 정정공시를 기다리는 기간
+REPORT_AMENDMENT_GRACE_DAYS = 30
 
 ACCOUNT_ID_ALIASES = {
     'ifrs_full_Revenue': ['ifrs-full_Revenue', 'ifrs_Revenue', 'dart_OperatingRevenue', 'dart_Sales'],
@@ -27,23 +67,78 @@ ACCOUNT_ID_ALIASES = {
     'ifrs_full_CashFlowsFromUsedInOperatingActivities': ['ifrs-full_CashFlowsFromUsedInOperatingActivities', 'ifrs_CashFlowsFromUsedInOperatingActivities']
 }
 
-cache = TTLCache(maxsize=100, ttl=600)
+cache = TieredCache(
+    KPI_CACHE_PATH, memory_maxsize=KPI_CACHE_MEMORY_SIZE, default_ttl=KPI_CACHE_TTL, stale_ttl=KPI_CACHE_STALE_TTL,
+    stale_if_error_ttl=KPI_CACHE_STALE_IF_ERROR_TTL,
+)
+# 같은 캐시 키로 동시에 들어온 미스는 하나의 DART 호출을 공유합니다.
+inflight = SingleFlight()
+# 재무 금액은 연도·보고서 간에 공유되는 팩트로 저장합니다 (보고서 t 의 전기 금액 = 회계연도 t-1).
+fact_store = FinancialFactStore(KPI_FACT_STORE_PATH, max_blocks=KPI_FACT_STORE_BLOCKS)
+# 보고서마다 실제로 데이터가 있던 구분(CFS/OFS)의 팩트 블록에 저장하고, 그 구분은 fact_store 의 filing_sources 에
+# 기록합니다. 아직 아무 보고서도 받지 않은 기업은 연결재무제표(CFS)를 기본으로 읽습니다.
+FS_DIV = "CFS"
+FS_DIV_CANDIDATES = ("CFS", "OFS")
+
+KPI_EVALUATION_FAILURES = REGISTRY.counter(
+    "kpi_evaluation_failures_total", "KPI 계산 실패 수 (reason=missing_data|zero_division|error)", labelnames=("kpi_name", "reason"),
+)
+FS_DIV_RESOLUTIONS = REGISTRY.counter(
+    "kpi_fs_div_resolutions_total",
+    "보고서 재무제표 구분 결정 (result=remembered|fallback|probed|empty|negative)", labelnames=("result",),
+)
+REGISTRY.callback(
+    "kpi_singleflight_calls_total", "single-flight 호출 수 (result=executed|coalesced)",
+    lambda: {("executed",): inflight.executions, ("coalesced",): inflight.coalesced},
+    labelnames=("result",), type="counter",
+)
+REGISTRY.callback("kpi_singleflight_in_flight", "진행 중인 single-flight 업스트림 작업 수", lambda: {(): inflight.in_flight()})
+REGISTRY.callback("kpi_fact_store_blocks", "메모리에 올라온 팩트 블록 수", lambda: {(): fact_store.stats()["blocks"]})
 
 class KpiCompareService:
-    def __init__(self):
+    def __init__(self, dart_client: DartClient = None, corp_registry: CorpRegistry = None):
         self.dart_api_key = DART_API_KEY
         if not self.dart_api_key: self.dart_api_key = "test_key"
+        self.dart_client = dart_client or DartClient()
+        self.kpi_meta_mtime = None
         self.kpi_meta = self._load_kpi_metadata()
+        self.kpi_plans = compile_kpi_plans(self.kpi_meta, ACCOUNT_ID_ALIASES)
+        self.kpi_engine = KpiBatchEngine(self.kpi_plans)
+        self.required_account_ids = required_account_ids(self.kpi_plans, ACCOUNT_ID_ALIASES)
+        self.corp_registry = corp_registry
+        self.company_index = self._build_company_index()
+        self._background_tasks = set()
 
     def _load_kpi_metadata(self):
         try:
+            mtime = os.path.getmtime(KPI_METADATA_PATH)
             df = pd.read_csv(KPI_METADATA_PATH, dtype=str)
             df.set_index('재무지표명', inplace=True)
-            print("📊 KPI 메타데이터 로드 완료")
+            self.kpi_meta_mtime = mtime
+            logger.info("📊 KPI 메타데이터 로드 완료 (%d개)", len(df))
             return df
         except FileNotFoundError:
             raise HTTPException(status_code=500, detail=f"KPI 메타데이터 파일을 찾을 수 없습니다: {KPI_METADATA_PATH}")
 
+    async def reload_kpi_metadata(self, force: bool = False):
+        """
+        KPI 메타데이터 CSV가 변경되었으면 다시 읽고 산식을 재컴파일합니다.
+        새 계획이 모두 준비된 뒤에 교체하므로 진행 중인 요청은 이전 계획으로 끝까지 계산됩니다.
+        """
+        if not force and os.path.getmtime(KPI_METADATA_PATH) == self.kpi_meta_mtime:
+            return {"reloaded": False, "kpi_count": len(self.kpi_plans)}
+        kpi_meta = self._load_kpi_metadata()
+        kpi_plans = compile_kpi_plans(kpi_meta, ACCOUNT_ID_ALIASES)
+        kpi_engine = KpiBatchEngine(kpi_plans)
+        account_ids = required_account_ids(kpi_plans, ACCOUNT_ID_ALIASES)
+        # 캐시된 재무 데이터는 필요한 계정만 담고 있으므로, 새 산식이 다른 계정을 쓰면 함께 비웁니다.
+        if not account_ids <= self.required_account_ids:
+            await fact_store.invalidate_coverage()
+        self.kpi_meta, self.kpi_plans, self.kpi_engine = kpi_meta, kpi_plans, kpi_engine
+        self.required_account_ids = account_ids
+        await cache.delete_prefix("kpi_")
+        return {"reloaded": True, "kpi_count": len(self.kpi_plans)}
+
     def _find_financial_value(self, financials_for_year: dict, python_safe_id: str):
         aliases = ACCOUNT_ID_ALIASES.get(python_safe_id, [python_safe_id.replace('_', '-')])
         for alias_id in aliases:
@@ -51,88 +146,273 @@ class KpiCompareService:
                 return financials_for_year[alias_id]
         return None
 
+    def _build_company_index(self):
+        """지원 기업 목록에 레지스트리의 상장사를 더해 검색 인덱스를 만듭니다. 지원 기업이 같은 이름보다 우선합니다."""
+        companies = list(SUPPORTED_COMPANIES)
+        if self.corp_registry is not None:
+            known = {c['corp_code'] for c in companies}
+            for company in self.corp_registry.iter_companies(listed_only=True):
+                if company['corp_code'] not in known:
+                    companies.append({k: company[k] for k in ('corp_name', 'corp_code', 'stock_code')})
+        return CompanyIndex(companies)
+
+    def reload_corp_registry(self, force: bool = False):
+        """빌드 스크립트가 레지스트리 파일을 교체했으면 다시 열고 검색 인덱스를 재구성합니다."""
+        if self.corp_registry is None or not (force or self.corp_registry.is_stale()):
+            return {"reloaded": False, "company_count": len(self.company_index)}
+        registry = CorpRegistry.open(self.corp_registry.path)
+        if registry is None:
+            return {"reloaded": False, "company_count": len(self.company_index)}
+        self.corp_registry = registry
+        self.company_index = self._build_company_index()
+        # 이전 mmap 은 진행 중인 요청이 끝난 뒤 GC 로 닫히도록 명시적으로 닫지 않습니다.
+        return {"reloaded": True, "company_count": len(self.company_index)}
+
     def _find_company_by_query(self, query: str):
-        normalized_query = query.lower().replace(" ", "").strip()
-        for company in SUPPORTED_COMPANIES:
-            if (normalized_query == company['corp_name'].lower().replace(" ", "").strip() or 
-                normalized_query == company['corp_code']):
-                return company
-        return None
+        company = self.company_index.get(query)
+        if company is None and self.corp_registry is not None and len(query.strip()) == 8:
+            # 인덱스에 없는 비상장 기업도 DART 8자리 코드로는 조회할 수 있습니다.
+            found = self.corp_registry.get(query.strip())
+            if found is not None:
+                company = {k: found[k] for k in ('corp_name', 'corp_code', 'stock_code')}
+        return company
 
-    async def search_company(self, query: str):
-        normalized_query = query.lower().replace(" ", "").strip()
-        results = [c for c in SUPPORTED_COMPANIES if normalized_query in c['corp_name'].lower().replace(" ", "")]
+    async def search_company(self, query: str, limit: int = 20):
+        results = self.company_index.search(query, limit=limit)
+        if not results:
+            company = self._find_company_by_query(query)
+            results = [company] if company else []
         return {"query": query, "results": results}
 
+    async def autocomplete_company(self, prefix: str, limit: int = 10):
+        return {"query": prefix, "results": self.company_index.autocomplete(prefix, limit=limit)}
+
     async def get_reports(self, query: str):
-        company = self._find_company_by_query(query)
+        with span("metadata"):
+            company = self._find_company_by_query(query)
         if not company: raise HTTPException(status_code=404, detail="지원하지 않는 기업")
         corp_code = company['corp_code']
         cache_key = f"reports_{corp_code}"
-        if cache_key in cache: return cache[cache_key]
+        return await self._get_or_load(cache_key, lambda: self._fetch_reports(corp_code, cache_key))
+
+    async def refresh_reports(self, corp_code):
+        """캐시와 관계없이 보고서 목록을 DART에서 다시 가져와 캐시를 갱신합니다 (캐시 워머용)."""
+        cache_key = f"reports_{corp_code}"
+        return await inflight.do(cache_key, lambda: self._fetch_reports(corp_code, cache_key))
+
+    async def _fetch_reports(self, corp_code, cache_key):
         params = {"crtfc_key": self.dart_api_key, "corp_code": corp_code, "bgn_de": "20220101", "pblntf_ty": "A"}
-        data = await self._dart_api_call(f"{DART_API_URL}/list.json", params)
+        with span("dart_fetch"):
+            data = await self._dart_api_call(f"{DART_API_URL}/list.json", params)
         report_types = ["사업보고서", "반기보고서", "분기보고서"]
         filtered_reports = [r for r in data.get("list", []) if any(rt in r.get("report_nm", "") for rt in report_types)]
-        cache[cache_key] = filtered_reports
+        await cache.set(cache_key, filtered_reports)
         return filtered_reports
 
+    async def _get_or_load(self, cache_key, loader, revalidate_loader=None):
+        """
+        캐시 값을 반환하고, 없으면 loader 로 채웁니다 (동시 미스는 single-flight 로 병합).
+        만료 후 stale_ttl 이내인 값은 즉시 반환하고 백그라운드에서 갱신합니다.
+        그보다 오래된 값은 loader 를 기다리되, DART 장애(5xx·회로 차단·호출 한도)로 실패하면 그 값을 대신 반환합니다.
+        stale 값으로 응답할 때는 mark_stale() 로 표시합니다.
+        """
+        with span("cache"):
+            entry = await cache.lookup(cache_key)
+        if entry is not None:
+            value, fresh, expires_at = entry
+            if fresh:
+                return value
+            if cache.is_revalidatable(expires_at):
+                self._revalidate_in_background(cache_key, revalidate_loader or loader)
+                mark_stale("revalidating")
+                return value
+        try:
+            return await inflight.do(cache_key, loader)
+        except HTTPException as e:
+            if entry is None or not self._is_upstream_failure(e):
+                raise
+            logger.warning("🧯 [stale 응답] %s: DART 장애로 마지막 값을 반환합니다 (%s)", cache_key, e.detail)
+            mark_stale("upstream_error")
+            return entry[0]
+
+    @staticmethod
+    def _is_upstream_failure(error: HTTPException) -> bool:
+        return isinstance(error, DartUnavailableError) or error.status_code == 429
+
+    def _revalidate_in_background(self, cache_key, loader):
+        # 사용자는 이미 stale 값을 받았으므로 갱신 호출은 다른 사용자 요청보다 뒤로 미룹니다.
+        with request_priority(PRIORITY_BACKGROUND):
+            task = asyncio.ensure_future(inflight.do(cache_key, loader))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_revalidated)
+
+    def _on_revalidated(self, task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("♻️ [백그라운드 갱신 실패] %s", task.exception())
+
     def _safe_eval_expression(self, expression: str, context: dict):
+        return compile_expression(expression)(context)
+
+    def _cache_ttl_for_period(self, bsns_year, reprt_code, has_data: bool):
+        """
+        확정된(제출 기한 + 정정 유예기간이 지난) 보고서 데이터는 만료 없이, 그 외는 기본 TTL로 캐시합니다.
+        확정된 기간인데 데이터가 없으면 KPI_NEGATIVE_CACHE_TTL 동안 다시 묻지 않습니다.
+        """
+        if self._is_finalized_period(bsns_year, reprt_code):
+            return None if has_data else KPI_NEGATIVE_CACHE_TTL
+        return KPI_CACHE_TTL
+
+    def _is_finalized_period(self, bsns_year, reprt_code, today: date = None):
+        deadline = REPORT_DEADLINES.get(str(reprt_code))
+        if deadline is None:
+            return False
+        month, day, year_offset = deadline
+        final_date = date(int(bsns_year) + year_offset, month, day) + timedelta(days=REPORT_AMENDMENT_GRACE_DAYS)
+        return (today or date.today()) > final_date
+
+    async def _get_financials_for_report(self, corp_code, bsns_year, reprt_code, refresh: bool = False):
+        """
+        당기(t)·전기(t-1) 재무 데이터를 팩트 저장소에서 조립합니다.
+        빈 연도가 있을 때만 DART 에서 보고서를 가져오고, 만료된 연도는 저장된 값을 먼저 돌려준 뒤 백그라운드에서 갱신합니다.
+        두 연도 모두 당기 보고서와 같은 재무제표 구분(CFS/OFS)의 값만 씁니다.
+        """
+        current_year = int(bsns_year)
+        years = (current_year, current_year - 1)
+        fs_div = await self._report_fs_div(corp_code, current_year, reprt_code)
+        with span("cache"):
+            financials, missing, stale = await fact_store.get_financials(corp_code, reprt_code, fs_div, years)
+        if refresh:
+            # 당기 보고서는 항상 다시 받고, 전기는 비었거나 만료되었을 때만 받습니다.
+            gap = missing | stale | {current_year}
+        elif missing:
+            gap = missing
+        else:
+            if stale:
+                for filing_year in self.plan_filing_years(stale, reprt_code):
+                    self._revalidate_in_background(
+                        f"fin_{corp_code}_{filing_year}_{reprt_code}",
+                        lambda filing_year=filing_year: self._store_filing(corp_code, filing_year, reprt_code),
+                    )
+                mark_stale("stale_facts")
+            return financials
+        filing_years = await self._filing_years_to_load(corp_code, reprt_code, fs_div, self.plan_filing_years(gap, reprt_code))
+        await asyncio.gather(*(self._load_filing(corp_code, filing_year, reprt_code) for filing_year in filing_years))
+        # 처음 받은 보고서라면 이제 구분이 정해집니다.
+        fs_div = await self._report_fs_div(corp_code, current_year, reprt_code)
+        financials, _, _ = await fact_store.get_financials(corp_code, reprt_code, fs_div, years)
+        return financials
+
+    async def _report_fs_div(self, corp_code, bsns_year: int, reprt_code) -> str:
+        """이 보고서를 읽을 팩트 블록의 구분. 이 보고서에서 데이터가 있던 구분, 없으면 기업의 최근 구분, 그것도 없으면 CFS."""
+        source = await fact_store.get_filing_source(corp_code, bsns_year, reprt_code)
+        if source is not None and source[0]:
+            return source[0]
+        return await fact_store.preferred_fs_div(corp_code) or FS_DIV
+
+    async def _filing_years_to_load(self, corp_code, reprt_code, fs_div: str, filing_years) -> list:
+        """
+        fs_div 블록을 채우기 위해 가져올 보고서 연도들. 다른 구분으로 받아 두었거나 비어 있던 보고서(기록이 만료 전)는
+        다시 받아도 이 블록이 채워지지 않으므로 건너뜁니다. 그 연도는 구분을 섞지 않도록 빈 값으로 남습니다.
+        """
+        years = []
+        for filing_year in filing_years:
+            source = await fact_store.get_filing_source(corp_code, filing_year, reprt_code)
+            if source is not None and source[1] and source[0] != fs_div:
+                continue
+            years.append(filing_year)
+        return years
+
+    async def _load_filing(self, corp_code, bsns_year: int, reprt_code):
+        cache_key = f"fin_{corp_code}_{bsns_year}_{reprt_code}"
+        await inflight.do(cache_key, lambda: self._store_filing(corp_code, bsns_year, reprt_code))
+
+    async def _store_filing(self, corp_code, bsns_year: int, reprt_code):
+        source = await fact_store.get_filing_source(corp_code, bsns_year, reprt_code)
+        if source == ("", True):
+            # CFS·OFS 모두 비어 있던 보고서는 부정 캐시가 만료될 때까지 DART 에 다시 묻지 않고, 만료 시각도 늘리지 않습니다.
+            FS_DIV_RESOLUTIONS.inc("negative")
+            return
+        fs_div, financials = await self._fetch_filing_financials(corp_code, bsns_year, reprt_code, source)
+        ttl = self._cache_ttl_for_period(bsns_year, reprt_code, has_data=fs_div is not None)
+        expires_at = None if ttl is None else time.time() + ttl
+        if fs_div is not None:
+            # 분기·반기 보고서의 전기 열은 같은 분기의 전년도 값이 아니므로 팩트로 남기지 않습니다.
+            previous = financials[bsns_year - 1] if reprt_code == ANNUAL_REPORT_CODE else None
+            await fact_store.put_filing(
+                corp_code, bsns_year, reprt_code, fs_div,
+                financials[bsns_year], previous,
+                expires_at=expires_at,
+            )
+        await fact_store.put_filing_source(corp_code, bsns_year, reprt_code, fs_div or "", expires_at)
+
+    async def _fetch_filing_financials(self, corp_code, bsns_year: int, reprt_code, source=None):
+        """
+        (데이터가 있던 fs_div 또는 None, financials). source 는 fact_store.get_filing_source() 결과입니다.
+        이 보고서에서(없으면 같은 기업의 최근 보고서에서) 데이터가 있던 구분을 먼저 요청하고, 비어 있을 때만
+        다른 구분을 요청합니다. 만료된 기록도 첫 후보로만 쓰며, 기록이 전혀 없으면 CFS·OFS 를 동시에 요청합니다.
+        """
+        known = source[0] if source is not None and source[0] else await fact_store.preferred_fs_div(corp_code)
+        if known is None:
+            return await self._probe_fs_divs(corp_code, bsns_year, reprt_code)
+
+        financials = await self._fetch_financials_for_report(corp_code, bsns_year, reprt_code, known)
+        if any(financials.values()):
+            FS_DIV_RESOLUTIONS.inc("remembered")
+            return known, financials
+        for fs_div in FS_DIV_CANDIDATES:
+            if fs_div == known:
+                continue
+            financials = await self._fetch_financials_for_report(corp_code, bsns_year, reprt_code, fs_div)
+            if any(financials.values()):
+                FS_DIV_RESOLUTIONS.inc("fallback")
+                return fs_div, financials
+        FS_DIV_RESOLUTIONS.inc("empty")
+        return None, financials
+
+    async def _probe_fs_divs(self, corp_code, bsns_year: int, reprt_code):
+        """
+        CFS·OFS 를 동시에 요청합니다. CFS 에 데이터가 있으면 OFS 응답을 기다리지 않고(취소) CFS 를,
+        CFS 가 비어 있으면 OFS 를 씁니다. 둘 다 있을 때 응답 순서에 따라 연결·별도 값이 바뀌지 않도록 CFS 를 우선합니다.
+        """
+        tasks = {
+            fs_div: asyncio.ensure_future(self._fetch_financials_for_report(corp_code, bsns_year, reprt_code, fs_div))
+            for fs_div in FS_DIV_CANDIDATES
+        }
         try:
-            allowed_operators = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv, ast.USub: operator.neg, ast.UAdd: operator.pos}
-            allowed_functions = {'ABS': abs}
-            def _eval(node):
-                if isinstance(node, ast.Num): return node.n
-                elif isinstance(node, ast.Name):
-                    if node.id in context: return context[node.id]
-                    raise NameError(f"Variable '{node.id}' not found")
-                elif isinstance(node, ast.BinOp):
-                    left, right = _eval(node.left), _eval(node.right)
-                    op = allowed_operators.get(type(node.op))
-                    if op:
-                        if isinstance(node.op, ast.Div) and right == 0: raise ZeroDivisionError("Division by zero")
-                        return op(left, right)
-                    raise ValueError(f"Unsupported operator: {type(node.op)}")
-                elif isinstance(node, ast.UnaryOp):
-                    operand = _eval(node.operand)
-                    op = allowed_operators.get(type(node.op))
-                    if op: return op(operand)
-                    raise ValueError(f"Unsupported unary operator: {type(node.op)}")
-                elif isinstance(node, ast.Call):
-                    if node.func.id in allowed_functions:
-                        args = [_eval(arg) for arg in node.args]
-                        return allowed_functions[node.func.id](*args)
-                    raise NameError(f"Unsupported function call: {node.func.id}")
-                raise ValueError(f"Unsupported node type: {type(node)}")
-            tree = ast.parse(expression, mode='eval')
-            return _eval(tree.body)
-        except ZeroDivisionError: raise
-        except Exception as e: raise
-
-    async def _get_financials_for_report(self, corp_code, bsns_year, reprt_code):
+            for fs_div, task in tasks.items():
+                financials = await task
+                if any(financials.values()):
+                    FS_DIV_RESOLUTIONS.inc("probed")
+                    return fs_div, financials
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        FS_DIV_RESOLUTIONS.inc("empty")
+        return None, financials
+
+    async def _fetch_financials_for_report(self, corp_code, bsns_year, reprt_code, fs_div: str = FS_DIV):
         current_year = int(bsns_year)
         previous_year = current_year - 1
         financials = {current_year: {}, previous_year: {}}
-        params = {"crtfc_key": self.dart_api_key, "corp_code": corp_code, "bsns_year": str(current_year), "reprt_code": reprt_code, "fs_div": "CFS"}
-        print(f"  -> 🌏 [DART API 요청] Year: {current_year}, ReportCode: {reprt_code} (전기/당기 데이터 동시 요청)")
-        data = await self._dart_api_call(f"{DART_API_URL}/fnlttSinglAcntAll.json", params)
+        params = {"crtfc_key": self.dart_api_key, "corp_code": corp_code, "bsns_year": str(current_year), "reprt_code": reprt_code, "fs_div": fs_div}
+        logger.debug("🌏 [DART API 요청] Year: %s, ReportCode: %s, %s (전기/당기 데이터 동시 요청)", current_year, reprt_code, fs_div)
+        # 응답 본문은 받는 즉시 청크 단위로 파싱되며, KPI 산식에 필요한 계정만 남깁니다.
+        parser = FnlttStreamParser(self.required_account_ids)
+        with span("dart_fetch"):
+            data = await self._dart_api_stream(f"{DART_API_URL}/fnlttSinglAcntAll.json", params, parser)
+        record_span("parse", parser.parse_seconds)
 
         if data.get("status") == "013":
-            print(f"  -> ⚠️ [데이터 없음] Year: {current_year}, ReportCode: {reprt_code}")
+            logger.debug("⚠️ [데이터 없음] Year: %s, ReportCode: %s, %s", current_year, reprt_code, fs_div)
             return financials
 
-        def parse_amount(amount_str):
-            if not amount_str: return 0
-            s_val = str(amount_str).replace(",", "").strip()
-            return 0 if s_val == '-' else int(s_val)
+        financials[current_year] = data["thstrm"]
+        financials[previous_year] = data["frmtrm"]
 
-        for item in data.get("list", []):
-            account_id = item.get("account_id")
-            if not account_id: continue
-            if "thstrm_amount" in item: financials[current_year][account_id] = parse_amount(item["thstrm_amount"])
-            if "frmtrm_amount" in item: financials[previous_year][account_id] = parse_amount(item["frmtrm_amount"])
-        
-        print(f"  -> ✅ [데이터 수신] 당기({current_year}): {len(financials[current_year])}개, 전기({previous_year}): {len(financials[previous_year])}개 계정 수신")
+        logger.debug("✅ [데이터 수신] 당기(%s): %d개, 전기(%s): %d개 계정 수신",
+                     current_year, len(financials[current_year]), previous_year, len(financials[previous_year]))
         return financials
 
     def _validate_and_format_kpi(self, kpi_name, value, unit):
@@ -150,101 +430,299 @@ class KpiCompareService:
         return str(value)
 
     async def get_kpi_for_report(self, query: str, rcept_no: str, bsns_year: str, reprt_code: str):
-        company = self._find_company_by_query(query)
+        with span("metadata"):
+            company = self._find_company_by_query(query)
         if not company: raise HTTPException(status_code=404, detail="지원하지 않는 기업")
+        with track_staleness() as staleness:
+            result = await self._get_kpi_for_company(company, bsns_year, reprt_code)
+            # 다른 요청이 계산한 결과를 함께 받은 경우(single-flight) 계산 시점의 stale 표시는 결과에만 남아 있습니다.
+            if result.get("stale") and not staleness.stale:
+                mark_stale("stale_facts")
+        # 캐시에 든 dict 를 바꾸지 않도록 복사해서 표시합니다.
+        return {**result, "stale": staleness.stale}
+
+    async def _get_kpi_for_company(self, company, bsns_year: str, reprt_code: str):
         corp_code = company['corp_code']
         cache_key = f"kpi_{corp_code}_{bsns_year}_{reprt_code}"
-        if cache_key in cache: return cache[cache_key]
+        # stale 값을 백그라운드에서 갱신할 때는 재무 데이터도 DART에서 새로 받아 계산합니다.
+        return await self._get_or_load(
+            cache_key,
+            lambda: self._compute_kpi_for_report(company, bsns_year, reprt_code, cache_key),
+            revalidate_loader=lambda: self._compute_kpi_for_report(company, bsns_year, reprt_code, cache_key, refresh=True),
+        )
+
+    async def refresh_kpi_for_period(self, company, bsns_year: str, reprt_code: str):
+        """캐시와 관계없이 재무 데이터와 KPI를 다시 계산해 캐시를 갱신합니다 (캐시 워머용)."""
+        cache_key = f"kpi_{company['corp_code']}_{bsns_year}_{reprt_code}"
+        return await inflight.do(
+            cache_key, lambda: self._compute_kpi_for_report(company, bsns_year, reprt_code, cache_key, refresh=True)
+        )
 
-        financials = await self._get_financials_for_report(corp_code, bsns_year, reprt_code)
+    async def _compute_kpi_for_report(self, company, bsns_year, reprt_code, cache_key, refresh: bool = False):
+        corp_code = company['corp_code']
+        with track_staleness() as staleness:
+            financials = await self._get_financials_for_report(corp_code, bsns_year, reprt_code, refresh=refresh)
 
         grouped_results = {}
-        for kpi_name, row in self.kpi_meta.iterrows():
-            formula = str(row['산식(AccountID)'])
-            unit = row.get('단위', '')
-            category = row.get('대분류', '')
-            
-            print(f"\n🧩 [KPI 처리 시작] {kpi_name}")
-
-            try:
-                eval_formula = formula
-                context = {}
-                
-                # 1. 시계열 변수 처리 (e.g., ifrs_full_Revenue[t-1])
-                time_vars_pattern = re.compile(r'([a-zA-Z0-9_]+)\[t([+-]?\d*)\]')
-                time_vars_in_formula = {match.group(0) for match in time_vars_pattern.finditer(formula)}
-                
-                for var_str in time_vars_in_formula:
-                    match = time_vars_pattern.match(var_str)
-                    python_safe_id, offset_str = match.groups()
-                    offset = int(offset_str or 0)
-                    target_year = int(bsns_year) + offset
-                    
-                    value = self._find_financial_value(financials.get(target_year, {}), python_safe_id)
-                    if value is None:
-                        raise ValueError(f"필수 데이터 누락: {python_safe_id} ({target_year}년)")
-                    
-                    safe_name = f"{python_safe_id}_t{offset}".replace('-', '_minus_')
-                    eval_formula = eval_formula.replace(var_str, safe_name)
-                    context[safe_name] = value
-
-                # 2. 일반 변수 처리
-                tree = ast.parse(eval_formula)
-                variable_names = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
-                
-                for python_safe_id in variable_names:
-                    if python_safe_id in context or python_safe_id.upper() == 'ABS':
-                        continue
-                    
-                    target_year = int(bsns_year)
-                    value = self._find_financial_value(financials.get(target_year, {}), python_safe_id)
-                    if value is None:
-                        raise ValueError(f"필수 데이터 누락: {python_safe_id} ({target_year}년)")
-                    
-                    context[python_safe_id] = value
-
-                print(f"  -> 🧮 [계산식] {eval_formula}")
-                print(f"  -> 📊 [변수값] {context}")
-                
-                value = self._safe_eval_expression(eval_formula, context)
-                formatted_value = self._validate_and_format_kpi(kpi_name, value, unit)
-
-                print(f"  -> ✅ [KPI 계산완료] {kpi_name}: {formatted_value} {unit}")
-                
-                kpi_result = { "kpi_name": kpi_name, "value": formatted_value, "unit": unit, "category": category, "formula": row['산식(AccountID)'] }
-                if category not in grouped_results: grouped_results[category] = []
-                grouped_results[category].append(kpi_result)
-
-            except ZeroDivisionError:
-                print(f"  -> ❌ [KPI 계산 오류] {kpi_name}: 분모가 0입니다.")
-                continue
-            except Exception as e:
-                print(f"  -> ❌ [KPI 계산 오류] {kpi_name}: {e}")
-                continue
-        
+        year = int(bsns_year)
+        # 조용한 모드(INFO 이상)에서는 KPI별 로그 포맷 비용이 없도록 한 번만 판정합니다.
+        debug = logger.isEnabledFor(logging.DEBUG)
+        with span("evaluate"):
+            for plan in self.kpi_plans:
+                kpi_name, unit, category = plan.kpi_name, plan.unit, plan.category
+                try:
+                    value = plan.evaluate(financials, year)
+                    formatted_value = self._validate_and_format_kpi(kpi_name, value, unit)
+                    if debug:
+                        logger.debug("✅ [KPI 계산완료] %s: %s %s", kpi_name, formatted_value, unit,
+                                     extra={"kpi_name": kpi_name, "corp_code": corp_code, "formula": plan.eval_formula})
+
+                    kpi_result = { "kpi_name": kpi_name, "value": formatted_value, "unit": unit, "category": category, "formula": plan.formula }
+                    if category not in grouped_results: grouped_results[category] = []
+                    grouped_results[category].append(kpi_result)
+
+                except ZeroDivisionError:
+                    KPI_EVALUATION_FAILURES.inc(kpi_name, "zero_division")
+                    if debug:
+                        logger.debug("❌ [KPI 계산 오류] %s: 분모가 0입니다.", kpi_name)
+                    continue
+                except Exception as e:
+                    KPI_EVALUATION_FAILURES.inc(kpi_name, "missing_data" if isinstance(e, ValueError) else "error")
+                    if debug:
+                        logger.debug("❌ [KPI 계산 오류] %s: %s", kpi_name, e)
+                    continue
+
         final_results = {
             "company_name": company['corp_name'], "corp_code": corp_code, "bsns_year": bsns_year,
             "reprt_code": reprt_code, "categories": grouped_results,
-            "total_kpi_count": sum(len(kpis) for kpis in grouped_results.values())
+            "total_kpi_count": sum(len(kpis) for kpis in grouped_results.values()),
+            "stale": staleness.stale,
         }
-        print(f"\n🏁 [KPI 계산 완료] {final_results['total_kpi_count']}개 KPI 계산됨")
-        cache[cache_key] = final_results
+        logger.debug("🏁 [KPI 계산 완료] %s %s/%s: %d개 KPI 계산됨", corp_code, bsns_year, reprt_code, final_results['total_kpi_count'])
+        # 만료된 재무 팩트로 계산한 값은 캐시하지 않아, 팩트가 갱신되면 다음 요청이 바로 새 값으로 계산합니다.
+        if not staleness.stale:
+            has_data = final_results["total_kpi_count"] > 0
+            await cache.set(cache_key, final_results, ttl=self._cache_ttl_for_period(bsns_year, reprt_code, has_data))
         return final_results
 
+    async def compare_kpis(self, companies: list, years: list, reprt_codes: list):
+        """
+        여러 기업 × 연도 × 보고서 조합의 KPI를 기업별로 정렬된 행렬로 반환합니다.
+        재무 데이터는 동시에(상한 KPI_COMPARE_CONCURRENCY) 가져오고, KPI는 벡터화 엔진으로 한 번에 계산합니다.
+        각 셀은 독립적으로 실패할 수 있으며, 실패한 셀은 status="error"와 사유를 담습니다.
+        """
+        # 잘못된 기간이 DART 호출 한도를 쓰지 않도록 요청 전체를 먼저 거릅니다.
+        invalid_years = [year for year in years if not (len(year) == 4 and year.isascii() and year.isdigit())]
+        if invalid_years:
+            raise HTTPException(status_code=400, detail=f"사업연도는 4자리 숫자여야 합니다: {', '.join(invalid_years)}")
+        unknown = [code for code in reprt_codes if code not in REPORT_DEADLINES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 보고서 코드: {', '.join(unknown)}")
+        periods = [{"bsns_year": year, "reprt_code": code} for year in years for code in reprt_codes]
+        if len(companies) * len(periods) > KPI_COMPARE_MAX_CELLS:
+            raise HTTPException(status_code=400, detail=f"요청 셀 수가 너무 많습니다 (최대 {KPI_COMPARE_MAX_CELLS}개)")
+
+        resolved = [(query, self._find_company_by_query(query)) for query in companies]
+        cells = sorted({
+            (company['corp_code'], period["bsns_year"], period["reprt_code"])
+            for _, company in resolved if company for period in periods
+        })
+        financials_by_cell, errors = await self.fetch_financials_for_cells(cells)
+        kpi_matrix = self.evaluate_kpi_matrix(cells, financials_by_cell)
+        kpi_names = list(kpi_matrix.columns)
+
+        rows = []
+        for query, company in resolved:
+            row_cells = []
+            for period in periods:
+                if company is None:
+                    row_cells.append(self._compare_error_cell(period, "지원하지 않는 기업"))
+                    continue
+                cell = (company['corp_code'], period["bsns_year"], period["reprt_code"])
+                if cell in errors:
+                    row_cells.append(self._compare_error_cell(period, errors[cell]))
+                    continue
+                row_cells.append({**period, "status": "ok", "values": kpi_matrix.loc[cell].tolist(), "error": None})
+            rows.append({
+                "query": query,
+                "company_name": company['corp_name'] if company else None,
+                "corp_code": company['corp_code'] if company else None,
+                "cells": row_cells,
+            })
+        return {
+            "kpi_names": kpi_names,
+            "units": [plan.unit for plan in self.kpi_engine.plans],
+            "periods": periods,
+            "rows": rows,
+        }
+
+    async def fetch_financials_for_cells(self, cells: list):
+        """
+        (corp_code, bsns_year, reprt_code) 셀들의 재무 데이터를 동시에 가져옵니다. 실패한 셀은 errors 에 사유를 담습니다.
+        KPI 비교와 밸류에이션 서비스가 함께 씁니다.
+        """
+        semaphore = asyncio.Semaphore(KPI_COMPARE_CONCURRENCY)
+        financials_by_cell, errors = {}, {}
+
+        async def fetch(cell):
+            async with semaphore:
+                try:
+                    financials_by_cell[cell] = await self._get_financials_for_report(*cell)
+                except HTTPException as e:
+                    errors[cell] = e.detail
+                except Exception as e:
+                    errors[cell] = str(e)
+
+        await asyncio.gather(*(fetch(cell) for cell in cells))
+        return financials_by_cell, errors
+
+    def evaluate_kpi_matrix(self, cells: list, financials_by_cell: dict) -> pd.DataFrame:
+        """
+        셀 × KPI 행렬을 벡터화 엔진으로 계산하고 단건 API와 같은 형식의 문자열 값(없으면 None)으로 변환합니다.
+        """
+        failures = {}
+        raw = self.kpi_engine.evaluate(cells, financials_by_cell, failures)
+        # 단건 API 와 같이 계산하지 못한 (셀, KPI) 를 사유별로 셉니다.
+        for (kpi_name, reason), count in failures.items():
+            KPI_EVALUATION_FAILURES.inc(kpi_name, reason, amount=count)
+        formatted = {}
+        for plan in self.kpi_engine.plans:
+            column = []
+            for value in raw[plan.kpi_name].to_numpy():
+                value = self.kpi_engine.to_python_value(plan, value)
+                column.append(None if value is None else self._validate_and_format_kpi(plan.kpi_name, value, plan.unit))
+            formatted[plan.kpi_name] = column
+        return pd.DataFrame(formatted, index=raw.index, columns=raw.columns, dtype=object)
+
+    def _compare_error_cell(self, period, error):
+        return {**period, "status": "error", "values": None, "error": error}
+
+    async def get_kpi_timeseries(self, query: str, from_year: int, to_year: int, reprt_codes: list):
+        """
+        한 기업의 from_year~to_year 기간 KPI를 기간 순으로 정렬된 시계열로 반환합니다.
+        팩트 저장소에서 빈 연도만 골라 최소한의 보고서를 동시에 가져오고(사업보고서는 당기·전기가 함께 있으므로
+        to, to-2, ... 순, 분기·반기 보고서는 빈 연도마다), 모든 기간을 벡터화 엔진으로 한 번에 계산합니다.
+        """
+        if from_year > to_year:
+            raise HTTPException(status_code=400, detail="from 은 to 보다 클 수 없습니다")
+        if to_year - from_year + 1 > KPI_TIMESERIES_MAX_YEARS:
+            raise HTTPException(status_code=400, detail=f"조회 기간이 너무 깁니다 (최대 {KPI_TIMESERIES_MAX_YEARS}년)")
+        if not reprt_codes:
+            raise HTTPException(status_code=400, detail="보고서 코드를 하나 이상 지정해야 합니다")
+        unknown = [code for code in reprt_codes if code not in REPORT_DEADLINES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 보고서 코드: {', '.join(unknown)}")
+        with span("metadata"):
+            company = self._find_company_by_query(query)
+        if not company: raise HTTPException(status_code=404, detail="지원하지 않는 기업")
+        corp_code = company['corp_code']
+
+        # 분기 순서(1분기 → 반기 → 3분기 → 사업보고서)로 정렬된 기간 축
+        report_order = list(REPORT_DEADLINES)
+        reprt_codes = sorted(set(reprt_codes), key=report_order.index)
+        years = list(range(from_year, to_year + 1))
+        periods = [{"bsns_year": str(year), "reprt_code": code} for year in years for code in reprt_codes]
+        offsets = self.kpi_engine.offsets or [0]
+        needed_years = sorted({year + offset for year in years for offset in offsets})
+
+        financials_by_code, errors = await self._load_timeseries_financials(corp_code, reprt_codes, needed_years)
+
+        cells = [(corp_code, period["bsns_year"], period["reprt_code"]) for period in periods]
+        financials_by_cell = {}
+        for cell in cells:
+            code = cell[2]
+            if code in errors:
+                continue
+            year = int(cell[1])
+            financials_by_cell[cell] = {year + offset: financials_by_code[code][year + offset] for offset in offsets}
+        kpi_matrix = self.evaluate_kpi_matrix(cells, financials_by_cell)
+
+        series = []
+        for plan in self.kpi_plans:
+            values = kpi_matrix[plan.kpi_name].tolist() if plan.kpi_name in kpi_matrix.columns else [None] * len(cells)
+            for i, cell in enumerate(cells):
+                if cell[2] in errors:
+                    values[i] = None
+            series.append({"kpi_name": plan.kpi_name, "unit": plan.unit, "category": plan.category, "values": values})
+        return {
+            "company_name": company['corp_name'],
+            "corp_code": corp_code,
+            "periods": periods,
+            "series": series,
+            "errors": [{"reprt_code": code, "error": error} for code, error in errors.items()],
+        }
+
+    @staticmethod
+    def plan_filing_years(missing_years, reprt_code) -> list:
+        """
+        빈 회계연도를 모두 채우는 최소 보고서 연도 목록. 사업보고서 t 는 t 와 t-1 을 함께 채우므로
+        가장 최근 빈 연도부터 하나씩 고르면 연속 구간에서는 to, to-2, to-4 ... 가 됩니다.
+        분기·반기 보고서는 전기 열을 저장하지 않으므로(전년도 말 값) 빈 연도마다 그 연도의 보고서가 필요합니다.
+        """
+        if reprt_code != ANNUAL_REPORT_CODE:
+            return sorted(missing_years, reverse=True)
+        remaining = set(missing_years)
+        filing_years = []
+        while remaining:
+            year = max(remaining)
+            filing_years.append(year)
+            remaining -= {year, year - 1}
+        return filing_years
+
+    async def _load_timeseries_financials(self, corp_code: str, reprt_codes: list, needed_years: list):
+        """
+        보고서 코드별로 필요한 연도의 재무 데이터를 조립합니다. 빈 연도의 보고서만 동시에(상한 KPI_COMPARE_CONCURRENCY) 가져옵니다.
+        보고서 코드마다 가장 최근 연도 보고서의 재무제표 구분(CFS/OFS) 값만 씁니다.
+        """
+        semaphore = asyncio.Semaphore(KPI_COMPARE_CONCURRENCY)
+        errors = {}
+        last_year = max(needed_years)
+
+        async def load(code, filing_year):
+            async with semaphore:
+                await self._load_filing(corp_code, filing_year, code)
+
+        with span("cache"):
+            fs_divs = {code: await self._report_fs_div(corp_code, last_year, code) for code in reprt_codes}
+            coverage = {
+                code: await fact_store.get_financials(corp_code, code, fs_divs[code], needed_years) for code in reprt_codes
+            }
+        jobs = []
+        for code, (_, missing, stale) in coverage.items():
+            for filing_year in await self._filing_years_to_load(
+                corp_code, code, fs_divs[code], self.plan_filing_years(missing, code)
+            ):
+                jobs.append((code, filing_year))
+            # 만료된 연도는 저장된 값으로 응답하고 백그라운드에서 갱신합니다.
+            for filing_year in self.plan_filing_years(stale - missing, code):
+                self._revalidate_in_background(
+                    f"fin_{corp_code}_{filing_year}_{code}",
+                    lambda code=code, filing_year=filing_year: self._store_filing(corp_code, filing_year, code),
+                )
+        logger.debug("📅 [시계열] %s: 보고서 %d건 요청 (%s)", corp_code, len(jobs), jobs)
+
+        results = await asyncio.gather(*(load(code, year) for code, year in jobs), return_exceptions=True)
+        for (code, _), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                errors.setdefault(code, result.detail if isinstance(result, HTTPException) else str(result))
+
+        financials_by_code = {}
+        for code in reprt_codes:
+            if code in errors:
+                continue
+            if coverage[code][1]:
+                fs_div = await self._report_fs_div(corp_code, last_year, code)
+                financials_by_code[code], _, _ = await fact_store.get_financials(corp_code, code, fs_div, needed_years)
+            else:
+                financials_by_code[code] = coverage[code][0]
+        return financials_by_code, errors
+
     async def get_supported_companies(self):
         """지원하는 게임회사 목록을 반환합니다."""
         return {"companies": SUPPORTED_COMPANIES}
 
     async def _dart_api_call(self, url: str, params: dict):
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, params=params, timeout=15.0)
-                response.raise_for_status()
-                data = response.json()
-                if data.get("status") not in ["000", "013"]:
-                    raise HTTPException(status_code=400, detail=f"DART API 오류: {data.get('message')}")
-                return data
-            except httpx.HTTPStatusError as e:
-                raise HTTPException(status_code=e.response.status_code, detail=f"DART API 요청 실패: {e.response.text}")
-            except httpx.RequestError as e:
-                raise HTTPException(status_code=503, detail=f"DART API 연결 실패: {e}")
\ No newline at end of file
+        return await self.dart_client.get_json(url, params)
+
+    async def _dart_api_stream(self, url: str, params: dict, parser):
+        return await self.dart_client.get_streamed(url, params, parser)
@@ -0,0 +1,182 @@
+"""
+KPI 산식 컴파일러
+
+KPI_for_dashboard_final.csv 의 산식(AccountID)을 프로세스당 한 번만 파싱해
+평가 계획(KpiPlan)으로 만들어 둡니다. 요청 시점에는 정규식, ast.parse,
+pandas 행 순회 없이 미리 만들어진 계획을 순서대로 평가하기만 합니다.
+"""
+import ast
+import re
+from functools import lru_cache
+
+TIME_VAR_PATTERN = re.compile(r'([a-zA-Z0-9_]+)\[t([+-]?\d*)\]')
+
+ALLOWED_FUNCTIONS = {'ABS': abs}
+_ALLOWED_BINOPS = (ast.Add, ast.Sub, ast.Mult, ast.Div)
+_ALLOWED_UNARYOPS = (ast.USub, ast.UAdd)
+_EVAL_GLOBALS = {'__builtins__': {}, **ALLOWED_FUNCTIONS}
+
+
+def resolve_aliases(python_safe_id: str, aliases: dict) -> tuple:
+    """python_safe_id 에 대응하는 DART account_id 후보 목록(우선순위 순)을 반환합니다."""
+    return tuple(aliases.get(python_safe_id, [python_safe_id.replace('_', '-')]))
+
+
+def _validate_node(node):
+    """허용된 노드(숫자, 변수, 사칙연산, ABS 호출)만 포함하는지 검사합니다."""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return
+        raise ValueError(f"Unsupported constant: {node.value!r}")
+    if isinstance(node, ast.Name):
+        return
+    if isinstance(node, ast.BinOp):
+        if not isinstance(node.op, _ALLOWED_BINOPS):
+            raise ValueError(f"Unsupported operator: {type(node.op)}")
+        _validate_node(node.left)
+        _validate_node(node.right)
+        return
+    if isinstance(node, ast.UnaryOp):
+        if not isinstance(node.op, _ALLOWED_UNARYOPS):
+            raise ValueError(f"Unsupported unary operator: {type(node.op)}")
+        _validate_node(node.operand)
+        return
+    if isinstance(node, ast.Call):
+        func_id = getattr(node.func, 'id', None)
+        if func_id not in ALLOWED_FUNCTIONS or node.keywords:
+            raise NameError(f"Unsupported function call: {func_id}")
+        for arg in node.args:
+            _validate_node(arg)
+        return
+    raise ValueError(f"Unsupported node type: {type(node)}")
+
+
+class CompiledExpression:
+    """검증을 마친 산식의 코드 객체. 스칼라와 numpy/pandas 배열 모두로 평가할 수 있습니다."""
+
+    __slots__ = ('expression', 'names', 'has_division', '_code')
+
+    def __init__(self, expression: str):
+        tree = ast.parse(expression, mode='eval')
+        _validate_node(tree.body)
+        self.expression = expression
+        self.names = tuple(sorted({
+            node.id for node in ast.walk(tree)
+            if isinstance(node, ast.Name) and node.id not in ALLOWED_FUNCTIONS
+        }))
+        self.has_division = any(isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div) for node in ast.walk(tree))
+        self._code = compile(tree, f'<kpi:{expression}>', 'eval')
+
+    def __call__(self, context: dict):
+        try:
+            return eval(self._code, _EVAL_GLOBALS, context)
+        except NameError as e:
+            raise NameError(f"Variable '{e.name}' not found") from None
+
+
+@lru_cache(maxsize=None)
+def compile_expression(expression: str) -> CompiledExpression:
+    """[t-1] 표기가 제거된 산식을 컴파일합니다. 같은 문자열은 프로세스 내에서 한 번만 컴파일됩니다."""
+    return CompiledExpression(expression)
+
+
+class KpiVariable:
+    """산식에서 참조하는 계정 변수 하나 (연도 오프셋과 alias 후보 포함)."""
+
+    __slots__ = ('name', 'account_id', 'offset', 'aliases')
+
+    def __init__(self, name: str, account_id: str, offset: int, aliases: tuple):
+        self.name = name
+        self.account_id = account_id
+        self.offset = offset
+        self.aliases = aliases
+
+    def lookup(self, financials_for_year: dict):
+        for alias_id in self.aliases:
+            if alias_id in financials_for_year:
+                return financials_for_year[alias_id]
+        return None
+
+
+class KpiPlan:
+    """KPI 한 개의 평가 계획."""
+
+    __slots__ = ('kpi_name', 'unit', 'category', 'formula', 'eval_formula', 'variables', 'expression', 'compile_error')
+
+    def __init__(self, kpi_name, unit, category, formula, eval_formula, variables, expression, compile_error=None):
+        self.kpi_name = kpi_name
+        self.unit = unit
+        self.category = category
+        self.formula = formula
+        self.eval_formula = eval_formula
+        self.variables = variables
+        self.expression = expression
+        self.compile_error = compile_error
+
+    def build_context(self, financials: dict, bsns_year: int) -> dict:
+        """산식 변수에 해당하는 값을 찾아 평가 컨텍스트를 만듭니다. 값이 없으면 ValueError."""
+        context = {}
+        for var in self.variables:
+            target_year = bsns_year + var.offset
+            value = var.lookup(financials.get(target_year, {}))
+            if value is None:
+                raise ValueError(f"필수 데이터 누락: {var.account_id} ({target_year}년)")
+            context[var.name] = value
+        return context
+
+    def evaluate(self, financials: dict, bsns_year: int):
+        if self.compile_error is not None:
+            raise self.compile_error
+        return self.expression(self.build_context(financials, bsns_year))
+
+
+@lru_cache(maxsize=None)
+def _compile_formula(formula: str, aliases_key: tuple):
+    aliases = {k: list(v) for k, v in aliases_key}
+    eval_formula = formula
+    variables = {}
+
+    # 1. 시계열 변수 처리 (e.g., ifrs_full_Revenue[t-1])
+    for match in TIME_VAR_PATTERN.finditer(formula):
+        var_str = match.group(0)
+        python_safe_id, offset_str = match.groups()
+        offset = int(offset_str or 0)
+        safe_name = f"{python_safe_id}_t{offset}".replace('-', '_minus_')
+        eval_formula = eval_formula.replace(var_str, safe_name)
+        variables[safe_name] = KpiVariable(safe_name, python_safe_id, offset, resolve_aliases(python_safe_id, aliases))
+
+    # 2. 일반 변수 처리 (당기 기준)
+    expression = compile_expression(eval_formula)
+    for name in expression.names:
+        if name not in variables:
+            variables[name] = KpiVariable(name, name, 0, resolve_aliases(name, aliases))
+
+    return eval_formula, tuple(variables[name] for name in expression.names), expression
+
+
+def _aliases_key(aliases: dict) -> tuple:
+    return tuple(sorted((k, tuple(v)) for k, v in aliases.items()))
+
+
+def compile_kpi_plans(kpi_meta, aliases: dict) -> tuple:
+    """KPI 메타데이터(DataFrame, index=재무지표명)를 평가 계획 튜플로 컴파일합니다."""
+    aliases_key = _aliases_key(aliases)
+    plans = []
+    for kpi_name, row in kpi_meta.iterrows():
+        formula = str(row['산식(AccountID)'])
+        unit = row.get('단위', '')
+        category = row.get('대분류', '')
+        try:
+            eval_formula, variables, expression = _compile_formula(formula, aliases_key)
+            plans.append(KpiPlan(kpi_name, unit, category, formula, eval_formula, variables, expression))
+        except Exception as e:
+            plans.append(KpiPlan(kpi_name, unit, category, formula, formula, (), None, compile_error=e))
+    return tuple(plans)
+
+
+def required_account_ids(plans, aliases: dict = None) -> frozenset:
+    """평가 계획(과 alias 표)이 참조하는 DART account_id 전체. 응답 파싱 시 이 계정만 보관합니다."""
+    account_ids = {alias for plan in plans for var in plan.variables for alias in var.aliases}
+    for alias_list in (aliases or {}).values():
+        account_ids.update(alias_list)
+    return frozenset(account_ids)
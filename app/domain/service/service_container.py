@@ -0,0 +1,69 @@
+"""
+애플리케이션 단위 서비스 컨테이너
+
+FastAPI lifespan 에서 한 번 생성되어 app.state.container 에 보관됩니다.
+요청마다 KpiCompareService 를 새로 만들지 않도록 의존성 주입은 이 컨테이너를 거칩니다.
+"""
+from fastapi import Request
+
+from ...core.logging_config import get_logger
+from ..client.dart_client import DartClient
+from .kpi_compare_service import KpiCompareService, cache, fact_store
+from .corp_registry import CorpRegistry
+from .cache_warmer import CacheWarmer
+from .valuation_service import ValuationService
+
+logger = get_logger("service_container")
+
+
+class ServiceContainer:
+    def __init__(self):
+        self.dart_client = None
+        self.kpi_compare_service = None
+        self.valuation_service = None
+        self.cache_warmer = None
+
+    async def startup(self):
+        """KPI 메타데이터, 기업 인덱스, DART 커넥션 풀 등 프로세스 수명 동안 공유할 자원을 한 번만 로드합니다."""
+        self.dart_client = DartClient()
+        await self.dart_client.start()
+        corp_registry = CorpRegistry.open()
+        if corp_registry is None:
+            logger.info("ℹ️ [서비스 컨테이너] 기업 레지스트리 파일 없음, 지원 기업 목록만 사용")
+        self.kpi_compare_service = KpiCompareService(dart_client=self.dart_client, corp_registry=corp_registry)
+        self.valuation_service = ValuationService(self.kpi_compare_service)
+        if CacheWarmer.enabled_by_env():
+            self.cache_warmer = CacheWarmer(self.kpi_compare_service)
+            self.cache_warmer.start()
+        logger.info("🚀 [서비스 컨테이너] 초기화 완료")
+
+    async def shutdown(self):
+        if self.cache_warmer is not None:
+            await self.cache_warmer.stop()
+            self.cache_warmer = None
+        self.valuation_service = None
+        self.kpi_compare_service = None
+        if self.dart_client is not None:
+            await self.dart_client.aclose()
+            self.dart_client = None
+        cache.close()
+        fact_store.close()
+        logger.info("🛑 [서비스 컨테이너] 종료")
+
+    async def reload_kpi_metadata(self, force: bool = False):
+        return await self.kpi_compare_service.reload_kpi_metadata(force=force)
+
+    def reload_corp_registry(self, force: bool = False):
+        return self.kpi_compare_service.reload_corp_registry(force=force)
+
+
+def get_service_container(request: Request) -> ServiceContainer:
+    return request.app.state.container
+
+
+def get_kpi_compare_service(request: Request) -> KpiCompareService:
+    return request.app.state.container.kpi_compare_service
+
+
+def get_valuation_service(request: Request) -> ValuationService:
+    return request.app.state.container.valuation_service
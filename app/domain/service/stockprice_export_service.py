@@ -0,0 +1,73 @@
+"""
+주간 주가 이력 내보내기
+
+StockPriceRepository.stream_history 가 흘려보내는 행 묶음을 CSV 또는 NDJSON 텍스트 조각으로 바꿔
+StreamingResponse 로 내보냅니다. 묶음 하나씩만 직렬화하므로 테이블 크기와 무관하게 메모리 사용량이 일정합니다.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.core.logging_config import get_logger
+from ..repository.stockprice_repository import STREAM_CHUNK_SIZE, WEEKLY_PRICE_FIELDS, StockPriceRepository
+
+logger = get_logger("stockprice_export")
+
+EXPORT_FIELDS = ("id",) + WEEKLY_PRICE_FIELDS + ("created_at", "updated_at")
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class StockPriceExportService:
+    def __init__(self, repository: StockPriceRepository):
+        self.repository = repository
+
+    async def iter_csv(self, symbol: Optional[str] = None, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # 엑셀에서 한글이 깨지지 않도록 BOM 을 붙입니다.
+        buffer.write("\ufeff")
+        writer.writerow(EXPORT_FIELDS)
+        async for rows in self.repository.stream_history(symbol, chunk_size):
+            writer.writerows([[_plain(getattr(row, field, None)) for field in EXPORT_FIELDS] for row in rows])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    async def iter_ndjson(self, symbol: Optional[str] = None, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[str]:
+        async for rows in self.repository.stream_history(symbol, chunk_size):
+            yield "".join(
+                json.dumps({field: _plain(getattr(row, field, None)) for field in EXPORT_FIELDS}, ensure_ascii=False) + "\n"
+                for row in rows
+            )
+
+    def streaming_response(self, export_format: str = "csv", symbol: Optional[str] = None) -> StreamingResponse:
+        """export_format(csv|ndjson) 에 맞는 스트리밍 응답을 만듭니다. 라우터는 이 응답을 그대로 반환하면 됩니다."""
+        if export_format not in EXPORT_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 내보내기 형식입니다: {export_format} (csv, ndjson)")
+        body = self.iter_csv(symbol) if export_format == "csv" else self.iter_ndjson(symbol)
+        filename = f"stockprice_{symbol or 'all'}.{export_format}"
+        logger.info("📤 [주가 내보내기] %s 형식 스트리밍 시작 (symbol=%s)", export_format, symbol or "전체")
+        return StreamingResponse(
+            body,
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
@@ -0,0 +1,142 @@
+"""
+밸류에이션 서비스 (PER / PBR / PSR)
+
+주가 테이블의 종목별 최신 시가총액과 재무 팩트 저장소의 순이익·자본·매출액을 기업코드↔심볼 매핑으로 묶어
+지원 기업 전체의 배수를 한 번에 계산합니다.
+
+    PER = 시가총액 / 당기순이익 (적자면 None)
+    PBR = 시가총액 / 자본총계 (자본잠식이면 None)
+    PSR = 시가총액 / 매출액
+
+TTM 은 가장 최근 사업보고서(연간) 값으로 근사합니다. 분기 보고서의 누적 금액은 팩트 저장소에 없기 때문입니다.
+결과는 최신 주가 행과 팩트 저장소 버전이 그대로인 동안 프로세스 메모리에 캐시됩니다.
+"""
+import os
+from datetime import date
+
+from app.config.companies import CORP_CODE_TO_SYMBOL, SUPPORTED_COMPANIES
+from app.core.logging_config import get_logger
+from app.core.metrics import REGISTRY
+from .kpi_compare_service import ANNUAL_REPORT_CODE, KpiCompareService, REPORT_DEADLINES, fact_store
+
+logger = get_logger("valuation_service")
+
+# 주가 테이블 market_cap 을 원 단위로 바꾸는 배수 (예: 억원 단위로 저장한다면 100000000)
+VALUATION_MARKET_CAP_UNIT = int(os.getenv("VALUATION_MARKET_CAP_UNIT", "1"))
+VALUATION_ACCOUNTS = {
+    "profit_loss": "ifrs_full_ProfitLoss",
+    "equity": "ifrs_full_Equity",
+    "revenue": "ifrs_full_Revenue",
+}
+
+VALUATION_REQUESTS = REGISTRY.counter(
+    "kpi_valuation_requests_total", "밸류에이션 조회 결과 (result=hit|computed)", labelnames=("result",),
+)
+
+
+def latest_annual_year(today: date = None) -> int:
+    """사업보고서 제출 기한이 지난 가장 최근 사업연도."""
+    today = today or date.today()
+    month, day, year_offset = REPORT_DEADLINES[ANNUAL_REPORT_CODE]
+    year = today.year - year_offset
+    return year if today > date(year + year_offset, month, day) else year - 1
+
+
+def _multiple(market_cap, denominator, positive_only: bool):
+    if market_cap is None or not denominator or (positive_only and denominator < 0):
+        return None
+    return round(market_cap / denominator, 2)
+
+
+class ValuationService:
+    def __init__(self, kpi_compare_service: KpiCompareService):
+        self.kpi_compare_service = kpi_compare_service
+        self._cached_fingerprint = None
+        self._cached_result = None
+
+    async def get_valuations(self, stock_repository, fiscal_year: int = None) -> dict:
+        """
+        지원 기업 전체의 PER/PBR/PSR. 최신 주가는 get_by_symbols 한 번으로 가져오고,
+        재무 값은 팩트 저장소(빈 연도만 DART)에서 기업별로 동시에 조립합니다.
+        stock_repository 는 요청의 DB 세션으로 만든 StockPriceRepository 입니다 (주가 모델은 DB 설정이 있을 때만 불러오므로 여기서 import 하지 않습니다).
+        """
+        fiscal_year = fiscal_year or latest_annual_year()
+        prices = await stock_repository.get_by_symbols(list(CORP_CODE_TO_SYMBOL.values()))
+        prices_by_symbol = {price.symbol: price for price in prices}
+
+        fingerprint = (
+            fiscal_year,
+            fact_store.version,
+            tuple(sorted((price.symbol, price.id, str(price.updated_at or price.created_at)) for price in prices)),
+        )
+        if fingerprint == self._cached_fingerprint:
+            VALUATION_REQUESTS.inc("hit")
+            return self._cached_result
+
+        fundamentals, errors = await self._load_fundamentals(fiscal_year)
+        companies = []
+        for company in SUPPORTED_COMPANIES:
+            symbol = CORP_CODE_TO_SYMBOL.get(company['corp_code'])
+            if symbol is None:
+                continue
+            price = prices_by_symbol.get(symbol)
+            market_cap = price.market_cap * VALUATION_MARKET_CAP_UNIT if price is not None and price.market_cap is not None else None
+            year, values = fundamentals.get(company['corp_code'], (None, {}))
+            companies.append({
+                "corp_name": company['corp_name'],
+                "corp_code": company['corp_code'],
+                "symbol": symbol,
+                "market_cap": market_cap,
+                "price_date": price.this_friday_date if price is not None else None,
+                "fiscal_year": year,
+                **values,
+                "per": _multiple(market_cap, values.get("profit_loss"), positive_only=True),
+                "pbr": _multiple(market_cap, values.get("equity"), positive_only=True),
+                "psr": _multiple(market_cap, values.get("revenue"), positive_only=False),
+            })
+
+        result = {"fiscal_year": fiscal_year, "companies": companies, "errors": errors}
+        # 계산 중 DART 에서 빈 연도를 채웠다면 팩트 저장소 버전이 올라갔으므로, 현재 버전으로 저장해 다음 요청이 적중하게 합니다.
+        self._cached_fingerprint = (fiscal_year, fact_store.version, fingerprint[2])
+        self._cached_result = result
+        VALUATION_REQUESTS.inc("computed")
+        logger.info("💹 [밸류에이션] %d개 기업 계산 (회계연도 %s)", len(companies), fiscal_year)
+        return result
+
+    async def _load_fundamentals(self, fiscal_year: int):
+        """
+        기업별 (회계연도, {profit_loss, equity, revenue}). 최근 연도 사업보고서가 비어 있으면(미제출·013) 전년도 값을 씁니다.
+        """
+        service = self.kpi_compare_service
+        corp_codes = list(CORP_CODE_TO_SYMBOL)
+        cells = [(corp_code, str(fiscal_year), ANNUAL_REPORT_CODE) for corp_code in corp_codes]
+        financials_by_cell, cell_errors = await service.fetch_financials_for_cells(cells)
+
+        fundamentals, errors, retry = {}, [], []
+        for corp_code, cell in zip(corp_codes, cells):
+            if cell in cell_errors:
+                errors.append({"corp_code": corp_code, "fiscal_year": fiscal_year, "error": cell_errors[cell]})
+                continue
+            financials = financials_by_cell[cell]
+            if financials.get(fiscal_year):
+                fundamentals[corp_code] = (fiscal_year, self._pick_accounts(financials[fiscal_year]))
+            else:
+                retry.append(corp_code)
+
+        if retry:
+            previous_cells = [(corp_code, str(fiscal_year - 1), ANNUAL_REPORT_CODE) for corp_code in retry]
+            financials_by_cell, cell_errors = await service.fetch_financials_for_cells(previous_cells)
+            for corp_code, cell in zip(retry, previous_cells):
+                financials = financials_by_cell.get(cell, {}).get(fiscal_year - 1)
+                if financials:
+                    fundamentals[corp_code] = (fiscal_year - 1, self._pick_accounts(financials))
+                else:
+                    errors.append({
+                        "corp_code": corp_code, "fiscal_year": fiscal_year - 1,
+                        "error": cell_errors.get(cell, "사업보고서 재무 데이터 없음"),
+                    })
+        return fundamentals, errors
+
+    def _pick_accounts(self, financials_for_year: dict) -> dict:
+        find = self.kpi_compare_service._find_financial_value
+        return {name: find(financials_for_year, account_id) for name, account_id in VALUATION_ACCOUNTS.items()}
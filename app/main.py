@@ -1,12 +1,41 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+import time
 from dotenv import load_dotenv
 import os
 
 from app.api.kpi_compare_router import router as kpi_compare_router
+from app.domain.service.service_container import ServiceContainer
+from app.core.logging_config import configure_logging, get_logger
+from app.core.timing import start_request_timer, stop_request_timer
+from app.core.staleness import STALE_WARNING, track_staleness
+from app.core.metrics import REGISTRY
 
 load_dotenv()
-app = FastAPI(title="KPI Compare Service")
+configure_logging()
+logger = get_logger("main")
+LOG_SPANS = os.getenv("LOG_SPANS", "false").lower() in ("1", "true", "yes")
+
+HTTP_IN_FLIGHT = REGISTRY.gauge("kpi_http_requests_in_flight", "처리 중인 HTTP 요청 수")
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "kpi_http_request_duration_seconds", "HTTP 요청 처리 시간", labelnames=("method", "route", "status"),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    container = ServiceContainer()
+    await container.startup()
+    app.state.container = container
+    try:
+        yield
+    finally:
+        await container.shutdown()
+
+
+app = FastAPI(title="KPI Compare Service", lifespan=lifespan)
 
 ENV = os.getenv("ENV", "development")
 
@@ -32,8 +61,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Warning"],
 )
 
+@app.middleware("http")
+async def request_timing(request: Request, call_next):
+    """요청별 구간 시간을 수집하고, LOG_SPANS=true 이면 로그 한 줄로 남깁니다 (LOG_FORMAT 에 따라 JSON 필드 또는 key=value). stale 데이터로 응답하면 Warning 헤더를 붙입니다."""
+    timer, token = start_request_timer()
+    status_code = 500
+    HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    try:
+        with track_staleness() as staleness:
+            response = await call_next(request)
+        if staleness.stale:
+            response.headers["Warning"] = STALE_WARNING
+        status_code = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        stop_request_timer(token)
+        # 경로 파라미터별로 시계열이 늘어나지 않도록 라우트 템플릿을 라벨로 씁니다.
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started, request.method, route.path if route else "unmatched", str(status_code)
+        )
+        if LOG_SPANS:
+            logger.info("request_timing", extra={"method": request.method, "path": request.url.path, "status": status_code, **timer.to_dict()})
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 텍스트 형식 메트릭"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 app.include_router(kpi_compare_router)
 
 if __name__ == "__main__":
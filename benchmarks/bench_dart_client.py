@@ -0,0 +1,113 @@
+"""
+DART 커넥션 풀 벤치마크
+
+로컬 목업 DART 서버를 띄운 뒤 /kpi/{query}/report/{rcept_no}/kpi 를 반복 호출해
+공유 커넥션 풀(pooled)과 호출마다 새 클라이언트를 여는 방식(legacy)의 p50/p99 지연을 비교합니다.
+KPI 캐시는 매 요청 전에 비워서 항상 DART 왕복이 포함되도록 합니다.
+
+    python -m benchmarks.bench_dart_client --requests 300 --concurrency 16 --latency-ms 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from benchmarks.mock_dart_server import create_app as create_mock_dart_app
+
+
+def start_mock_dart(port: int, latency_ms: float):
+    server = uvicorn.Server(uvicorn.Config(create_mock_dart_app(latency_ms), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_scenario(mode: str, total: int, concurrency: int):
+    from app.main import app
+    from app.domain.client.dart_client import DartClient
+    from app.domain.service import kpi_compare_service
+
+    class LegacyDartClient(DartClient):
+        """기존 _dart_api_call 처럼 호출마다 AsyncClient 를 새로 엽니다."""
+
+        async def get_json(self, url, params):
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url, params=params, timeout=15.0)
+                response.raise_for_status()
+                return response.json()
+
+        async def get_streamed(self, url, params, parser):
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url, params=params, timeout=15.0)
+                response.raise_for_status()
+                parser.feed(response.content)
+                return parser.close()
+
+    latencies = []
+    async with app.router.lifespan_context(app):
+        service = app.state.container.kpi_compare_service
+        if mode == "legacy":
+            service.dart_client = LegacyDartClient()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one(i):
+                async with semaphore:
+                    await kpi_compare_service.cache.clear()
+                    started = time.perf_counter()
+                    response = await client.get(
+                        "/kpi/크래프톤/report/20240315000001/kpi",
+                        params={"bsns_year": str(2020 + i % 5), "reprt_code": "11011"},
+                    )
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    response.raise_for_status()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(total)))
+            elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DART 커넥션 풀 벤치마크")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    os.environ["DART_API_URL"] = f"http://127.0.0.1:{args.port}/api"
+    # 커넥션 풀만 비교하도록 DART 호출 제한기는 끕니다.
+    os.environ.setdefault("DART_RATE_PER_SECOND", "0")
+    os.environ.setdefault("DART_DAILY_BUDGET", "0")
+    start_mock_dart(args.port, args.latency_ms)
+
+    for mode in ("legacy", "pooled"):
+        result = asyncio.run(run_scenario(mode, args.requests, args.concurrency))
+        print(f"{result['mode']:>7} | {result['throughput_rps']:>8} req/s | p50 {result['p50_ms']:>8} ms | p99 {result['p99_ms']:>8} ms")
+
+
+if __name__ == "__main__":
+    main()
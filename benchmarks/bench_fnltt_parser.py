@@ -0,0 +1,88 @@
+"""
+fnlttSinglAcntAll 파서 벤치마크
+
+기존 방식(본문 전체 json.loads + 모든 계정 dict 채우기)과 스트리밍 파서(필요 계정만 보관)의
+응답 1건당 파싱 시간과 최대 메모리(tracemalloc)를 비교합니다.
+녹화된 응답 파일(--payload)을 주지 않으면 목업 서버와 같은 합성 응답을 계정 수별로 만듭니다.
+
+    python -m benchmarks.bench_fnltt_parser --accounts 150 600 2000
+    python -m benchmarks.bench_fnltt_parser --payload recorded/*.json
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from app.domain.service.fnltt_stream_parser import FnlttStreamParser
+from app.domain.service.kpi_compare_service import ACCOUNT_ID_ALIASES
+from benchmarks.mock_dart_server import build_fnltt_payload
+
+
+def legacy_parse(body: bytes):
+    """변경 전 _fetch_financials_for_report 의 파싱 단계."""
+    data = json.loads(body)
+
+    def parse_amount(amount_str):
+        if not amount_str: return 0
+        s_val = str(amount_str).replace(",", "").strip()
+        return 0 if s_val == '-' else int(s_val)
+
+    current, previous = {}, {}
+    for item in data.get("list", []):
+        account_id = item.get("account_id")
+        if not account_id: continue
+        if "thstrm_amount" in item: current[account_id] = parse_amount(item["thstrm_amount"])
+        if "frmtrm_amount" in item: previous[account_id] = parse_amount(item["frmtrm_amount"])
+    return current, previous
+
+
+def streaming_parse(body: bytes, wanted, chunk_size: int):
+    result = FnlttStreamParser.parse(body, wanted, chunk_size=chunk_size)
+    return result["thstrm"], result["frmtrm"]
+
+
+def measure(fn, repeat: int):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fnlttSinglAcntAll 파서 벤치마크")
+    parser.add_argument("--accounts", type=int, nargs="*", default=[150, 600, 2000], help="합성 응답의 추가 계정 수")
+    parser.add_argument("--payload", nargs="*", default=[], help="녹화된 응답 JSON 파일")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--chunk-size", type=int, default=16384, help="httpx 가 넘겨주는 청크 크기 가정")
+    args = parser.parse_args()
+
+    # 서비스와 같은 기준: 기본 KPI 산식이 쓰는 계정은 모두 alias 표에 있습니다.
+    wanted = frozenset(alias for aliases in ACCOUNT_ID_ALIASES.values() for alias in aliases)
+
+    payloads = []
+    for path in args.payload:
+        with open(path, "rb") as f:
+            payloads.append((path, f.read()))
+    for extra in args.accounts:
+        body = json.dumps(build_fnltt_payload("00760971", "2024", "11011", extra), ensure_ascii=False).encode("utf-8")
+        payloads.append((f"synthetic+{extra}", body))
+
+    print(f"{'payload':>18} | {'size':>8} | {'legacy ms':>9} | {'stream ms':>9} | {'legacy KiB':>10} | {'stream KiB':>10}")
+    for name, body in payloads:
+        legacy_current, legacy_previous = legacy_parse(body)
+        stream_current, stream_previous = streaming_parse(body, wanted, args.chunk_size)
+        # 스트리밍 결과는 기존 결과에서 필요한 계정만 골라낸 것과 같아야 합니다.
+        assert stream_current == {k: v for k, v in legacy_current.items() if k in wanted}
+        assert stream_previous == {k: v for k, v in legacy_previous.items() if k in wanted}
+
+        legacy_ms, legacy_kib = measure(lambda: legacy_parse(body), args.repeat)
+        stream_ms, stream_kib = measure(lambda: streaming_parse(body, wanted, args.chunk_size), args.repeat)
+        print(f"{name[-18:]:>18} | {len(body) // 1024:>6}KB | {legacy_ms:>9.3f} | {stream_ms:>9.3f} | {legacy_kib:>10.1f} | {stream_kib:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+주간 주가 대량 적재 벤치마크
+
+같은 합성 데이터를 네 가지 방식으로 넣고 초당 행 수를 비교합니다.
+    legacy  ORM 객체 add_all + commit 후 행마다 refresh (기존 bulk_create)
+    bulk    청크 INSERT ... RETURNING (StockPriceRepository.bulk_create)
+    upsert  (symbol, this_friday_date) 충돌 시 갱신 (StockPriceRepository.bulk_upsert)
+    copy    COPY (asyncpg) 또는 RETURNING 없는 청크 INSERT (StockPriceRepository.copy_create)
+
+    python -m benchmarks.bench_stockprice_ingest --rows 20000
+    python -m benchmarks.bench_stockprice_ingest --url postgresql+asyncpg://user:pw@localhost/bench
+
+upsert 는 (symbol, this_friday_date) 유니크 제약이 필요하므로 벤치마크용 테이블에 만들어 둡니다.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import UniqueConstraint, delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.domain.model.stockprice_model import StockPriceModel
+from app.domain.repository.stockprice_repository import STOCKPRICE_LATEST, WEEKLY_PRICE_KEY, StockPriceRepository
+from app.domain.schema.stockprice_schema import WeeklyStockPriceCreate
+
+
+def make_rows(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    rows = []
+    for index in range(count):
+        today = rng.uniform(1_000, 500_000)
+        last_week = today * rng.uniform(0.9, 1.1)
+        rows.append(WeeklyStockPriceCreate(
+            symbol=f"{index % 2500:06d}",
+            market_cap=rng.randint(10**9, 10**13),
+            today=today,
+            last_week=last_week,
+            change_rate=round((today - last_week) / last_week * 100, 2),
+            week_high=today * 1.05,
+            week_low=today * 0.95,
+            error=None,
+            this_friday_date=f"2024-{1 + index // 2500 % 12:02d}-{1 + index // 30000 % 28:02d}",
+            last_friday_date=None,
+            data_source="bench",
+        ))
+    return rows
+
+
+async def legacy_bulk_create(repository: StockPriceRepository, stockprices_data):
+    """기존 bulk_create: add_all + commit 후 행마다 refresh (최신가 테이블 갱신은 포함하지 않습니다)"""
+    stockprices = [StockPriceModel(**repository._row_values(data)) for data in stockprices_data]
+    repository.db.add_all(stockprices)
+    await repository.db.commit()
+    for stockprice in stockprices:
+        await repository.db.refresh(stockprice)
+    return stockprices
+
+
+async def run_mode(session_factory, mode: str, rows) -> float:
+    async with session_factory() as session:
+        await session.execute(delete(StockPriceModel))
+        await session.execute(delete(STOCKPRICE_LATEST))
+        await session.commit()
+    async with session_factory() as session:
+        repository = StockPriceRepository(session)
+        started = time.perf_counter()
+        if mode == "legacy":
+            await legacy_bulk_create(repository, rows)
+        elif mode == "bulk":
+            await repository.bulk_create(rows)
+        elif mode == "upsert":
+            await repository.bulk_upsert(rows)
+        else:
+            await repository.copy_create(rows)
+        return time.perf_counter() - started
+
+
+async def run(url: str, count: int, modes):
+    table = StockPriceModel.__table__
+    if not any(isinstance(c, UniqueConstraint) and tuple(c.columns.keys()) == WEEKLY_PRICE_KEY for c in table.constraints):
+        table.append_constraint(UniqueConstraint(*WEEKLY_PRICE_KEY))
+    engine = create_async_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(STOCKPRICE_LATEST.drop, checkfirst=True)
+        await connection.run_sync(table.drop, checkfirst=True)
+        await connection.run_sync(table.create)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        await StockPriceRepository(session).ensure_indexes()
+
+    rows = make_rows(count)
+    print(f"🏁 [벤치마크] {url} / {count:,}행")
+    for mode in modes:
+        elapsed = await run_mode(session_factory, mode, rows)
+        print(f"  {mode:<7} {elapsed * 1000:10.1f} ms  {count / elapsed:12,.0f} rows/s")
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주간 주가 대량 적재 벤치마크")
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--modes", nargs="*", default=["legacy", "bulk", "upsert", "copy"])
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.rows, args.modes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+KPI API 부하 테스트
+
+로컬 DART 목업/재생 서버(mock_dart_server)를 띄우고 앱을 같은 프로세스에서 ASGI 로 구동한 뒤,
+/kpi/search, /kpi/{query}/reports, /kpi/{query}/report/{rcept_no}/kpi 를 고정 동시성으로 호출합니다.
+엔드포인트별 처리량, p50/p95/p99 지연, 오류 수와 DART(업스트림) 호출 수를 보고하므로
+KpiCompareService 의 성능 변경을 실제 DART 없이 같은 조건으로 비교할 수 있습니다.
+
+    python -m benchmarks.load_test --scenario mixed --requests 2000 --concurrency 32 --latency-ms 30
+    python -m benchmarks.load_test --scenario kpi --payload-dir benchmarks/payloads --error-rate 0.05 --json result.json
+
+캐시와 팩트 저장소는 임시 디렉터리를 쓰므로 매 실행이 빈 캐시(cold)에서 시작합니다.
+DART 호출 제한기(DART_RATE_PER_SECOND, DART_DAILY_BUDGET)는 기본으로 끄고 재므로,
+한도 적용 시의 지연을 보려면 두 환경 변수를 지정해 실행합니다.
+--warmup 으로 같은 요청을 먼저 한 번 돌리면 캐시가 채워진 상태(warm)를 측정합니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+
+import httpx
+import uvicorn
+
+from app.config.companies import SUPPORTED_COMPANIES
+from benchmarks.mock_dart_server import add_server_arguments, create_app_from_args
+
+SCENARIO_WEIGHTS = {
+    "search": {"search": 1},
+    "reports": {"reports": 1},
+    "kpi": {"kpi": 1},
+    "mixed": {"search": 3, "reports": 2, "kpi": 5},
+}
+REPORT_CODES = ("11011", "11012", "11013", "11014")
+
+
+def start_server(app, port: int):
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def build_requests(scenario: str, total: int, years, seed: int):
+    """(엔드포인트 이름, 경로, 쿼리) 목록. 같은 시드면 같은 요청 순서가 나옵니다."""
+    rng = random.Random(seed)
+    weights = SCENARIO_WEIGHTS[scenario]
+    names = [c['corp_name'] for c in SUPPORTED_COMPANIES]
+    requests = []
+    for endpoint in rng.choices(list(weights), weights=list(weights.values()), k=total):
+        name = rng.choice(names)
+        if endpoint == "search":
+            requests.append((endpoint, "/kpi/search", {"query": name[:rng.randint(1, len(name))]}))
+        elif endpoint == "reports":
+            requests.append((endpoint, f"/kpi/{name}/reports", {}))
+        else:
+            params = {"bsns_year": str(rng.choice(years)), "reprt_code": rng.choice(REPORT_CODES)}
+            requests.append((endpoint, f"/kpi/{name}/report/00000000000000/kpi", params))
+    return requests
+
+
+async def drive(client: httpx.AsyncClient, requests, concurrency: int):
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(endpoint, path, params):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, params=params)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies[endpoint].append((time.perf_counter() - started) * 1000)
+            statuses[endpoint][status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(*request) for request in requests))
+    return time.perf_counter() - started, latencies, statuses
+
+
+def summarize(elapsed: float, latencies: dict, statuses: dict, upstream: Counter) -> dict:
+    endpoints = {}
+    for endpoint, samples in sorted(latencies.items()):
+        errors = sum(count for status, count in statuses[endpoint].items() if not isinstance(status, int) or status >= 400)
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": errors,
+            "statuses": {str(status): count for status, count in statuses[endpoint].items()},
+            "throughput_rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(statistics.median(samples), 2),
+            "p95_ms": round(percentile(samples, 95), 2),
+            "p99_ms": round(percentile(samples, 99), 2),
+            "max_ms": round(max(samples), 2),
+        }
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests": len(all_samples),
+        "throughput_rps": round(len(all_samples) / elapsed, 1),
+        "p50_ms": round(statistics.median(all_samples), 2),
+        "p95_ms": round(percentile(all_samples, 95), 2),
+        "p99_ms": round(percentile(all_samples, 99), 2),
+        "endpoints": endpoints,
+        "upstream_calls": dict(upstream),
+    }
+
+
+async def run(args, mock_app) -> dict:
+    # 앱 모듈은 DART_API_URL, 캐시 경로 환경 변수를 import 시점에 읽으므로 여기서 불러옵니다.
+    from app.main import app
+
+    years = list(range(args.from_year, args.to_year + 1))
+    requests = build_requests(args.scenario, args.requests, years, args.seed)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.client_timeout) as client:
+            if args.warmup:
+                await drive(client, requests, args.concurrency)
+            before = Counter(mock_app.state.calls)
+            elapsed, latencies, statuses = await drive(client, requests, args.concurrency)
+            upstream = Counter(mock_app.state.calls)
+            upstream.subtract(before)
+    return summarize(elapsed, latencies, statuses, +upstream)
+
+
+def print_report(result: dict, args):
+    print(f"🏁 [부하 테스트] scenario={args.scenario} requests={result['requests']} concurrency={args.concurrency} "
+          f"{'warm' if args.warmup else 'cold'}")
+    print(f"{'endpoint':>8} | {'req':>6} | {'err':>5} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    rows = list(result["endpoints"].items()) + [("total", {**result, "errors": sum(e["errors"] for e in result["endpoints"].values())})]
+    for endpoint, row in rows:
+        print(f"{endpoint:>8} | {row['requests']:>6} | {row['errors']:>5} | {row['throughput_rps']:>8} | "
+              f"{row['p50_ms']:>8} | {row['p95_ms']:>8} | {row['p99_ms']:>8}")
+    upstream = ", ".join(f"{name}={count}" for name, count in sorted(result["upstream_calls"].items())) or "없음"
+    print(f"🌏 [업스트림 호출] {upstream}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KPI API 부하 테스트")
+    parser.add_argument("--port", type=int, default=9100, help="목업 DART 서버 포트")
+    parser.add_argument("--scenario", choices=tuple(SCENARIO_WEIGHTS), default="mixed")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--from-year", type=int, default=2022)
+    parser.add_argument("--to-year", type=int, default=2024)
+    parser.add_argument("--warmup", action="store_true", help="측정 전에 같은 요청을 한 번 돌려 캐시를 채웁니다")
+    parser.add_argument("--client-timeout", type=float, default=60.0)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+    if args.seed is None:
+        args.seed = 7
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ["DART_API_URL"] = f"http://127.0.0.1:{args.port}/api"
+        os.environ["KPI_CACHE_PATH"] = os.path.join(cache_dir, "kpi_cache.sqlite3")
+        os.environ["KPI_FACT_STORE_PATH"] = os.path.join(cache_dir, "financial_facts.sqlite3")
+        os.environ["DART_BUDGET_PATH"] = os.path.join(cache_dir, "dart_budget.sqlite3")
+        os.environ.setdefault("DART_RATE_PER_SECOND", "0")
+        os.environ.setdefault("DART_DAILY_BUDGET", "0")
+        os.environ.setdefault("KPI_CACHE_WARMER", "0")
+        mock_app = create_app_from_args(args)
+        start_server(mock_app, args.port)
+        result = asyncio.run(run(args, mock_app))
+
+    print_report(result, args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "result": result}, f, ensure_ascii=False, indent=2)
+        print(f"💾 [저장] {args.json}")
+
+
+if __name__ == "__main__":
+    main()
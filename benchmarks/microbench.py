@@ -0,0 +1,239 @@
+"""
+KPI 요청 경로 마이크로벤치마크
+
+KPI 요청 하나가 쓰는 CPU 를 함수 단위로 잽니다.
+    safe_eval_expression      KPI 산식 평가 (_safe_eval_expression)
+    find_financial_value[N]   계정 N개 재무 dict 에서 alias 조회 (_find_financial_value)
+    find_company_by_query     지원 기업 전체 이름·기업코드·종목코드·미스 조회 (_find_company_by_query)
+    parse_amount[N]           금액 문자열 N개 변환 (parse_amount)
+    parse_fnltt[N]            계정 N개 fnlttSinglAcntAll 응답 1건 파싱 (_get_financials_for_report 의 파싱 단계)
+    parse_fnltt[recorded]     --payload-dir 에 녹화된 실제 응답 전체
+    validate_and_format_kpi   KPI 값 검증·포맷 (_validate_and_format_kpi)
+    kpi_request               지원 기업별 KPI 전체 평가 + 포맷 (요청 1건의 evaluate 단계)
+
+결과는 연산 1회당 나노초(ns/op, 반복 중 최솟값)로 보고합니다. 기준선을 저장해 두고 다음 실행에서 비교하면
+--threshold 이상 느려진 항목이 있을 때 종료 코드 1 로 실패합니다.
+ns/op 는 머신·파이썬 버전에 따라 달라지므로 기준선은 같은 환경(릴리스 측정용 머신, CI 러너)에서 만든 것과 비교합니다.
+
+    python -m benchmarks.microbench --save-baseline benchmarks/baselines/microbench.json
+    python -m benchmarks.microbench --baseline benchmarks/baselines/microbench.json --threshold 0.15
+    python -m benchmarks.microbench --sizes 1000 10000 100000 --payload-dir benchmarks/payloads
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def _synthetic_financials(account_count: int, seed: str) -> dict:
+    from benchmarks.mock_dart_server import KPI_ACCOUNT_IDS
+    rng = random.Random(seed)
+    financials = {account_id: rng.randint(1_000_000_000, 900_000_000_000) for account_id in KPI_ACCOUNT_IDS}
+    for i in range(max(0, account_count - len(financials))):
+        financials[f"dart_SyntheticAccount{i:06d}"] = rng.randint(-10**12, 10**12)
+    return financials
+
+
+def build_cases(sizes, payload_dir: str = None) -> dict:
+    """이름 -> (호출 가능 객체, 호출 1회당 연산 수). 입력은 모두 여기서 미리 만들어 측정에서 제외합니다."""
+    from app.config.companies import SUPPORTED_COMPANIES
+    from app.domain.service.fnltt_stream_parser import FnlttStreamParser, parse_amount
+    from app.domain.service.kpi_compare_service import ACCOUNT_ID_ALIASES, KpiCompareService
+    from benchmarks.mock_dart_server import build_fnltt_payload
+
+    service = KpiCompareService()
+    plans = [plan for plan in service.kpi_plans if plan.compile_error is None]
+    year = 2024
+    cases = {}
+
+    # 지원 기업마다 당기·전기 재무 데이터 (KPI 계정 + 합성 계정 150개, 목업 응답과 같은 규모)
+    company_financials = [
+        {year: _synthetic_financials(160, f"{c['corp_code']}-{year}"), year - 1: _synthetic_financials(160, f"{c['corp_code']}-{year - 1}")}
+        for c in SUPPORTED_COMPANIES
+    ]
+
+    contexts = []
+    for financials in company_financials:
+        for plan in plans:
+            try:
+                contexts.append((plan.eval_formula, plan.build_context(financials, year)))
+            except ValueError:
+                continue
+
+    def safe_eval_expression():
+        for expression, context in contexts:
+            try:
+                service._safe_eval_expression(expression, context)
+            except ZeroDivisionError:
+                pass
+    cases["safe_eval_expression"] = (safe_eval_expression, len(contexts))
+
+    lookup_ids = list(ACCOUNT_ID_ALIASES) + ["ifrs_full_NotPresent", "dart_Missing_Account"]
+    for size in sizes:
+        financials_for_year = _synthetic_financials(size, f"lookup-{size}")
+
+        def find_financial_value(financials_for_year=financials_for_year):
+            for python_safe_id in lookup_ids:
+                service._find_financial_value(financials_for_year, python_safe_id)
+        cases[f"find_financial_value[{size}]"] = (find_financial_value, len(lookup_ids))
+
+    queries = []
+    for company in SUPPORTED_COMPANIES:
+        queries += [company['corp_name'], company['corp_name'][:2], company['corp_code']]
+        if company['stock_code']:
+            queries.append(company['stock_code'])
+    queries += ["없는기업", "99999999", "zzz"]
+
+    def find_company_by_query():
+        for query in queries:
+            service._find_company_by_query(query)
+    cases["find_company_by_query"] = (find_company_by_query, len(queries))
+
+    wanted = service.required_account_ids
+    for size in sizes:
+        rng = random.Random(size)
+        amounts = [str(rng.randint(-10**12, 10**12)).encode() for _ in range(size)]
+
+        def parse_amounts(amounts=amounts):
+            for amount in amounts:
+                parse_amount(amount)
+        cases[f"parse_amount[{size}]"] = (parse_amounts, size)
+
+        body = json.dumps(
+            build_fnltt_payload("00000000", str(year), "11011", extra_accounts=size), ensure_ascii=False,
+        ).encode("utf-8")
+
+        def parse_fnltt(body=body):
+            FnlttStreamParser.parse(body, wanted)
+        cases[f"parse_fnltt[{size}]"] = (parse_fnltt, 1)
+
+    recorded = sorted(glob.glob(os.path.join(payload_dir, "fnlttSinglAcntAll", "*.json"))) if payload_dir else []
+    if recorded:
+        bodies = []
+        for path in recorded:
+            with open(path, "rb") as f:
+                bodies.append(f.read())
+
+        def parse_recorded():
+            for body in bodies:
+                FnlttStreamParser.parse(body, wanted)
+        cases["parse_fnltt[recorded]"] = (parse_recorded, len(bodies))
+
+    values = [0, 1, 12_345_678_901, -987_654_321, 0.5, 12.3456, -45.6, 6000.0, 123_456_789.123]
+    formats = [(plan.kpi_name, value, plan.unit) for plan in plans for value in values]
+
+    def validate_and_format_kpi():
+        for kpi_name, value, unit in formats:
+            service._validate_and_format_kpi(kpi_name, value, unit)
+    cases["validate_and_format_kpi"] = (validate_and_format_kpi, len(formats))
+
+    def kpi_request():
+        # _compute_kpi_for_report 의 evaluate 구간과 같은 작업 (캐시·로그 제외)
+        for financials in company_financials:
+            for plan in plans:
+                try:
+                    service._validate_and_format_kpi(plan.kpi_name, plan.evaluate(financials, year), plan.unit)
+                except (ZeroDivisionError, ValueError):
+                    continue
+    cases["kpi_request"] = (kpi_request, len(company_financials))
+    return cases
+
+
+def measure(fn, ops: int, repeat: int, min_time: float) -> float:
+    """min_time 이상 걸리도록 반복 횟수를 맞춘 뒤 repeat 번 재어 연산 1회당 최소 ns 를 반환합니다."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    best = elapsed
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - started)
+    return best / loops / ops * 1e9
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """기준선 대비 threshold 를 넘게 느려진 (이름, 기준 ns, 현재 ns, 변화율) 목록."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        change = current["ns_per_op"] / base["ns_per_op"] - 1
+        if change > threshold:
+            regressions.append((name, base["ns_per_op"], current["ns_per_op"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KPI 요청 경로 마이크로벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DEFAULT_SIZES), help="합성 계정 수")
+    parser.add_argument("--payload-dir", help="녹화된 DART 응답 디렉터리 (record_dart_payloads)")
+    parser.add_argument("--cases", nargs="*", help="이름이 이 문자열로 시작하는 항목만 실행")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="측정 1회의 최소 시간(초)")
+    parser.add_argument("--baseline", help="비교할 기준선 JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="허용하는 느려짐 비율 (0.15 = 15%%)")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준선 JSON 으로 저장")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # 서비스 모듈이 import 시점에 여는 캐시·팩트 저장소가 실제 데이터 디렉터리를 건드리지 않도록 합니다.
+        os.environ.setdefault("KPI_CACHE_PATH", os.path.join(cache_dir, "kpi_cache.sqlite3"))
+        os.environ.setdefault("KPI_FACT_STORE_PATH", os.path.join(cache_dir, "financial_facts.sqlite3"))
+        cases = build_cases(args.sizes, args.payload_dir)
+        if args.cases:
+            cases = {name: case for name, case in cases.items() if any(name.startswith(prefix) for prefix in args.cases)}
+
+        results = {}
+        for name, (fn, ops) in cases.items():
+            results[name] = {"ns_per_op": round(measure(fn, ops, args.repeat, args.min_time), 1), "ops": ops}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"{'case':<28} | {'ns/op':>14} | {'baseline':>14} | {'change':>8}")
+    for name, result in results.items():
+        base = (baseline or {}).get("cases", {}).get(name)
+        change = f"{result['ns_per_op'] / base['ns_per_op'] - 1:+.1%}" if base else "-"
+        base_text = f"{base['ns_per_op']:,.1f}" if base else "-"
+        print(f"{name:<28} | {result['ns_per_op']:>14,.1f} | {base_text:>14} | {change:>8}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "cases": results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"💾 [기준선 저장] {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            for name, base, current, change in regressions:
+                print(f"❌ [성능 회귀] {name}: {base:,.1f} → {current:,.1f} ns/op ({change:+.1%}, 허용 {args.threshold:.0%})")
+            sys.exit(1)
+        print(f"✅ [성능 회귀 없음] 허용 {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
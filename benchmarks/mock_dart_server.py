@@ -0,0 +1,218 @@
+"""
+로컬 DART 목업 / 재생 서버
+
+list.json, fnlttSinglAcntAll.json 을 합성 데이터로 응답하거나, --payload-dir 에 녹화해 둔 실제 응답을 재생합니다.
+DART_API_URL 을 이 서버로 지정하면 실제 DART 호출 없이 KPI 엔드포인트를 벤치마크할 수 있습니다.
+
+    python -m benchmarks.mock_dart_server --port 9100 --latency-ms 30
+    python -m benchmarks.mock_dart_server --payload-dir benchmarks/payloads --latency-ms 30 --jitter-ms 20 --error-rate 0.02
+
+녹화 파일 구성 (benchmarks.record_dart_payloads 가 만듭니다)
+    {payload_dir}/list/{corp_code}.json
+    {payload_dir}/fnlttSinglAcntAll/{corp_code}_{bsns_year}_{reprt_code}_{fs_div}.json
+녹화가 없는 요청은 합성 데이터로 응답하며, --replay-miss 013 이면 DART 의 "조회된 데이터가 없습니다" 로 응답합니다.
+--ofs-only-rate 로 정한 비율의 기업은 연결재무제표가 없는 기업처럼 fs_div=CFS 요청에 013 으로 응답합니다.
+
+장애 주입
+    --error-rate  HTTP 503 응답 비율
+    --quota-rate  status 020(요청 제한 초과) 응답 비율
+    --timeout-rate 응답 전에 --timeout-ms 만큼 멈추는 비율
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+from collections import Counter
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse, Response
+
+KPI_ACCOUNT_IDS = [
+    "ifrs-full_Revenue",
+    "dart_OperatingIncomeLoss",
+    "ifrs-full_ProfitLoss",
+    "ifrs-full_Assets",
+    "ifrs-full_Liabilities",
+    "ifrs-full_Equity",
+    "ifrs-full_CurrentAssets",
+    "ifrs-full_CurrentLiabilities",
+    "ifrs-full_CashFlowsFromUsedInOperatingActivities",
+]
+
+
+def build_fnltt_payload(corp_code: str, bsns_year: str, reprt_code: str, extra_accounts: int = 150) -> dict:
+    """실제 응답과 같은 필드 구성의 fnlttSinglAcntAll 응답을 만듭니다. 같은 인자에는 같은 값을 돌려줍니다."""
+    rng = random.Random(f"{corp_code}-{bsns_year}-{reprt_code}")
+    account_ids = KPI_ACCOUNT_IDS + [f"dart_SyntheticAccount{i:05d}" for i in range(extra_accounts)]
+    items = []
+    for i, account_id in enumerate(account_ids):
+        items.append({
+            "rcept_no": f"{bsns_year}0315000{i % 10}",
+            "reprt_code": reprt_code,
+            "bsns_year": bsns_year,
+            "corp_code": corp_code,
+            "sj_div": "BS" if i % 2 else "IS",
+            "sj_nm": "재무상태표" if i % 2 else "포괄손익계산서",
+            "account_id": account_id,
+            "account_nm": f"계정{i}",
+            "account_detail": "-",
+            "thstrm_nm": f"제 {int(bsns_year) - 2000} 기",
+            "thstrm_amount": str(rng.randint(1_000_000_000, 900_000_000_000)),
+            "frmtrm_nm": f"제 {int(bsns_year) - 2001} 기",
+            "frmtrm_amount": str(rng.randint(1_000_000_000, 900_000_000_000)),
+            "ord": str(i),
+            "currency": "KRW",
+        })
+    return {"status": "000", "message": "정상", "list": items}
+
+
+def build_list_payload(corp_code: str) -> dict:
+    reports = []
+    for year in range(2022, 2026):
+        for report_nm, month in (("사업보고서", "12"), ("반기보고서", "06"), ("분기보고서", "03"), ("분기보고서", "09")):
+            reports.append({
+                "corp_code": corp_code,
+                "corp_name": "목업기업",
+                "report_nm": f"{report_nm} ({year}.{month})",
+                "rcept_no": f"{year}{month}15000{len(reports) % 10}",
+                "flr_nm": "목업기업",
+                "rcept_dt": f"{year}{month}15",
+            })
+    return {"status": "000", "message": "정상", "total_count": len(reports), "list": reports}
+
+
+NO_DATA_PAYLOAD = {"status": "013", "message": "조회된 데이타가 없습니다."}
+QUOTA_EXCEEDED_PAYLOAD = {"status": "020", "message": "요청 제한을 초과하였습니다."}
+
+
+def payload_path(payload_dir: str, endpoint: str, *key) -> str:
+    return os.path.join(payload_dir, endpoint, "_".join(key) + ".json")
+
+
+class ReplayStore:
+    """녹화된 응답 본문을 파일에서 읽어 그대로 돌려줍니다. 한 번 읽은 본문은 메모리에 둡니다."""
+
+    def __init__(self, payload_dir: str = None):
+        self.payload_dir = payload_dir
+        self._bodies = {}
+
+    def get(self, endpoint: str, *key):
+        if not self.payload_dir:
+            return None
+        path = payload_path(self.payload_dir, endpoint, *key)
+        if path not in self._bodies:
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                self._bodies[path] = f.read()
+        return self._bodies[path]
+
+
+def create_app(
+    latency_ms: float = 0.0,
+    extra_accounts: int = 150,
+    payload_dir: str = None,
+    replay_miss: str = "synthetic",
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    quota_rate: float = 0.0,
+    timeout_rate: float = 0.0,
+    timeout_ms: float = 20000.0,
+    seed: int = None,
+    ofs_only_rate: float = 0.0,
+) -> FastAPI:
+    app = FastAPI(title="Mock DART API")
+    # call_count 는 전체 업스트림 호출 수, calls 는 엔드포인트·결과별 호출 수입니다.
+    app.state.call_count = 0
+    app.state.calls = Counter()
+    replay = ReplayStore(payload_dir)
+    rng = random.Random(seed)
+
+    async def _delay(endpoint: str):
+        """지연과 장애를 주입합니다. 장애 응답을 돌려줘야 하면 그 응답을, 아니면 None 을 반환합니다."""
+        app.state.call_count += 1
+        app.state.calls[endpoint] += 1
+        latency = latency_ms + (rng.uniform(0, jitter_ms) if jitter_ms else 0.0)
+        if timeout_rate and rng.random() < timeout_rate:
+            latency = timeout_ms
+        if latency:
+            await asyncio.sleep(latency / 1000)
+        if error_rate and rng.random() < error_rate:
+            app.state.calls[f"{endpoint}:http_error"] += 1
+            return Response(status_code=503, content=b"Service Unavailable")
+        if quota_rate and rng.random() < quota_rate:
+            app.state.calls[f"{endpoint}:quota"] += 1
+            return JSONResponse(QUOTA_EXCEEDED_PAYLOAD)
+        return None
+
+    def _respond(endpoint: str, key: tuple, synthetic):
+        body = replay.get(endpoint, *key)
+        if body is not None:
+            app.state.calls[f"{endpoint}:replayed"] += 1
+            return Response(content=body, media_type="application/json")
+        if payload_dir and replay_miss == "013":
+            return JSONResponse(NO_DATA_PAYLOAD)
+        return JSONResponse(synthetic())
+
+    @app.get("/api/list.json")
+    async def list_json(corp_code: str = Query(...)):
+        failure = await _delay("list")
+        if failure is not None:
+            return failure
+        return _respond("list", (corp_code,), lambda: build_list_payload(corp_code))
+
+    @app.get("/api/fnlttSinglAcntAll.json")
+    async def fnltt(corp_code: str = Query(...), bsns_year: str = Query(...), reprt_code: str = Query(...), fs_div: str = Query("CFS")):
+        failure = await _delay("fnlttSinglAcntAll")
+        if failure is not None:
+            return failure
+        # 기업코드로 정해지므로 같은 기업은 항상 같은 쪽(연결 있음/없음)입니다.
+        if not payload_dir and fs_div == "CFS" and random.Random(corp_code).random() < ofs_only_rate:
+            app.state.calls["fnlttSinglAcntAll:no_data"] += 1
+            return JSONResponse(NO_DATA_PAYLOAD)
+        return _respond(
+            "fnlttSinglAcntAll", (corp_code, bsns_year, reprt_code, fs_div),
+            lambda: build_fnltt_payload(corp_code, bsns_year, reprt_code, extra_accounts),
+        )
+
+    return app
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """목업 서버 옵션. 부하 테스트 스크립트도 같은 옵션으로 서버를 띄웁니다."""
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="0~지정값 사이 추가 지연")
+    parser.add_argument("--extra-accounts", type=int, default=150)
+    parser.add_argument("--payload-dir", help="녹화된 응답 디렉터리 (없으면 합성 데이터)")
+    parser.add_argument("--replay-miss", choices=("synthetic", "013"), default="synthetic", help="녹화가 없는 요청의 응답")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 503 응답 비율")
+    parser.add_argument("--quota-rate", type=float, default=0.0, help="status 020 응답 비율")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="--timeout-ms 동안 응답하지 않는 비율")
+    parser.add_argument("--timeout-ms", type=float, default=20000.0)
+    parser.add_argument("--seed", type=int, default=None, help="지연·장애 주입 난수 시드")
+    parser.add_argument("--ofs-only-rate", type=float, default=0.0, help="연결재무제표(CFS)가 없는 기업 비율 (합성 데이터)")
+
+
+def create_app_from_args(args) -> FastAPI:
+    return create_app(
+        latency_ms=args.latency_ms, extra_accounts=args.extra_accounts, payload_dir=args.payload_dir,
+        replay_miss=args.replay_miss, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        quota_rate=args.quota_rate, timeout_rate=args.timeout_rate, timeout_ms=args.timeout_ms, seed=args.seed,
+        ofs_only_rate=args.ofs_only_rate,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 DART 목업 / 재생 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app_from_args(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+DART 응답 녹화
+
+실제 DART 의 list.json, fnlttSinglAcntAll.json 응답 본문을 그대로 파일로 저장해
+mock_dart_server --payload-dir 로 오프라인 재생할 수 있게 합니다. 이미 녹화된 파일은 건너뜁니다.
+
+    python -m benchmarks.record_dart_payloads --output benchmarks/payloads --years 2021 2022 2023 2024
+    python -m benchmarks.record_dart_payloads --companies 크래프톤 넷마블 --reports 11011 11012
+"""
+import argparse
+import os
+import time
+
+import httpx
+from dotenv import load_dotenv
+
+from app.config.companies import SUPPORTED_COMPANIES
+from benchmarks.mock_dart_server import payload_path
+
+load_dotenv()
+
+DART_API_KEY = os.getenv("DART_API_KEY")
+DART_API_URL = os.getenv("DART_API_URL", "https://opendart.fss.or.kr/api")
+
+
+def record(client: httpx.Client, path: str, url: str, params: dict, interval: float) -> bool:
+    if os.path.exists(path):
+        return False
+    response = client.get(url, params={"crtfc_key": DART_API_KEY, **params})
+    response.raise_for_status()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(response.content)
+    # DART 호출 한도를 지키기 위해 요청 사이에 간격을 둡니다.
+    time.sleep(interval)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DART 응답 녹화")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "payloads"))
+    parser.add_argument("--companies", nargs="*", help="기업명 (기본: 지원 기업 전체)")
+    parser.add_argument("--years", nargs="*", default=["2022", "2023", "2024"])
+    parser.add_argument("--reports", nargs="*", default=["11011"])
+    parser.add_argument("--fs-div", nargs="*", default=["CFS"])
+    parser.add_argument("--interval", type=float, default=0.2, help="요청 간격(초)")
+    args = parser.parse_args()
+
+    if not DART_API_KEY:
+        print("❌ DART_API_KEY가 설정되지 않았습니다.")
+        return
+    companies = [c for c in SUPPORTED_COMPANIES if not args.companies or c['corp_name'] in args.companies]
+
+    recorded = skipped = 0
+    with httpx.Client(timeout=30) as client:
+        for company in companies:
+            corp_code = company['corp_code']
+            jobs = [(payload_path(args.output, "list", corp_code), f"{DART_API_URL}/list.json",
+                     {"corp_code": corp_code, "bgn_de": "20220101", "pblntf_ty": "A"})]
+            for year in args.years:
+                for reprt_code in args.reports:
+                    for fs_div in args.fs_div:
+                        jobs.append((
+                            payload_path(args.output, "fnlttSinglAcntAll", corp_code, year, reprt_code, fs_div),
+                            f"{DART_API_URL}/fnlttSinglAcntAll.json",
+                            {"corp_code": corp_code, "bsns_year": year, "reprt_code": reprt_code, "fs_div": fs_div},
+                        ))
+            for path, url, params in jobs:
+                if record(client, path, url, params, args.interval):
+                    recorded += 1
+                else:
+                    skipped += 1
+            print(f"📼 [녹화] {company['corp_name']} ({corp_code})")
+    print(f"✅ [녹화 완료] {args.output} (새로 녹화 {recorded}건, 기존 {skipped}건)")
+
+
+if __name__ == "__main__":
+    main()
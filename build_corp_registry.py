@@ -0,0 +1,65 @@
+"""
+DART 기업코드(corpCode.xml)로 기업 레지스트리 파일을 만듭니다.
+
+    python build_corp_registry.py                 # DART 에서 내려받아 증분 갱신
+    python build_corp_registry.py --xml CORPCODE.xml   # 로컬 XML 사용
+    python build_corp_registry.py --full          # 기존 파일을 무시하고 전체 재생성
+
+실행 중인 서버는 POST /kpi/registry/reload 로 새 파일을 다시 엽니다.
+"""
+import argparse
+import os
+import tempfile
+import zipfile
+
+import httpx
+from dotenv import load_dotenv
+
+from app.domain.service.corp_registry import CORP_REGISTRY_PATH, build_registry
+
+load_dotenv()
+
+DART_API_KEY = os.getenv("DART_API_KEY")
+CORP_CODE_URL = "https://opendart.fss.or.kr/api/corpCode.xml"
+
+
+def download_corp_code_zip(path: str):
+    """corpCode.xml ZIP 을 메모리에 올리지 않고 파일로 바로 내려받습니다."""
+    print("📥 [DART API] 기업코드 ZIP 다운로드 중...")
+    with httpx.stream("GET", CORP_CODE_URL, params={"crtfc_key": DART_API_KEY}, timeout=60) as response:
+        response.raise_for_status()
+        with open(path, "wb") as f:
+            for chunk in response.iter_bytes():
+                f.write(chunk)
+    print(f"✅ [다운로드 완료] {os.path.getsize(path):,} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DART 기업 레지스트리 빌드")
+    parser.add_argument("--xml", help="이미 내려받은 corpCode.xml 또는 ZIP 경로")
+    parser.add_argument("--output", default=CORP_REGISTRY_PATH, help="레지스트리 파일 경로")
+    parser.add_argument("--full", action="store_true", help="증분 갱신 대신 전체 재생성")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = args.xml
+        if source is None:
+            if not DART_API_KEY:
+                print("❌ DART_API_KEY가 설정되지 않았습니다.")
+                return
+            source = os.path.join(tmp_dir, "corpCode.zip")
+            download_corp_code_zip(source)
+
+        if zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as zip_file:
+                # ZIP 안의 XML 도 압축을 풀지 않고 스트림으로 파싱합니다.
+                with zip_file.open(zip_file.namelist()[0]) as xml_stream:
+                    result = build_registry(xml_stream, args.output, incremental=not args.full)
+        else:
+            result = build_registry(source, args.output, incremental=not args.full)
+
+    print(f"✅ [레지스트리] {args.output} ({result['mode']}, 전체 {result['total']:,}개, 추가 {result['added']:,}, 변경 {result['updated']:,})")
+
+
+if __name__ == "__main__":
+    main()